@@ -1,12 +1,13 @@
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Query, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from typing import Optional
 from ..database import get_database
-from ..models.user import UserRole, UserResponse
-from .jwt import verify_token
+from ..models.user import UserRole, UserResponse, TokenData
+from .jwt import verify_token, verify_download_token
 from bson import ObjectId
 
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
 
 
 async def get_current_user(
@@ -14,13 +15,15 @@ async def get_current_user(
     db = Depends(get_database)
 ) -> UserResponse:
     """Get current authenticated user."""
+    return await _load_user(verify_token(credentials.credentials), db)
+
+
+async def _load_user(token_data: Optional[TokenData], db) -> UserResponse:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    
-    token_data = verify_token(credentials.credentials)
     if token_data is None:
         raise credentials_exception
     
@@ -76,6 +79,40 @@ def require_roles(required_roles: list[UserRole]):
     return roles_checker
 
 
+async def get_download_user(
+    request: Request,
+    token: Optional[str] = Query(None, description="Download token from POST /api/auth/download-token"),
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security),
+    db = Depends(get_database)
+) -> UserResponse:
+    """
+    Get the active user for a file download.
+    
+    Accepts the usual bearer token, or a download token for this URL in
+    ?token=, so the browser can download through a plain link and stream
+    the file to disk instead of the page buffering it.
+    """
+    if credentials:
+        token_data = verify_token(credentials.credentials)
+    else:
+        token_data = verify_download_token(token, request.url.path) if token else None
+    return await get_current_active_user(await _load_user(token_data, db))
+
+
+def require_download_roles(required_roles: list[UserRole]):
+    """Like require_roles, for downloads authenticated by get_download_user."""
+    async def roles_checker(
+        current_user: UserResponse = Depends(get_download_user)
+    ) -> UserResponse:
+        if current_user.role not in required_roles and current_user.role != UserRole.ADMIN:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail=f"Access denied. Required roles: {[role.value for role in required_roles]}"
+            )
+        return current_user
+    return roles_checker
+
+
 # Specific role dependencies
 require_admin = require_role(UserRole.ADMIN)
 require_hr = require_role(UserRole.HR)
@@ -84,6 +121,7 @@ require_candidate = require_role(UserRole.CANDIDATE)
 require_hr_or_admin = require_roles([UserRole.HR, UserRole.ADMIN])
 require_hr_team_or_admin = require_roles([UserRole.HR, UserRole.TEAM_MEMBER, UserRole.ADMIN])
 require_team_or_admin = require_roles([UserRole.TEAM_MEMBER, UserRole.ADMIN])
+require_hr_or_admin_download = require_download_roles([UserRole.HR, UserRole.ADMIN])
 
 
 async def verify_stage_assignment(
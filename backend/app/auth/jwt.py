@@ -32,6 +32,25 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return encoded_jwt
 
 
+def create_download_token(email: str, path: str) -> str:
+    """Create a short-lived token that authenticates a download of one URL path."""
+    return create_access_token(
+        {"sub": email, "download_path": path},
+        timedelta(seconds=settings.download_token_expire_seconds)
+    )
+
+
+def verify_download_token(token: str, path: str) -> Optional[TokenData]:
+    """Verify a download token for the URL path it was issued for."""
+    try:
+        payload = jwt.decode(token, settings.jwt_secret, algorithms=[settings.jwt_algorithm])
+    except JWTError:
+        return None
+    if payload.get("download_path") != path or payload.get("sub") is None:
+        return None
+    return TokenData(email=payload["sub"])
+
+
 def verify_token(token: str) -> Optional[TokenData]:
     """Verify and decode a JWT token."""
     try:
@@ -39,7 +58,8 @@ def verify_token(token: str) -> Optional[TokenData]:
         email: str = payload.get("sub")
         role: str = payload.get("role")
         
-        if email is None:
+        # Download tokens travel in URLs and only authenticate their own download
+        if email is None or "download_path" in payload:
             return None
             
         return TokenData(email=email, role=UserRole(role) if role else None)
@@ -0,0 +1,113 @@
+"""
+Benchmark: candidate search on a synthetic 500k-application corpus
+
+Seeds a throwaway database with generated applications (including their
+normalized search fields) and times ApplicationService.search_applications
+for prefix, mobile and misspelled (fuzzy) queries, both as HR (all
+applications) and as a team member (assigned applications only). The target
+is p95 under 50ms.
+
+Usage (from the backend directory, MongoDB running):
+    python -m app.benchmarks.candidate_search [--applications 500000] [--runs 50] [--keep]
+"""
+
+import argparse
+import asyncio
+import logging
+import random
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+
+from app.benchmarks.common import benchmark_database, time_runs, summarize
+from app.database import Database
+from app.models.user import UserRole
+from app.services.application_service import ApplicationService
+from app.utils.search import build_search_fields, normalize_text
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+FIRST_NAMES = [
+    "Aarav", "Vivaan", "Aditya", "Ananya", "Diya", "Ishaan", "Kavya", "Priya", "Rohan", "Saanvi",
+    "James", "Olivia", "Liam", "Emma", "Noah", "Sophia", "Lucas", "Mia", "Mateo", "Zoë"
+]
+LAST_NAMES = [
+    "Sharma", "Patel", "Iyer", "Reddy", "Nair", "Gupta", "Khan", "Singh", "Mehta", "Das",
+    "Smith", "Johnson", "Williams", "Brown", "García", "Müller", "Rossi", "Silva", "Kim", "Nguyen"
+]
+TEAM_MEMBER_ID = str(ObjectId())
+
+QUERIES = [
+    ("prefix: first name", "pri"),
+    ("prefix: full name", "priya sha"),
+    ("prefix: email", "rohan.me"),
+    ("prefix: mobile", "98765"),
+    ("fuzzy: misspelled", "priay sharam"),
+    ("fuzzy: no match", "xqzvw"),
+]
+
+
+def generate_application(rng: random.Random, index: int, now: datetime) -> dict:
+    """Build one synthetic application with the fields search touches."""
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    name = f"{first} {last}"
+    email = f"{normalize_text(first)}.{normalize_text(last)}{index}@example.com"
+    mobile = f"9{rng.randint(100000000, 999999999)}"
+    created_at = now - timedelta(minutes=rng.randint(0, 60 * 24 * 365))
+    application = {
+        "candidate_id": str(ObjectId()),
+        "job_id": str(ObjectId()),
+        "job_title": "Benchmark Job",
+        "name": name,
+        "email": email,
+        "mobile": mobile,
+        "current_stage": rng.randint(1, 7),
+        "status": "pending",
+        "stages": {},
+        "created_at": created_at,
+        "updated_at": created_at,
+        "date_of_application": created_at
+    }
+    # About 1% of applications are assigned to the benchmark team member
+    if rng.random() < 0.01:
+        application["stages"]["stage1_assigned_to"] = TEAM_MEMBER_ID
+    application.update(build_search_fields(name, email, mobile=mobile))
+    return application
+
+
+async def seed(application_count: int):
+    """Insert application_count synthetic applications in batches."""
+    rng = random.Random(42)
+    now = datetime.utcnow()
+    batch_size = 10000
+    for offset in range(0, application_count, batch_size):
+        batch = [
+            generate_application(rng, offset + index, now)
+            for index in range(min(batch_size, application_count - offset))
+        ]
+        await Database.db.applications.insert_many(batch, ordered=False)
+    logger.info(f"Seeded {application_count} applications")
+
+
+async def run_benchmark(application_count: int, runs: int, keep: bool):
+    """Seed the corpus and time each scenario for each role."""
+    async with benchmark_database(keep):
+        await seed(application_count)
+
+        application_service = ApplicationService()
+        for role, user_id in [(UserRole.HR, str(ObjectId())), (UserRole.TEAM_MEMBER, TEAM_MEMBER_ID)]:
+            for label, query in QUERIES:
+                timings_ms, results = await time_runs(
+                    runs, lambda: application_service.search_applications(query, role, user_id, limit=10)
+                )
+                summarize(f"{role.value} {label}", timings_ms, len(results))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark candidate search on a synthetic corpus")
+    parser.add_argument("--applications", type=int, default=500000, help="Number of applications to generate")
+    parser.add_argument("--runs", type=int, default=50, help="Timed runs per scenario")
+    parser.add_argument("--keep", action="store_true", help="Keep the benchmark database afterwards")
+    args = parser.parse_args()
+    asyncio.run(run_benchmark(args.applications, args.runs, args.keep))
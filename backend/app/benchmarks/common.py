@@ -0,0 +1,49 @@
+"""Helpers shared by the benchmark scripts."""
+
+import logging
+import statistics
+import time
+from contextlib import asynccontextmanager
+
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from app.config import settings
+from app.database import Database, create_indexes
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def benchmark_database(keep: bool = False):
+    """Point the app at an empty throwaway database with the API's indexes."""
+    Database.client = AsyncIOMotorClient(settings.mongodb_url)
+    Database.db = Database.client[f"{settings.database_name}_benchmark"]
+    try:
+        await Database.client.drop_database(Database.db.name)
+        await create_indexes()
+        yield Database.db
+    finally:
+        if not keep:
+            await Database.client.drop_database(Database.db.name)
+        Database.client.close()
+
+
+async def time_runs(runs: int, call) -> tuple:
+    """Await call() runs times; return (timings in ms, last result)."""
+    timings_ms = []
+    result = None
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = await call()
+        timings_ms.append((time.perf_counter() - started) * 1000)
+    return timings_ms, result
+
+
+def summarize(label: str, timings_ms: list, matches: int):
+    """Log latency percentiles for one scenario."""
+    timings_ms = sorted(timings_ms)
+    p95 = timings_ms[max(int(len(timings_ms) * 0.95) - 1, 0)]
+    logger.info(
+        f"{label:<32} matches={matches:<6} "
+        f"p50={statistics.median(timings_ms):7.2f}ms p95={p95:7.2f}ms max={timings_ms[-1]:7.2f}ms"
+    )
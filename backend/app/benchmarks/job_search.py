@@ -0,0 +1,119 @@
+"""
+Benchmark: job search on a synthetic 50k-job corpus
+
+Seeds a throwaway database with generated jobs, creates the same indexes as
+the API and times JobService.search_jobs and JobService.get_all_jobs for a
+mix of queries and filters. The database is dropped afterwards unless --keep
+is given.
+
+Usage (from the backend directory, MongoDB running):
+    python -m app.benchmarks.job_search [--jobs 50000] [--runs 50] [--keep]
+"""
+
+import argparse
+import asyncio
+import logging
+import random
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+
+from app.benchmarks.common import benchmark_database, time_runs, summarize
+from app.database import Database
+from app.models.job import JobStatus, JobType, ExperienceLevel
+from app.services.job_service import JobService
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+ROLES = ["Engineer", "Developer", "Analyst", "Designer", "Manager", "Consultant", "Architect", "Specialist"]
+AREAS = ["Backend", "Frontend", "Data", "Cloud", "Mobile", "Security", "Platform", "QA", "Machine Learning", "DevOps"]
+SENIORITY = ["Junior", "Senior", "Lead", "Principal", "Staff", ""]
+SKILLS = [
+    "python", "java", "javascript", "react", "fastapi", "mongodb", "postgresql", "kubernetes",
+    "docker", "aws", "azure", "terraform", "go", "rust", "typescript", "spark", "kafka", "figma"
+]
+DEPARTMENTS = ["Engineering", "Product", "Data", "Design", "Operations", "Sales"]
+LOCATIONS = ["Bangalore, India", "Pune, India", "Remote", "London, UK", "Berlin, Germany", "New York, USA"]
+FILLER = (
+    "You will collaborate with cross-functional teams to design, build and operate "
+    "reliable services that help our customers hire faster."
+)
+
+QUERIES = [
+    ("single term", "python", {}),
+    ("two terms", "kubernetes terraform", {}),
+    ("phrase", '"machine learning"', {}),
+    ("term + filters", "react", {"job_type": JobType.FULL_TIME, "experience_level": ExperienceLevel.SENIOR}),
+    ("term + location", "engineer", {"location": "india"}),
+    ("broad term, deep page", "engineer", {"page": 20}),
+]
+
+
+def generate_job(rng: random.Random, posted_by: ObjectId, now: datetime) -> dict:
+    """Build one synthetic job document shaped like JobInDB."""
+    area = rng.choice(AREAS)
+    skills = rng.sample(SKILLS, k=rng.randint(2, 6))
+    created_at = now - timedelta(minutes=rng.randint(0, 60 * 24 * 365))
+    return {
+        "title": " ".join(part for part in [rng.choice(SENIORITY), area, rng.choice(ROLES)] if part),
+        "description": f"{area} role. {FILLER} Stack: {', '.join(skills)}.",
+        "requirements": [f"{rng.randint(1, 10)}+ years with {skill}" for skill in skills[:3]],
+        "responsibilities": [f"Own {area.lower()} features end to end"],
+        "job_type": rng.choice(list(JobType)).value,
+        "experience_level": rng.choice(list(ExperienceLevel)).value,
+        "location": rng.choice(LOCATIONS),
+        "salary_range": None,
+        "department": rng.choice(DEPARTMENTS),
+        "status": rng.choices([JobStatus.ACTIVE.value, JobStatus.CLOSED.value], weights=[4, 1])[0],
+        "skills_required": skills,
+        "benefits": [],
+        "posted_by": str(posted_by),
+        "applications_count": rng.randint(0, 200),
+        "created_at": created_at,
+        "updated_at": created_at,
+        "posted_date": created_at,
+        "closing_date": None
+    }
+
+
+async def seed(job_count: int):
+    """Insert job_count synthetic jobs in batches."""
+    rng = random.Random(42)
+    posted_by = ObjectId()
+    now = datetime.utcnow()
+    batch_size = 5000
+    for offset in range(0, job_count, batch_size):
+        batch = [generate_job(rng, posted_by, now) for _ in range(min(batch_size, job_count - offset))]
+        await Database.db.jobs.insert_many(batch, ordered=False)
+    logger.info(f"Seeded {job_count} jobs")
+
+
+async def run_benchmark(job_count: int, runs: int, keep: bool):
+    """Seed the corpus and time each scenario."""
+    async with benchmark_database(keep):
+        await seed(job_count)
+
+        job_service = JobService()
+        for label, query, options in QUERIES:
+            timings_ms, result = await time_runs(
+                runs, lambda: job_service.search_jobs(query, status=JobStatus.ACTIVE, **options)
+            )
+            summarize(f"search: {label}", timings_ms, result.total)
+
+        # Baseline: the non-search listing with facets, first page and a keyset page
+        first_page = await job_service.get_all_jobs(status=JobStatus.ACTIVE)
+        for label, cursor in [("list: first page", None), ("list: keyset page", first_page.next_cursor)]:
+            timings_ms, result = await time_runs(
+                runs, lambda: job_service.get_all_jobs(status=JobStatus.ACTIVE, cursor=cursor)
+            )
+            summarize(label, timings_ms, result.total)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark job search on a synthetic corpus")
+    parser.add_argument("--jobs", type=int, default=50000, help="Number of jobs to generate")
+    parser.add_argument("--runs", type=int, default=50, help="Timed runs per scenario")
+    parser.add_argument("--keep", action="store_true", help="Keep the benchmark database afterwards")
+    args = parser.parse_args()
+    asyncio.run(run_benchmark(args.jobs, args.runs, args.keep))
@@ -0,0 +1,101 @@
+"""
+Benchmark: resume skill search on a synthetic 200k-resume corpus
+
+Seeds a throwaway database with resume_index documents built by the same
+build_index_fields() the extraction pipeline uses, from generated resume text
+(skills mixed into Zipf-distributed filler words), spread over 200 jobs. It
+then times ApplicationService.search_resumes for term, boolean and phrase
+queries, both across all applications and scoped to one job. The target is
+p95 under 100ms; it has not been measured yet, so run this against a
+representative MongoDB deployment before relying on it.
+
+Usage (from the backend directory, MongoDB running):
+    python -m app.benchmarks.resume_search [--resumes 200000] [--runs 50] [--keep]
+"""
+
+import argparse
+import asyncio
+import logging
+import random
+
+from bson import ObjectId
+from pymongo import InsertOne
+
+from app.benchmarks.common import benchmark_database, time_runs, summarize
+from app.database import Database
+from app.services.application_service import ApplicationService
+from app.utils.resume_text import build_index_fields, detect_skills
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SKILLS = [
+    "Python", "Java", "JavaScript", "React", "Node.js", "Django", "Flask", "FastAPI", "MongoDB",
+    "PostgreSQL", "Kubernetes", "Docker", "AWS", "Azure", "Terraform", "Go", "Rust", "C++", "C#",
+    "Machine Learning", "Deep Learning", "Natural Language Processing", "Data Analysis", "Spark",
+    "Kafka", "Figma", "Project Management", "Agile", "Scrum", "PHP", "Ruby on Rails", "TypeScript"
+]
+VOCABULARY_SIZE = 8000
+JOB_COUNT = 200
+WORDS_PER_RESUME = 600
+
+QUERIES = [
+    ("term", "python"),
+    ("two terms", "kubernetes terraform"),
+    ("boolean", "python (django OR flask) -php"),
+    ("phrase", '"machine learning"'),
+    ("long phrase", '"natural language processing" python'),
+    ("rare term", "rust"),
+]
+
+
+def generate_resume(rng: random.Random, words: list, weights: list) -> str:
+    """Filler words with a handful of skills mixed in."""
+    tokens = rng.choices(words, weights=weights, k=WORDS_PER_RESUME)
+    for skill in rng.sample(SKILLS, k=rng.randint(3, 10)):
+        tokens.insert(rng.randrange(len(tokens)), skill)
+    return " ".join(tokens)
+
+
+async def seed(resume_count: int) -> list:
+    """Insert resume_count resume_index documents in batches; return the job IDs."""
+    rng = random.Random(42)
+    words = [f"word{index}" for index in range(VOCABULARY_SIZE)]
+    weights = [1 / (rank + 1) for rank in range(VOCABULARY_SIZE)]
+    job_ids = [str(ObjectId()) for _ in range(JOB_COUNT)]
+    batch_size = 2000
+    for offset in range(0, resume_count, batch_size):
+        batch = []
+        for _ in range(min(batch_size, resume_count - offset)):
+            text = generate_resume(rng, words, weights)
+            batch.append(InsertOne({
+                "_id": str(ObjectId()),
+                "job_id": rng.choice(job_ids),
+                **build_index_fields(text, detect_skills(text, SKILLS))
+            }))
+        await Database.db.resume_index.bulk_write(batch, ordered=False)
+    logger.info(f"Seeded {resume_count} resumes over {JOB_COUNT} jobs")
+    return job_ids
+
+
+async def run_benchmark(resume_count: int, runs: int, keep: bool):
+    """Seed the corpus and time each query, unscoped and scoped to a job."""
+    async with benchmark_database(keep):
+        job_ids = await seed(resume_count)
+
+        application_service = ApplicationService()
+        for scope, job_id in [("all", None), ("job", job_ids[0])]:
+            for label, query in QUERIES:
+                timings_ms, result = await time_runs(
+                    runs, lambda: application_service.search_resumes(query, job_id=job_id, limit=50)
+                )
+                summarize(f"{scope}: {label}", timings_ms, len(result.results))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark resume skill search on a synthetic corpus")
+    parser.add_argument("--resumes", type=int, default=200000, help="Number of resumes to generate")
+    parser.add_argument("--runs", type=int, default=50, help="Timed runs per scenario")
+    parser.add_argument("--keep", action="store_true", help="Keep the benchmark database afterwards")
+    args = parser.parse_args()
+    asyncio.run(run_benchmark(args.resumes, args.runs, args.keep))
@@ -0,0 +1,93 @@
+"""
+Benchmark: concurrent resume uploads
+
+Runs save_upload_file for many concurrent uploads (50 x 20MB by default) into
+a temporary upload directory and reports wall time and peak Python heap
+(tracemalloc). The same uploads are also saved the old way, reading each file
+into memory in one call, for comparison. Needs no database.
+
+Usage (from the backend directory):
+    python -m app.benchmarks.upload [--uploads 50] [--size-mb 20]
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import shutil
+import tempfile
+import time
+import tracemalloc
+
+import aiofiles
+from fastapi import UploadFile
+
+from app.config import settings
+from app.utils.file_upload import save_upload_file
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def make_upload(size: int) -> UploadFile:
+    """A PDF-looking UploadFile backed by a temp file, like Starlette's spooled uploads."""
+    spooled = tempfile.SpooledTemporaryFile(max_size=1024 * 1024)
+    spooled.write(b"%PDF-1.7\n")
+    block = os.urandom(1024 * 1024)
+    remaining = size - 9
+    while remaining > 0:
+        spooled.write(block[:remaining])
+        remaining -= len(block)
+    spooled.seek(0)
+    return UploadFile(file=spooled, filename="resume.pdf")
+
+
+async def save_whole_file(upload_file: UploadFile) -> str:
+    """The previous implementation's approach: one read() of the entire file."""
+    filename = f"whole_{id(upload_file)}.pdf"
+    async with aiofiles.open(os.path.join(settings.upload_dir, filename), 'wb') as f:
+        content = await upload_file.read()
+        await f.write(content)
+    return filename
+
+
+async def measure(label: str, save, uploads: int, size: int):
+    """Save uploads concurrently with one implementation and log time and peak memory."""
+    files = [make_upload(size) for _ in range(uploads)]
+
+    tracemalloc.start()
+    started = time.perf_counter()
+    await asyncio.gather(*(save(upload_file) for upload_file in files))
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    for upload_file in files:
+        await upload_file.close()
+    logger.info(
+        f"{label:<20} {uploads} x {size / 2**20:.0f}MB in {elapsed:6.2f}s, "
+        f"peak heap {peak / 2**20:8.1f}MB"
+    )
+
+
+async def run_benchmark(uploads: int, size_mb: int):
+    """Run both implementations against a throwaway upload directory."""
+    upload_dir = tempfile.mkdtemp(prefix="upload_benchmark_")
+    original_dir, original_limit = settings.upload_dir, settings.max_file_size
+    settings.upload_dir = upload_dir
+    settings.max_file_size = (size_mb + 1) * 1024 * 1024
+    try:
+        size = size_mb * 1024 * 1024
+        await measure("chunked (current)", save_upload_file, uploads, size)
+        await measure("whole-file read", save_whole_file, uploads, size)
+    finally:
+        settings.upload_dir, settings.max_file_size = original_dir, original_limit
+        shutil.rmtree(upload_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark concurrent resume uploads")
+    parser.add_argument("--uploads", type=int, default=50, help="Number of concurrent uploads")
+    parser.add_argument("--size-mb", type=int, default=20, help="Size of each upload in MB")
+    args = parser.parse_args()
+    asyncio.run(run_benchmark(args.uploads, args.size_mb))
@@ -1,7 +1,7 @@
 """Application settings and configuration."""
 
 import os
-from typing import List
+from typing import List, Optional
 from pydantic_settings import BaseSettings
 
 
@@ -24,6 +24,34 @@ class Settings(BaseSettings):
     upload_dir: str = "uploads"
     max_upload_size: int = 10 * 1024 * 1024  # 10MB
     max_file_size: int = 10 * 1024 * 1024  # 10MB (for file upload validation)
+    upload_chunk_size: int = 1024 * 1024  # Uploads are streamed to disk in chunks of this size
+    # Internal nginx location aliasing upload_dir (e.g. "/protected-uploads/"); when set,
+    # authorized downloads are handed to nginx with X-Accel-Redirect instead of sent by the API
+    download_accel_redirect_prefix: Optional[str] = None
+    
+    # Delta Sync Settings
+    tombstone_retention_days: int = 30  # Deletions older than this are forgotten
+    
+    # Job Cache Settings
+    job_cache_size: int = 1000  # Max jobs cached per worker process
+    job_cache_ttl_seconds: int = 300
+    
+    # Active Jobs Feed Settings
+    active_jobs_feed_ttl_seconds: int = 60  # Bounds staleness of other workers' snapshots
+    active_jobs_feed_max_age: int = 30  # Cache-Control max-age sent to clients (private: the feed requires login)
+    
+    # Resume Text Extraction Settings
+    resume_extraction_processes: int = 2  # Extraction worker processes per API process
+    resume_extraction_max_attempts: int = 4
+    resume_extraction_retry_base_seconds: float = 10.0  # Doubled after each failed attempt
+    resume_extraction_timeout_seconds: int = 120
+    resume_text_max_chars: int = 200000  # Longer extracted text is truncated
+    
+    # Orphaned Resume Collection Settings
+    resume_gc_interval_seconds: int = 3600  # Between background passes; 0 disables the collector
+    resume_gc_files_per_pass: int = 20000  # Files scanned per pass before checkpointing
+    resume_gc_grace_hours: int = 24  # Files younger than this are never collected
+    resume_gc_quarantine_days: int = 7  # Orphans are kept in quarantine this long before deletion
     
     # Database Settings
     mongodb_url: str = os.getenv("MONGODB_URL", "mongodb://mongodb:27017")
@@ -33,6 +61,7 @@ class Settings(BaseSettings):
     jwt_secret: str = os.getenv("JWT_SECRET", "your-secret-key-change-in-production")
     jwt_algorithm: str = "HS256"
     access_token_expire_minutes: int = 60 * 24  # 24 hours
+    download_token_expire_seconds: int = 60  # Signed links for plain-navigation file downloads
     
     class Config:
         env_file = ".env"
@@ -36,21 +36,89 @@ async def create_indexes():
         await Database.db.users.create_index("username", unique=True)
         await Database.db.users.create_index("mobile", unique=True)
         
+        # Normalized search fields (see utils/search.py): prefix on tokens/mobile, fuzzy on trigrams
+        await Database.db.users.create_index([("role", 1), ("search_tokens", 1)])
+        await Database.db.users.create_index("search_tokens")
+        await Database.db.users.create_index("search_mobile")
+        await Database.db.users.create_index("search_trigrams")
+        
+        # User listings and candidate typeahead: keyset pages in username order,
+        # optionally within a role ((role, ...) also serves plain role filters)
+        await Database.db.users.create_index([("username_lower", 1), ("_id", 1)])
+        await Database.db.users.create_index([("role", 1), ("username_lower", 1), ("_id", 1)])
+        await Database.db.users.create_index([("role", 1), ("email_lower", 1)])
+        
         # Applications collection indexes
         # Allow candidates to apply to multiple jobs - no unique constraint on candidate_id or email
         await Database.db.applications.create_index("candidate_id")
         await Database.db.applications.create_index("email")
+        await Database.db.applications.create_index("job_id")
         # Ensure unique combination of candidate_id and job_id (one application per job per candidate)
         await Database.db.applications.create_index(
             [("candidate_id", 1), ("job_id", 1)], 
             unique=True
         )
         
+        # Normalized search fields for candidate name/email/mobile search
+        await Database.db.applications.create_index("search_tokens")
+        await Database.db.applications.create_index("search_mobile")
+        await Database.db.applications.create_index("search_trigrams")
+        
+        # Delta sync: changed documents are paged by (updated_at, _id)
+        await Database.db.applications.create_index([("updated_at", 1), ("_id", 1)])
+        await Database.db.applications.create_index(
+            [("candidate_id", 1), ("updated_at", 1), ("_id", 1)]
+        )
+        
+        # Content-addressed resumes: find the applications sharing a blob
+        await Database.db.applications.create_index("resume_sha256", sparse=True)
+        
+        # Orphaned resume collection: reference checks by filename, quarantine expiry
+        await Database.db.applications.create_index("resume_filename", sparse=True)
+        await Database.db.resume_quarantine.create_index("quarantined_at")
+        await Database.db.resume_blobs.create_index("legacy_names", sparse=True)
+        
+        # Shortlists: a job's applications by skill match score
+        await Database.db.applications.create_index([("job_id", 1), ("match_score", -1), ("_id", 1)])
+        
+        # Top candidates: a job's applications by stage feedback scorecard
+        await Database.db.applications.create_index([("job_id", 1), ("scorecard.score", -1), ("_id", 1)])
+        
         # Stage assignment indexes on applications collection
         for stage_num in range(1, 8):
             await Database.db.applications.create_index(
                 f"stages.stage{stage_num}_assigned_to"
             )
+            await Database.db.applications.create_index(
+                [(f"stages.stage{stage_num}_assigned_to", 1), ("updated_at", 1)]
+            )
+        
+        # Jobs collection indexes: one per (filter, sort) combination of the job listing,
+        # with _id last for keyset pagination (descending sorts walk them backwards)
+        await Database.db.jobs.create_index([("created_at", 1), ("_id", 1)])
+        await Database.db.jobs.create_index([("title", 1), ("_id", 1)])
+        await Database.db.jobs.create_index([("status", 1), ("created_at", 1), ("_id", 1)])
+        await Database.db.jobs.create_index([("status", 1), ("title", 1), ("_id", 1)])
+        await Database.db.jobs.create_index([("department", 1), ("created_at", 1), ("_id", 1)])
+        await Database.db.jobs.create_index(
+            [("status", 1), ("department", 1), ("created_at", 1), ("_id", 1)]
+        )
+        await Database.db.jobs.create_index([("department", 1), ("title", 1), ("_id", 1)])
+        await Database.db.jobs.create_index(
+            [("status", 1), ("department", 1), ("title", 1), ("_id", 1)]
+        )
+        
+        # Weighted text index for job search (a collection can only have one text index)
+        await Database.db.jobs.create_index(
+            [
+                ("title", "text"),
+                ("skills_required", "text"),
+                ("requirements", "text"),
+                ("description", "text")
+            ],
+            name="job_text_search",
+            weights={"title": 10, "skills_required": 5, "requirements": 3, "description": 1}
+        )
         
         # Candidates collection indexes
         await Database.db.candidates.create_index("user_id", unique=True)
@@ -59,12 +127,20 @@ async def create_indexes():
         await Database.db.stage_assignments.create_index(
             [("application_id", 1), ("stage_number", 1)]
         )
+        await Database.db.stage_assignments.create_index(
+            [("application_id", 1), ("assigned_at", -1)]
+        )
         await Database.db.stage_assignments.create_index(
             [("assigned_to", 1), ("status", 1)]
         )
         await Database.db.stage_assignments.create_index("assigned_by")
         await Database.db.stage_assignments.create_index("deadline")
         
+        # Stage transition history (see StageWorkflowService)
+        await Database.db.stage_transitions.create_index(
+            [("application_id", 1), ("changed_at", 1)]
+        )
+        
         # Notifications collection indexes
         await Database.db.notifications.create_index(
             [("user_id", 1), ("is_read", 1)]
@@ -73,6 +149,26 @@ async def create_indexes():
             [("user_id", 1), ("created_at", -1)]
         )
         await Database.db.notifications.create_index("application_id")
+        await Database.db.notifications.create_index(
+            [("user_id", 1), ("updated_at", 1), ("_id", 1)]
+        )
+        
+        # Extracted resume text (keyed by application ID): pending work and reuse by content hash
+        await Database.db.resume_text.create_index("status")
+        await Database.db.resume_text.create_index([("resume_sha256", 1), ("status", 1)])
+        
+        # Resume search: the multikey terms index is the inverted index (see ResumeQuery)
+        await Database.db.resume_index.create_index([("job_id", 1), ("terms", 1)])
+        await Database.db.resume_index.create_index("terms")
+        
+        # Tombstones for delta sync, expired after the retention window
+        await Database.db.tombstones.create_index(
+            [("collection", 1), ("visible_to", 1), ("deleted_at", 1)]
+        )
+        await Database.db.tombstones.create_index(
+            "deleted_at",
+            expireAfterSeconds=settings.tombstone_retention_days * 24 * 3600
+        )
         
         logger.info("Database indexes created successfully.")
     except Exception as e:
@@ -1,11 +1,12 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
-import os
 
 from .config import settings
 from .database import connect_to_mongo, close_mongo_connection
 from .routes import auth, users, applications, jobs, interviews, assignments, feedback, notifications
+from .services.resume_extraction import resume_extraction_queue
+from .services.resume_gc import resume_garbage_collector
+from .services.match_scoring_service import job_rescore_queue
 
 # Create FastAPI app
 app = FastAPI(
@@ -23,19 +24,18 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Total-Count", "Content-Disposition", "Content-Range"],
 )
 
-# Mount static files for resume downloads
-if os.path.exists(settings.upload_dir):
-    app.mount("/uploads", StaticFiles(directory=settings.upload_dir), name="uploads")
-
 # Include routers
 app.include_router(auth.router)
 app.include_router(users.router)
+# Assignments before applications so /api/applications/my-assignments
+# isn't captured by /api/applications/{application_id}
+app.include_router(assignments.router)
 app.include_router(applications.router)
 app.include_router(jobs.router)
 app.include_router(interviews.router)
-app.include_router(assignments.router)
 app.include_router(feedback.router)
 app.include_router(notifications.router)
 
@@ -44,11 +44,20 @@ app.include_router(notifications.router)
 async def startup_event():
     """Initialize database connection on startup."""
     await connect_to_mongo()
+    
+    # Resume text extraction runs in a process pool; it picks up work left by the last run
+    resume_extraction_queue.start()
+    
+    # Orphaned resume files are collected in the background, a checkpointed slice at a time
+    resume_garbage_collector.start()
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
-    """Close database connection on shutdown."""
+    """Stop background work and close database connection on shutdown."""
+    await resume_extraction_queue.stop()
+    await resume_garbage_collector.stop()
+    await job_rescore_queue.stop()
     await close_mongo_connection()
 
 
@@ -0,0 +1,33 @@
+"""
+Migration: Store job_title and job_department on applications
+
+Application reads no longer look up the job to display its title. This
+migration fills the denormalized fields on existing applications and can be
+re-run at any time as a consistency check: it only rewrites applications
+whose stored values differ from their job.
+"""
+
+import asyncio
+import logging
+
+from app.database import connect_to_mongo, close_mongo_connection
+from app.services.job_service import JobService
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+async def run_migration():
+    """Copy title/department from every job onto its applications."""
+    # Same connection as the API; also ensures the job_id index exists
+    await connect_to_mongo()
+    
+    try:
+        repaired = await JobService().repair_application_job_fields()
+        logger.info(f"Updated job fields on {repaired} applications")
+    finally:
+        await close_mongo_connection()
+
+
+if __name__ == "__main__":
+    asyncio.run(run_migration())
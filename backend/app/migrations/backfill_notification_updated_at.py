@@ -0,0 +1,39 @@
+"""
+Migration: Set updated_at on notifications created before delta sync
+
+Notification delta sync pages by (updated_at, _id), but notifications created
+before updated_at was introduced don't have the field, so no sync returns
+them until this runs. This migration sets updated_at to created_at on those
+notifications. It only touches notifications without updated_at, so it is
+safe to run repeatedly.
+
+Usage (from the backend directory):
+    python -m app.migrations.backfill_notification_updated_at
+"""
+
+import asyncio
+import logging
+
+from app.database import connect_to_mongo, close_mongo_connection, get_database
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+async def run_migration():
+    """Copy created_at into updated_at on every notification lacking it."""
+    await connect_to_mongo()
+    
+    try:
+        db = get_database()
+        result = await db.notifications.update_many(
+            {"updated_at": None},
+            [{"$set": {"updated_at": {"$ifNull": ["$created_at", "$$NOW"]}}}]
+        )
+        logger.info(f"Set updated_at on {result.modified_count} notifications")
+    finally:
+        await close_mongo_connection()
+
+
+if __name__ == "__main__":
+    asyncio.run(run_migration())
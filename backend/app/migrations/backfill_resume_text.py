@@ -0,0 +1,100 @@
+"""
+Migration: Extract text from resumes uploaded before background extraction
+
+New applications queue their resume for extraction when they are created
+(see app/services/resume_extraction.py). This command creates pending
+resume_text documents for every application with a resume but no extraction
+yet and processes them with the same process pool, retries and backoff as
+the API, then prints the queue metrics. With --retry-failed it also retries
+extractions that previously failed for good.
+
+Usage (from the backend directory):
+    python -m app.migrations.backfill_resume_text [--retry-failed]
+"""
+
+import argparse
+import asyncio
+import logging
+from datetime import datetime
+
+from pymongo.errors import BulkWriteError
+
+from app.database import connect_to_mongo, close_mongo_connection, get_database
+from app.services.resume_extraction import resume_extraction_queue
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 1000
+
+
+async def create_pending_documents(db) -> int:
+    """Insert a pending resume_text document for each application with a resume and none yet."""
+    created = 0
+    batch = []
+
+    async def flush():
+        nonlocal created
+        try:
+            result = await db.resume_text.insert_many(batch, ordered=False)
+            created += len(result.inserted_ids)
+        except BulkWriteError as e:
+            # Duplicates are applications the API queued meanwhile
+            created += e.details["nInserted"]
+
+    now = datetime.utcnow()
+    cursor = db.applications.find(
+        {"resume_filename": {"$ne": None}},
+        {"job_id": 1, "resume_filename": 1, "resume_sha256": 1}
+    )
+    async for application in cursor:
+        batch.append({
+            "_id": str(application["_id"]),
+            "job_id": application["job_id"],
+            "resume_filename": application["resume_filename"],
+            "resume_sha256": application.get("resume_sha256"),
+            "status": "pending",
+            "attempts": 0,
+            "queued_at": now
+        })
+        if len(batch) >= BATCH_SIZE:
+            await flush()
+            batch = []
+
+    if batch:
+        await flush()
+    return created
+
+
+async def run_migration(retry_failed: bool):
+    """Queue every unextracted resume and wait for the pool to finish them."""
+    await connect_to_mongo()
+
+    try:
+        db = get_database()
+        created = await create_pending_documents(db)
+        logger.info(f"Created {created} pending resume extractions")
+        if retry_failed:
+            result = await db.resume_text.update_many(
+                {"status": "failed"},
+                {"$set": {"status": "pending", "attempts": 0}, "$unset": {"error": ""}}
+            )
+            logger.info(f"Retrying {result.modified_count} failed extractions")
+
+        resume_extraction_queue.start()
+        try:
+            queued = await resume_extraction_queue.recover()
+            logger.info(f"Extracting {queued} resumes")
+            await resume_extraction_queue.drain()
+        finally:
+            await resume_extraction_queue.stop()
+        logger.info(f"Done: {resume_extraction_queue.stats()}")
+    finally:
+        await close_mongo_connection()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Extract text from existing resumes")
+    parser.add_argument("--retry-failed", action="store_true", help="Also retry extractions that failed")
+    args = parser.parse_args()
+    asyncio.run(run_migration(args.retry_failed))
@@ -0,0 +1,63 @@
+"""
+Migration: Add normalized search fields to applications and users
+
+Candidate and user search match against search_tokens, search_trigrams and
+search_mobile (see app/utils/search.py); users also get username_lower and
+email_lower for the candidate typeahead. New documents get them on insert;
+this migration computes them for existing documents. It recomputes every
+document, so it can be re-run after changing the normalization rules.
+"""
+
+import asyncio
+import logging
+
+from pymongo import UpdateOne
+
+from app.database import connect_to_mongo, close_mongo_connection, get_database
+from app.utils.search import build_search_fields, build_user_search_fields
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 1000
+
+
+async def backfill(collection, name_field: str, build_fields) -> int:
+    """Recompute search fields for every document of a collection in batches."""
+    updated = 0
+    batch = []
+    cursor = collection.find({}, {name_field: 1, "email": 1, "mobile": 1})
+    async for document in cursor:
+        fields = build_fields(document.get(name_field), document.get("email"), document.get("mobile"))
+        batch.append(UpdateOne({"_id": document["_id"]}, {"$set": fields}))
+        if len(batch) >= BATCH_SIZE:
+            result = await collection.bulk_write(batch, ordered=False)
+            updated += result.modified_count
+            batch = []
+    
+    if batch:
+        result = await collection.bulk_write(batch, ordered=False)
+        updated += result.modified_count
+    return updated
+
+
+async def run_migration():
+    """Backfill search fields on applications (name) and users (username, plus typeahead fields)."""
+    # Same connection as the API; also creates the search indexes
+    await connect_to_mongo()
+    
+    try:
+        db = get_database()
+        applications = await backfill(
+            db.applications, "name",
+            lambda name, email, mobile: build_search_fields(name, email, mobile=mobile)
+        )
+        logger.info(f"Updated search fields on {applications} applications")
+        users = await backfill(db.users, "username", build_user_search_fields)
+        logger.info(f"Updated search fields on {users} users")
+    finally:
+        await close_mongo_connection()
+
+
+if __name__ == "__main__":
+    asyncio.run(run_migration())
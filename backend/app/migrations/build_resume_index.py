@@ -0,0 +1,91 @@
+"""
+Migration: Build the resume search index from already extracted resume text
+
+Resume search (GET /api/applications/resume-search) queries resume_index,
+which background extraction fills in for each resume it processes. This
+migration (re)builds the entries for resumes extracted before that, or after
+changing the tokenization in app/utils/resume_text.py. Terms are computed in
+a process pool, one batch at a time.
+"""
+
+import asyncio
+import logging
+from concurrent.futures import ProcessPoolExecutor
+
+from bson import ObjectId
+from pymongo import ReplaceOne
+
+from app.database import connect_to_mongo, close_mongo_connection, get_database
+from app.utils.resume_text import build_index_fields
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 500
+
+
+def _index_fields(document: dict) -> dict:
+    return build_index_fields(document.get("text") or "", document.get("skills") or [])
+
+
+async def index_batch(db, executor: ProcessPoolExecutor, batch: list) -> int:
+    """Compute and store resume_index documents for one batch of resume_text documents."""
+    # Older resume_text documents don't carry job_id; take it from the applications
+    missing = [ObjectId(document["_id"]) for document in batch if not document.get("job_id")]
+    job_ids = {}
+    if missing:
+        async for application in db.applications.find({"_id": {"$in": missing}}, {"job_id": 1}):
+            job_ids[str(application["_id"])] = application["job_id"]
+
+    loop = asyncio.get_running_loop()
+    fields = await asyncio.gather(*(
+        loop.run_in_executor(executor, _index_fields, document) for document in batch
+    ))
+    operations = [
+        ReplaceOne(
+            {"_id": document["_id"]},
+            {"job_id": document.get("job_id") or job_ids.get(document["_id"]), **index_fields},
+            upsert=True
+        )
+        for document, index_fields in zip(batch, fields)
+    ]
+    await db.resume_index.bulk_write(operations, ordered=False)
+    return len(operations)
+
+
+async def run_migration():
+    """Rebuild resume_index for every completed extraction."""
+    await connect_to_mongo()
+
+    try:
+        db = get_database()
+        indexed = 0
+        batch = []
+        with ProcessPoolExecutor() as executor:
+            cursor = db.resume_text.find({"status": "done"}, {"job_id": 1, "text": 1, "skills": 1})
+            async for document in cursor:
+                batch.append(document)
+                if len(batch) >= BATCH_SIZE:
+                    indexed += await index_batch(db, executor, batch)
+                    batch = []
+                    logger.info(f"Indexed {indexed} resumes")
+
+            if batch:
+                indexed += await index_batch(db, executor, batch)
+
+        # Entries whose application no longer has extracted text
+        removed = 0
+        async for entry in db.resume_index.aggregate([
+            {"$lookup": {"from": "resume_text", "localField": "_id", "foreignField": "_id", "as": "source"}},
+            {"$match": {"source": {"$size": 0}}},
+            {"$project": {"_id": 1}}
+        ]):
+            await db.resume_index.delete_one({"_id": entry["_id"]})
+            removed += 1
+        logger.info(f"Indexed {indexed} resumes, removed {removed} stale index entries")
+    finally:
+        await close_mongo_connection()
+
+
+if __name__ == "__main__":
+    asyncio.run(run_migration())
@@ -0,0 +1,63 @@
+"""
+Migration: Compute scorecards for existing applications
+
+Applications carry a scorecard summarizing their stage feedback, refreshed on
+every stage submission (see app/services/scorecard_service.py). This
+migration computes it for applications whose feedback was submitted before
+that, or after changing the stage weights in app/utils/scorecard.py. It
+recomputes every scorecard, so it is safe to re-run.
+"""
+
+import asyncio
+import logging
+
+from pymongo import UpdateOne
+
+from app.database import connect_to_mongo, close_mongo_connection, get_database
+from app.utils.scorecard import build_scorecard
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 1000
+
+
+async def store_batch(db, batch: list) -> int:
+    """Write the scorecards of one batch of applications."""
+    operations = []
+    for application in batch:
+        scorecard = build_scorecard(application.get("stages"))
+        # Skipped if a submission changed the stages meanwhile; it refreshed the scorecard itself.
+        # updated_at moves too, so delta sync clients receive the new scorecards
+        operations.append(UpdateOne(
+            {"_id": application["_id"], "stages": application.get("stages")},
+            {"$set": {"scorecard": scorecard, "updated_at": scorecard["updated_at"]}}
+        ))
+    result = await db.applications.bulk_write(operations, ordered=False)
+    return result.modified_count
+
+
+async def run_migration():
+    """Compute the scorecard of every application."""
+    await connect_to_mongo()
+
+    try:
+        db = get_database()
+        updated = 0
+        batch = []
+        async for application in db.applications.find({}, {"stages": 1}):
+            batch.append(application)
+            if len(batch) >= BATCH_SIZE:
+                updated += await store_batch(db, batch)
+                batch = []
+                logger.info(f"Computed {updated} scorecards")
+
+        if batch:
+            updated += await store_batch(db, batch)
+        logger.info(f"Computed {updated} scorecards")
+    finally:
+        await close_mongo_connection()
+
+
+if __name__ == "__main__":
+    asyncio.run(run_migration())
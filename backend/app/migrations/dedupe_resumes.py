@@ -0,0 +1,143 @@
+"""
+Migration: Move uploaded resumes into the content-addressed blob store
+
+Resumes used to be saved directly in the upload directory under a timestamped
+name, so the same file uploaded for several jobs was stored once per
+application. This migration hashes each of those files, moves it to its
+content-addressed path (resumes/ab/cd/<sha256>.<ext>), points applications at
+the new path and their resume_sha256, and drops duplicates. It then rebuilds
+the reference counts in resume_blobs from the applications.
+
+Each file is linked into the blob store and its applications are updated
+before the old name is removed, so resume links keep working throughout.
+Files no application refers to are moved too but get no resume_blobs record.
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import shutil
+from datetime import datetime
+
+from pymongo import UpdateOne
+
+from app.config import settings
+from app.database import connect_to_mongo, close_mongo_connection, get_database
+from app.utils.file_upload import FILE_SIGNATURES, blob_filename
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+HASH_CHUNK_SIZE = 1024 * 1024
+BATCH_SIZE = 1000
+
+
+def hash_file(path: str) -> str:
+    """SHA-256 of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def place_blob(source: str, target: str) -> bool:
+    """
+    Make ``target`` a copy of ``source`` unless it already exists.
+
+    Hard links are used where possible so nothing is copied; the source is
+    left in place for the caller to remove. Returns True if a new blob was created.
+    """
+    if os.path.exists(target):
+        return False
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    temp_path = f"{target}.part"
+    try:
+        os.link(source, temp_path)
+    except OSError:
+        shutil.copyfile(source, temp_path)
+    os.replace(temp_path, target)
+    return True
+
+
+async def move_legacy_files(db) -> dict:
+    """Move every top-level upload into the blob store and repoint its applications."""
+    stats = {"files": 0, "duplicates": 0, "applications": 0, "bytes_freed": 0}
+    for entry in os.scandir(settings.upload_dir):
+        extension = os.path.splitext(entry.name)[1].lower()
+        if not entry.is_file() or extension not in FILE_SIGNATURES:
+            continue
+
+        sha256 = hash_file(entry.path)
+        filename = blob_filename(sha256, extension)
+        if not place_blob(entry.path, os.path.join(settings.upload_dir, filename)):
+            stats["duplicates"] += 1
+            stats["bytes_freed"] += entry.stat().st_size
+
+        result = await db.applications.update_many(
+            {"resume_filename": entry.name},
+            {"$set": {"resume_filename": filename, "resume_sha256": sha256}}
+        )
+        os.remove(entry.path)
+        stats["files"] += 1
+        stats["applications"] += result.modified_count
+    return stats
+
+
+async def rebuild_reference_counts(db) -> int:
+    """Set each blob's ref_count to the number of applications using it."""
+    now = datetime.utcnow()
+    batch = []
+    blobs = 0
+    pipeline = [
+        {"$match": {"resume_sha256": {"$ne": None}}},
+        {"$group": {"_id": "$resume_sha256", "filename": {"$first": "$resume_filename"}, "ref_count": {"$sum": 1}}}
+    ]
+    async for group in db.applications.aggregate(pipeline):
+        file_path = os.path.join(settings.upload_dir, group["filename"])
+        size = os.path.getsize(file_path) if os.path.exists(file_path) else 0
+        batch.append(UpdateOne(
+            {"_id": group["_id"]},
+            {
+                "$set": {"ref_count": group["ref_count"], "filename": group["filename"], "size": size, "updated_at": now},
+                "$unset": {"deleting_at": ""},
+                "$setOnInsert": {"created_at": now}
+            },
+            upsert=True
+        ))
+        blobs += 1
+        if len(batch) >= BATCH_SIZE:
+            await db.resume_blobs.bulk_write(batch, ordered=False)
+            batch = []
+
+    if batch:
+        await db.resume_blobs.bulk_write(batch, ordered=False)
+    return blobs
+
+
+async def run_migration():
+    """Dedupe the upload directory and rebuild resume_blobs."""
+    await connect_to_mongo()
+
+    try:
+        db = get_database()
+        stats = await move_legacy_files(db)
+        logger.info(
+            f"Moved {stats['files']} files ({stats['duplicates']} duplicates, "
+            f"{stats['bytes_freed']} bytes freed); repointed {stats['applications']} applications"
+        )
+        blobs = await rebuild_reference_counts(db)
+        logger.info(f"Rebuilt reference counts for {blobs} resume blobs")
+
+        missing = await db.applications.count_documents({
+            "resume_filename": {"$ne": None}, "resume_sha256": None
+        })
+        if missing:
+            logger.warning(f"{missing} applications refer to resumes that were not found in {settings.upload_dir}")
+    finally:
+        await close_mongo_connection()
+
+
+if __name__ == "__main__":
+    asyncio.run(run_migration())
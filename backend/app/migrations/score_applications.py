@@ -0,0 +1,40 @@
+"""
+Migration: Compute skill match scores for existing applications
+
+Applications get a match_score against their job when their resume is
+indexed, and a job's applications are rescored when its skills change (see
+app/services/match_scoring_service.py). This migration scores every job's
+applications once, e.g. after building the resume index for older resumes or
+after changing the scoring weights. It only rewrites scores that changed, so
+it is safe to re-run.
+"""
+
+import asyncio
+import logging
+
+from app.database import connect_to_mongo, close_mongo_connection, get_database
+from app.services.match_scoring_service import MatchScoringService
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+async def run_migration():
+    """Score the applications of every job."""
+    await connect_to_mongo()
+
+    try:
+        db = get_database()
+        scoring_service = MatchScoringService()
+        jobs = 0
+        updated = 0
+        async for job in db.jobs.find({}, {"_id": 1}):
+            updated += await scoring_service.score_job(str(job["_id"]))
+            jobs += 1
+        logger.info(f"Scored applications of {jobs} jobs; {updated} scores changed")
+    finally:
+        await close_mongo_connection()
+
+
+if __name__ == "__main__":
+    asyncio.run(run_migration())
@@ -0,0 +1,230 @@
+"""
+Migration: Move flat legacy uploads into the sharded blob store while the API runs
+
+Uploads saved before content-addressed storage sit directly in the upload
+directory, which slows down directory operations and backups as it grows.
+dedupe_resumes moves them in one go but has to run while no resumes are
+uploaded. This migration does the same move online, a throttled batch at a
+time:
+
+1. each file is hashed and its applications take references to the blob
+   (resume_blobs), before the blob exists, as ResumeBlobService.store does.
+   The flat name is recorded on the blob (legacy_names) in the same update,
+   so the references are never counted twice;
+2. the file is hard-linked (or copied) to resumes/ab/cd/<sha256>.<ext>;
+3. resume_filename and resume_sha256 are updated in bulk on the batch's
+   applications and on their resume_text documents;
+4. the flat file is removed only after --removal-delay seconds, so requests
+   that read the old name just before the update still find it.
+
+Files no application refers to are left for the resume garbage collector.
+An interrupted run is simply started again: files already moved are no
+longer flat, files whose references were taken but whose applications
+weren't repointed yet are repointed without being counted again, and flat
+files left behind after repointing are removed. The resume garbage
+collector skips flat names listed in legacy_names and leaves them to this
+migration. Run one instance at a time.
+
+Usage (from the backend directory):
+    python -m app.migrations.shard_legacy_uploads [--batch-size 200] [--pause 1.0] [--removal-delay 300]
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import time
+from collections import Counter, deque
+from datetime import datetime
+
+from pymongo import UpdateMany, UpdateOne
+from pymongo.errors import BulkWriteError
+
+from app.config import settings
+from app.database import connect_to_mongo, close_mongo_connection, get_database
+from app.migrations.dedupe_resumes import hash_file, place_blob
+from app.utils.file_upload import FILE_SIGNATURES, blob_filename
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def _remove(path: str):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+async def take_references(db, references: dict) -> set:
+    """
+    Add references to blobs for the applications using each flat file.
+
+    ``references`` maps each sha256 to (filename, size, {flat name: application
+    count}). A flat name's references are added together with recording the
+    name in the blob's legacy_names, so names counted by an earlier,
+    interrupted run are skipped. Returns the blobs that could not be referenced
+    because they are being deleted (retried next run).
+    """
+    counted = {
+        blob["_id"]: set(blob.get("legacy_names", []))
+        async for blob in db.resume_blobs.find({"_id": {"$in": list(references)}}, {"legacy_names": 1})
+    }
+    now = datetime.utcnow()
+    shas = []
+    operations = []
+    for sha256, (filename, size, names) in references.items():
+        new_names = {name: count for name, count in names.items() if name not in counted.get(sha256, ())}
+        if not new_names:
+            continue
+        shas.append(sha256)
+        operations.append(UpdateOne(
+            {"_id": sha256, "deleting_at": None, "legacy_names": {"$nin": list(new_names)}},
+            {
+                "$inc": {"ref_count": sum(new_names.values())},
+                "$addToSet": {"legacy_names": {"$each": list(new_names)}},
+                "$set": {"updated_at": now},
+                "$setOnInsert": {"filename": filename, "size": size, "created_at": now}
+            },
+            upsert=True
+        ))
+    if not operations:
+        return set()
+    try:
+        await db.resume_blobs.bulk_write(operations, ordered=False)
+    except BulkWriteError as e:
+        # Duplicate key: the blob's record exists but is claimed for deletion
+        return {shas[error["index"]] for error in e.details["writeErrors"]}
+    return set()
+
+
+async def migrate_batch(db, batch: list) -> dict:
+    """
+    Move one batch of flat files; return the paths to remove later and the batch's counts.
+    """
+    hashed = []
+    for entry_name, path, size, extension in batch:
+        sha256 = await asyncio.to_thread(hash_file, path)
+        hashed.append((entry_name, path, size, sha256, blob_filename(sha256, extension)))
+
+    # Applications per flat name, counted with one query
+    names = [entry_name for entry_name, *_ in hashed]
+    counts = Counter()
+    async for application in db.applications.find({"resume_filename": {"$in": names}}, {"resume_filename": 1}):
+        counts[application["resume_filename"]] += 1
+
+    references = {}
+    for entry_name, path, size, sha256, filename in hashed:
+        if counts[entry_name]:
+            references.setdefault(sha256, (filename, size, {}))[2][entry_name] = counts[entry_name]
+    busy = await take_references(db, references)
+
+    # Flat files an interrupted run already moved but didn't get to remove; the
+    # garbage collector leaves names in legacy_names to this migration
+    moved_before = {
+        (name, blob["_id"])
+        async for blob in db.resume_blobs.find({"legacy_names": {"$in": names}}, {"legacy_names": 1})
+        for name in blob["legacy_names"]
+    }
+
+    # Files no application uses stay where they are for the garbage collector to quarantine
+    moved = [
+        item for item in hashed
+        if (counts[item[0]] and item[3] not in busy) or (item[0], item[3]) in moved_before
+    ]
+    duplicates = 0
+    for entry_name, path, size, sha256, filename in moved:
+        if not await asyncio.to_thread(place_blob, path, os.path.join(settings.upload_dir, filename)):
+            duplicates += 1
+
+    repointed = 0
+    if moved:
+        application_result = await db.applications.bulk_write([
+            UpdateMany(
+                {"resume_filename": entry_name},
+                {"$set": {"resume_filename": filename, "resume_sha256": sha256}}
+            )
+            for entry_name, path, size, sha256, filename in moved
+        ], ordered=False)
+        repointed = application_result.modified_count
+        await db.resume_text.bulk_write([
+            UpdateMany(
+                {"resume_filename": entry_name},
+                {"$set": {"resume_filename": filename, "resume_sha256": sha256}}
+            )
+            for entry_name, path, size, sha256, filename in moved
+        ], ordered=False)
+
+    # Applications deleted between counting and repointing leave their reference
+    # behind; the resume garbage collector reclaims such blobs once unused
+    leaked = sum(counts[entry_name] for entry_name, *_ in moved) - repointed
+
+    return {
+        "paths": [path for entry_name, path, *_ in moved],
+        "files": len(moved),
+        "unreferenced": sum(1 for entry_name, path, size, sha256, _ in hashed
+                            if not counts[entry_name] and (entry_name, sha256) not in moved_before),
+        "busy": len(busy),
+        "duplicates": duplicates,
+        "applications": repointed,
+        "leaked_references": max(0, leaked),
+    }
+
+
+async def run_migration(batch_size: int, pause: float, removal_delay: float):
+    """Move every flat upload into the blob store, batch_size files at a time."""
+    await connect_to_mongo()
+
+    try:
+        db = get_database()
+        totals = Counter()
+        pending_removals = deque()
+
+        def remove_due(force: bool = False):
+            while pending_removals and (force or pending_removals[0][0] <= time.monotonic()):
+                for path in pending_removals.popleft()[1]:
+                    _remove(path)
+
+        async def flush(batch: list):
+            stats = await migrate_batch(db, batch)
+            pending_removals.append((time.monotonic() + removal_delay, stats.pop("paths")))
+            totals.update(stats)
+            logger.info(
+                f"Moved {totals['files']} files ({totals['duplicates']} duplicates, "
+                f"{totals['unreferenced']} unreferenced left in place); "
+                f"repointed {totals['applications']} applications"
+            )
+            remove_due()
+            await asyncio.sleep(pause)
+
+        batch = []
+        with os.scandir(settings.upload_dir) as entries:
+            for entry in entries:
+                extension = os.path.splitext(entry.name)[1].lower()
+                if not entry.is_file(follow_symlinks=False) or extension not in FILE_SIGNATURES:
+                    continue
+                batch.append((entry.name, entry.path, entry.stat().st_size, extension))
+                if len(batch) >= batch_size:
+                    await flush(batch)
+                    batch = []
+        if batch:
+            await flush(batch)
+
+        if pending_removals:
+            await asyncio.sleep(max(0.0, pending_removals[-1][0] - time.monotonic()))
+        remove_due(force=True)
+        if totals["busy"]:
+            logger.warning(f"{totals['busy']} blobs were being deleted; run again to retry their files")
+        if totals["leaked_references"]:
+            logger.info(f"{totals['leaked_references']} references belong to applications deleted meanwhile")
+    finally:
+        await close_mongo_connection()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Move flat legacy uploads into the sharded blob store")
+    parser.add_argument("--batch-size", type=int, default=200, help="Files moved per batch")
+    parser.add_argument("--pause", type=float, default=1.0, help="Seconds to wait between batches")
+    parser.add_argument("--removal-delay", type=float, default=300.0, help="Seconds before a moved flat file is removed")
+    args = parser.parse_args()
+    asyncio.run(run_migration(args.batch_size, args.pause, args.removal_delay))
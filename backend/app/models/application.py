@@ -1,8 +1,9 @@
 from pydantic import BaseModel, EmailStr, Field
-from typing import Optional, List, Literal
+from typing import Optional, List, Literal, Dict
 from enum import Enum
 from datetime import datetime
 from bson import ObjectId
+from .sync import DeltaResponseBase
 
 
 class CommunicationLevel(str, Enum):
@@ -40,6 +41,18 @@ class HRPanel(str, Enum):
     NIKITA = "Nikita"
 
 
+# Interview form of each stage, stored as stages.stage{N}_{name}
+STAGE_FORM_NAMES = {
+    1: "hr_screening",
+    2: "practical_lab",
+    3: "technical_interview",
+    4: "hr_round",
+    5: "bu_lead_interview",
+    6: "ceo_interview",
+    7: "final_recommendation",
+}
+
+
 # New models for Stage Assignment and Feedback System
 class StageFeedback(BaseModel):
     """Feedback model for stage assignments"""
@@ -211,6 +224,17 @@ class ApplicationStages(BaseModel):
     stage7_deadline: Optional[datetime] = None
 
 
+class Scorecard(BaseModel):
+    """Summary of an application's stage feedback, recomputed on each stage submission."""
+    score: Optional[float] = None  # Weighted average of the stage ratings (1-10)
+    stage_scores: Dict[str, float] = Field(default_factory=dict)  # Rating per stage number
+    stages_completed: int = 0
+    passed_stages: List[int] = Field(default_factory=list)
+    failed_stages: List[int] = Field(default_factory=list)
+    has_failed_stage: bool = False
+    updated_at: Optional[datetime] = None
+
+
 # Application Base
 class ApplicationBase(BaseModel):
     name: str = Field(..., max_length=100)
@@ -219,6 +243,7 @@ class ApplicationBase(BaseModel):
     job_id: str  # Reference to the job being applied for
     date_of_application: datetime
     resume_filename: Optional[str] = None
+    resume_sha256: Optional[str] = None  # Content hash of the resume blob; references resume_blobs
 
 
 class ApplicationCreate(ApplicationBase):
@@ -237,6 +262,8 @@ class ApplicationUpdate(BaseModel):
 class ApplicationInDB(ApplicationBase):
     id: str = Field(default_factory=lambda: str(ObjectId()))
     candidate_id: str
+    job_title: Optional[str] = None  # Denormalized from the job, kept in sync by JobService.update_job
+    job_department: Optional[str] = None
     stages: ApplicationStages = Field(default_factory=ApplicationStages)
     current_stage: int = Field(default=1, ge=1, le=7)  # Updated to 7 stages
     status: str = "pending"
@@ -252,7 +279,11 @@ class ApplicationResponse(ApplicationBase):
     status: str
     created_at: datetime
     updated_at: datetime
-    job_title: Optional[str] = None  # Will be populated from job data
+    job_title: Optional[str] = None  # Denormalized from job data
+    job_department: Optional[str] = None
+    match_score: Optional[float] = None  # Skill match against the job (0-1), set once the resume is indexed
+    matched_skills: List[str] = Field(default_factory=list)
+    scorecard: Optional[Scorecard] = None
 
     class Config:
         from_attributes = True
@@ -263,13 +294,62 @@ class ApplicationListResponse(BaseModel):
     name: str
     email: EmailStr
     job_id: str
-    job_title: str  # Will be populated from job data
+    job_title: str  # Denormalized from job data
+    job_department: Optional[str] = None
     current_stage: int
     status: str
     created_at: datetime
     updated_at: datetime
     date_of_application: datetime
     mobile: str
+    match_score: Optional[float] = None
+    matched_skills: List[str] = Field(default_factory=list)
+    scorecard: Optional[Scorecard] = None
+
+
+class ApplicationSearchResult(BaseModel):
+    id: str
+    name: str
+    email: EmailStr
+    mobile: str
+    job_id: str
+    job_title: Optional[str] = None
+    current_stage: int
+    status: str
+    match: Literal["prefix", "fuzzy"]
+    score: float  # 1.0 for prefix matches, trigram similarity for fuzzy ones
+
+
+class ResumeTextResponse(BaseModel):
+    """Text extracted from an application's resume in the background."""
+    application_id: str
+    status: Literal["pending", "processing", "done", "failed"]
+    attempts: int = 0
+    text: Optional[str] = None
+    truncated: bool = False
+    page_count: Optional[int] = None
+    skills: List[str] = Field(default_factory=list)
+    error: Optional[str] = None
+    extracted_at: Optional[datetime] = None
+
+
+class ResumeSearchHit(BaseModel):
+    application_id: str
+    score: float  # Matched query terms, with matches on detected skills counting extra
+    matched_terms: List[str]
+    matched_skills: List[str]
+
+
+class ResumeSearchResponse(BaseModel):
+    """Applications ranked by a skill query over their resume text."""
+    query: str
+    job_id: Optional[str] = None
+    results: List[ResumeSearchHit]
+
+
+class ApplicationDeltaResponse(DeltaResponseBase):
+    """Applications changed since the client's last sync."""
+    items: List[ApplicationListResponse]
 
 
 # Team Member Assignment Models
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional, List
+from typing import Optional, List, Dict
 from enum import Enum
 from datetime import datetime
 from bson import ObjectId
@@ -27,6 +27,12 @@ class ExperienceLevel(str, Enum):
     MANAGER = "manager"
 
 
+class JobSort(str, Enum):
+    NEWEST = "newest"
+    OLDEST = "oldest"
+    TITLE = "title"
+
+
 class JobBase(BaseModel):
     title: str = Field(..., min_length=1, max_length=200)
     description: str = Field(..., min_length=10, max_length=2000)
@@ -85,4 +91,18 @@ class JobListResponse(BaseModel):
     jobs: List[JobResponse]
     total: int
     page: int
-    limit: int 
\ No newline at end of file
+    limit: int
+    next_cursor: Optional[str] = None  # Pass as cursor to get the next page without skip
+    facets: Dict[str, Dict[str, int]] = {}  # Counts per status, department, job_type and experience_level 
+
+
+class JobSearchResult(JobResponse):
+    score: float  # Text relevance; results are ordered by it
+
+
+class JobSearchResponse(BaseModel):
+    jobs: List[JobSearchResult]
+    total: int
+    page: int
+    limit: int
+    facets: Dict[str, Dict[str, int]] = {}  # Counts per location, department, job_type and experience_level
\ No newline at end of file
@@ -1,19 +1,21 @@
 from pydantic import BaseModel, Field
-from typing import Optional, Literal
+from typing import Optional, Literal, List
 from datetime import datetime
 from bson import ObjectId
+from .sync import DeltaResponseBase
 
 
 class NotificationModel(BaseModel):
     """Model for notification data."""
     user_id: str  # User ID who receives the notification
-    type: Literal["assignment", "reassignment", "deadline_warning"]
+    type: Literal["assignment", "reassignment", "deadline_warning", "stage_review"]
     title: str
     message: str
     application_id: str
     stage_number: int = Field(..., ge=1, le=7)
     is_read: bool = False
     created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
     read_at: Optional[datetime] = None
     
     class Config:
@@ -33,6 +35,7 @@ class NotificationResponse(BaseModel):
     stage_number: int
     is_read: bool
     created_at: datetime
+    updated_at: Optional[datetime] = None
     read_at: Optional[datetime] = None
     
     # Additional fields for UI
@@ -46,10 +49,15 @@ class NotificationResponse(BaseModel):
         }
 
 
+class NotificationDeltaResponse(DeltaResponseBase):
+    """Notifications created or changed since the client's last sync."""
+    items: List[NotificationResponse]
+
+
 class NotificationCreate(BaseModel):
     """Request model for creating a notification."""
     user_id: str
-    type: Literal["assignment", "reassignment", "deadline_warning"]
+    type: Literal["assignment", "reassignment", "deadline_warning", "stage_review"]
     title: str
     message: str
     application_id: str
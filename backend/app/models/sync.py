@@ -0,0 +1,17 @@
+from pydantic import BaseModel
+from typing import Optional, List
+from datetime import datetime
+
+
+class Tombstone(BaseModel):
+    """Marker for a document deleted since the client's last sync."""
+    id: str
+    deleted_at: datetime
+
+
+class DeltaResponseBase(BaseModel):
+    """Common fields of incremental (delta-sync) list responses."""
+    deleted: List[Tombstone] = []
+    next_cursor: Optional[str] = None  # Set when more changed documents are available
+    server_time: datetime  # Send as updated_since on the next sync
+    reset: bool = False  # True when updated_since is older than tombstone retention; do a full reload
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr, Field
-from typing import Optional
+from typing import Optional, List, Literal
 from enum import Enum
 from datetime import datetime
 from bson import ObjectId
@@ -50,6 +50,33 @@ class UserResponse(UserBase):
         from_attributes = True
 
 
+class UserPage(BaseModel):
+    items: List[UserResponse]
+    next_cursor: Optional[str] = None  # Pass as cursor to load the next page
+
+
+class UserSearchResult(BaseModel):
+    id: str
+    username: str
+    email: EmailStr
+    mobile: str
+    role: UserRole
+    match: Literal["prefix", "fuzzy"]
+    score: float  # 1.0 for prefix matches, trigram similarity for fuzzy ones
+
+
+class CandidateOption(BaseModel):
+    id: str
+    username: str
+    email: EmailStr
+    mobile: str
+
+
+class CandidateOptionPage(BaseModel):
+    items: List[CandidateOption]
+    next_cursor: Optional[str] = None  # Pass as cursor to load the next page
+
+
 class UserLogin(BaseModel):
     email: EmailStr
     password: str
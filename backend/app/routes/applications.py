@@ -1,17 +1,27 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
-from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Query, Header, Response, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
+from typing import List, Optional, Union
 from datetime import datetime
 from ..models.application import (
-    ApplicationCreate, ApplicationResponse, ApplicationListResponse,
+    ApplicationCreate, ApplicationResponse, ApplicationListResponse, ApplicationDeltaResponse, ApplicationSearchResult, ResumeTextResponse, ResumeSearchResponse,
     HRScreening, PracticalLabTest, TechnicalInterview, HRRound,
     BULeadInterview, CEOInterview, FinalRecommendationOffer,
     StageAssignmentRequest, StageAssignmentResponse
 )
 from ..models.user import UserResponse, UserRole
-from ..services.application_service import ApplicationService
-from ..auth.dependencies import get_current_active_user, require_candidate, require_hr_or_admin, require_hr_team_or_admin, require_team_member
-from ..utils.file_upload import save_upload_file
+from ..services.application_service import ApplicationService, APPLICATION_EXPORT_COLUMNS
+from ..services.resume_blob_service import ResumeBlobService
+from ..services.resume_extraction import resume_extraction_queue
+from ..services.resume_gc import resume_garbage_collector
+from ..auth.dependencies import get_current_active_user, get_download_user, require_candidate, require_admin, require_hr_or_admin, require_hr_team_or_admin, require_team_member
+from ..utils.fields import parse_fields, trim_document
+from ..utils.delta_sync import parse_timestamp
+from ..utils.http_cache import make_etag, etag_matches, cache_headers, not_modified_response
+from ..utils.streaming import csv_lines, ndjson_lines, JSONArrayResponse
+from ..utils.file_download import stored_file_response
 import json
+import os
 
 router = APIRouter(prefix="/api/applications", tags=["Applications"])
 
@@ -45,10 +55,10 @@ async def apply_on_behalf(
             )
         
         # Save resume file if provided
-        resume_filename = None
+        stored_resume = None
         if resume:
             try:
-                resume_filename = await save_upload_file(resume)
+                stored_resume = await ResumeBlobService().store(resume)
             except HTTPException as e:
                 raise e
             except Exception as e:
@@ -64,10 +74,17 @@ async def apply_on_behalf(
             mobile=candidate.mobile,
             job_id=job_id,
             date_of_application=datetime.utcnow(),
-            resume_filename=resume_filename
+            resume_filename=stored_resume.filename if stored_resume else None,
+            resume_sha256=stored_resume.sha256 if stored_resume else None
         )
         
-        return await application_service.create_application(application_data, candidate_id)
+        try:
+            return await application_service.create_application(application_data, candidate_id)
+        except Exception:
+            # The resume's reference belongs to the application that was not created
+            if stored_resume:
+                await ResumeBlobService().release(stored_resume.sha256)
+            raise
         
     except HTTPException:
         raise
@@ -102,10 +119,10 @@ async def create_application(
             )
         
         # Save resume file if provided
-        resume_filename = None
+        stored_resume = None
         if resume:
             try:
-                resume_filename = await save_upload_file(resume)
+                stored_resume = await ResumeBlobService().store(resume)
             except HTTPException as e:
                 raise e
             except Exception as e:
@@ -121,10 +138,17 @@ async def create_application(
             mobile=mobile,
             job_id=job_id,
             date_of_application=parsed_date,
-            resume_filename=resume_filename
+            resume_filename=stored_resume.filename if stored_resume else None,
+            resume_sha256=stored_resume.sha256 if stored_resume else None
         )
         
-        return await application_service.create_application(application_data, current_user.id)
+        try:
+            return await application_service.create_application(application_data, current_user.id)
+        except Exception:
+            # The resume's reference belongs to the application that was not created
+            if stored_resume:
+                await ResumeBlobService().release(stored_resume.sha256)
+            raise
         
     except HTTPException:
         # Re-raise HTTP exceptions
@@ -136,24 +160,176 @@ async def create_application(
         )
 
 
-@router.get("/", response_model=List[ApplicationListResponse])
-async def get_applications(current_user: UserResponse = Depends(get_current_active_user)):
-    """Get applications based on user role."""
+@router.get("/", response_model=Union[List[ApplicationListResponse], ApplicationDeltaResponse])
+async def get_applications(
+    updated_since: Optional[str] = Query(None, description="Only return applications changed since this ISO timestamp"),
+    cursor: Optional[str] = Query(None, description="Resume a delta sync from the previous page's next_cursor"),
+    limit: int = Query(100, ge=1, le=500, description="Page size for delta sync"),
+    current_user: UserResponse = Depends(get_current_active_user)
+):
+    """
+    Get applications based on user role.
+    
+    With updated_since or cursor, returns only changed applications plus
+    tombstones for deleted ones (delta sync) instead of the full list.
+    """
     application_service = ApplicationService()
     
+    if updated_since or cursor:
+        return await application_service.get_applications_delta(
+            current_user.role,
+            current_user.id,
+            updated_since=parse_timestamp(updated_since) if updated_since else None,
+            cursor=cursor,
+            limit=limit
+        )
+    
+    # Full list is streamed as it is read instead of being built in memory
     if current_user.role == UserRole.CANDIDATE:
-        return await application_service.get_all_applications(current_user.role, current_user.id)
+        return JSONArrayResponse(application_service.iter_all_applications(current_user.role, current_user.id))
     else:
-        return await application_service.get_all_applications(current_user.role)
+        return JSONArrayResponse(application_service.iter_all_applications(current_user.role))
+
+
+@router.get("/export")
+async def export_applications(
+    request: Request,
+    format: str = Query("csv", pattern="^(csv|ndjson)$", description="Export format"),
+    updated_since: Optional[str] = Query(None, description="Only export applications changed since this ISO timestamp"),
+    job_id: Optional[str] = Query(None, description="Only export applications for this job"),
+    status_filter: Optional[str] = Query(None, alias="status", description="Only export applications with this status"),
+    batch_size: int = Query(1000, ge=100, le=10000, description="Mongo cursor batch size"),
+    current_user: UserResponse = Depends(require_hr_or_admin)
+):
+    """
+    Stream all applications as CSV or NDJSON (HR/Admin only).
+    
+    Rows include the job title, every stage status and a resume link, and are
+    written as they are read from the database.
+    """
+    application_service = ApplicationService()
+    rows = application_service.iter_applications_for_export(
+        resume_base_url=str(request.base_url).rstrip("/") + "/api/applications",
+        updated_since=parse_timestamp(updated_since) if updated_since else None,
+        job_id=job_id,
+        status_filter=status_filter,
+        batch_size=batch_size
+    )
+    
+    filename = f"applications_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.{format}"
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
+    if format == "ndjson":
+        return StreamingResponse(ndjson_lines(rows), media_type="application/x-ndjson", headers=headers)
+    return StreamingResponse(
+        csv_lines(rows, APPLICATION_EXPORT_COLUMNS), media_type="text/csv; charset=utf-8", headers=headers
+    )
+
+
+@router.get("/search", response_model=List[ApplicationSearchResult])
+async def search_applications(
+    q: str = Query(..., min_length=1, max_length=100, description="Candidate name, email or mobile (prefix or approximate)"),
+    limit: int = Query(10, ge=1, le=50, description="Maximum number of results"),
+    current_user: UserResponse = Depends(require_hr_team_or_admin)
+):
+    """
+    Search applications by candidate name, email or mobile.
+    
+    HR and Admin search all applications; team members only those with a stage
+    assigned to them.
+    """
+    application_service = ApplicationService()
+    return await application_service.search_applications(q, current_user.role, current_user.id, limit=limit)
+
+
+@router.get("/resume-search", response_model=ResumeSearchResponse)
+async def search_resumes(
+    q: str = Query(..., min_length=1, max_length=300, description='Skill query, e.g. python (django OR flask) "machine learning" -php'),
+    job_id: Optional[str] = Query(None, description="Only search applications for this job"),
+    limit: int = Query(50, ge=1, le=200, description="Maximum number of results"),
+    current_user: UserResponse = Depends(require_hr_or_admin)
+):
+    """
+    Find applications by the skills in their resumes (HR/Admin only).
+    
+    Supports AND (implicit), OR, NOT/-, parentheses and quoted phrases.
+    Results are application IDs, best match first.
+    """
+    application_service = ApplicationService()
+    return await application_service.search_resumes(q, job_id=job_id, limit=limit)
+
+
+@router.get("/resume-extraction/stats")
+async def get_resume_extraction_stats(
+    current_user: UserResponse = Depends(require_admin)
+):
+    """Get resume text extraction queue metrics for this worker, plus backlog counts (Admin only)."""
+    application_service = ApplicationService()
+    stats = resume_extraction_queue.stats()
+    stats["documents_by_status"] = await application_service.count_resume_text_by_status()
+    return stats
+
+
+@router.get("/resume-gc/stats")
+async def get_resume_gc_stats(
+    current_user: UserResponse = Depends(require_admin)
+):
+    """Get orphaned resume collection progress, totals and quarantine size (Admin only)."""
+    return await resume_garbage_collector.stats()
+
+
+@router.post("/resume-gc/run")
+async def run_resume_gc(
+    current_user: UserResponse = Depends(require_admin)
+):
+    """Run one orphaned resume collection pass now (Admin only)."""
+    report = await resume_garbage_collector.run_pass()
+    if report is None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A collection pass is already running"
+        )
+    return report
 
 
 @router.get("/{application_id}", response_model=ApplicationResponse)
 async def get_application_by_id(
     application_id: str,
+    response: Response,
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return (e.g. status,current_stage)"),
+    if_none_match: Optional[str] = Header(None),
     current_user: UserResponse = Depends(get_current_active_user)
 ):
     """Get application by ID."""
     application_service = ApplicationService()
+    requested_fields = parse_fields(fields, ApplicationResponse.model_fields.keys())
+    
+    # Conditional GET: validate the client's copy with a tiny projected read
+    if if_none_match:
+        version = await application_service.get_application_version(application_id)
+        if version and (current_user.role != UserRole.CANDIDATE or version.get("candidate_id") == current_user.id):
+            etag = make_etag(str(version["_id"]), version.get("updated_at"), requested_fields)
+            if etag_matches(if_none_match, etag):
+                return not_modified_response(etag)
+    
+    # Sparse fieldset: project only the requested fields and skip response model validation
+    if requested_fields:
+        application = await application_service.get_application_fields(application_id, requested_fields)
+        if not application:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Application not found"
+            )
+        if current_user.role == UserRole.CANDIDATE and application.get("candidate_id") != current_user.id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Access denied"
+            )
+        etag = make_etag(application["id"], application.get("updated_at"), requested_fields)
+        return JSONResponse(
+            content=jsonable_encoder(trim_document(application, requested_fields)),
+            headers=cache_headers(etag)
+        )
+    
     application = await application_service.get_application_by_id(application_id)
     
     if not application:
@@ -169,9 +345,60 @@ async def get_application_by_id(
             detail="Access denied"
         )
     
+    response.headers.update(cache_headers(make_etag(application.id, application.updated_at)))
     return application
 
 
+@router.get("/{application_id}/resume")
+async def download_resume(
+    application_id: str,
+    request: Request,
+    current_user: UserResponse = Depends(get_download_user)
+):
+    """
+    Download an application's resume.
+    
+    Access is checked here; the bytes are then sent by nginx (X-Accel-Redirect)
+    when it fronts the API, or streamed with Range and conditional request
+    support otherwise. Browsers link here with a download token
+    (POST /api/auth/download-token).
+    """
+    application_service = ApplicationService()
+    application = await application_service.get_application_resume(application_id)
+    
+    # Check access permissions
+    if current_user.role == UserRole.CANDIDATE and application["candidate_id"] != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied"
+        )
+    
+    extension = os.path.splitext(application["resume_filename"])[1].lower()
+    sha256 = application.get("resume_sha256")
+    return stored_file_response(
+        request,
+        application["resume_filename"],
+        download_name=f"{application.get('name') or 'resume'} - resume{extension}",
+        etag=f'"{sha256}"' if sha256 else None
+    )
+
+
+@router.get("/{application_id}/resume-text", response_model=ResumeTextResponse)
+async def get_resume_text(
+    application_id: str,
+    current_user: UserResponse = Depends(require_hr_team_or_admin)
+):
+    """Get the text, page count and skills extracted from an application's resume (HR/Team/Admin)."""
+    application_service = ApplicationService()
+    resume_text = await application_service.get_resume_text(application_id)
+    if not resume_text:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No resume text for this application"
+        )
+    return resume_text
+
+
 @router.put("/{application_id}/stage/1", response_model=ApplicationResponse)
 async def update_stage1_feedback(
     application_id: str,
@@ -180,7 +407,9 @@ async def update_stage1_feedback(
 ):
     """Update Stage 1: HR Screening feedback."""
     application_service = ApplicationService()
-    return await application_service.update_stage_feedback(application_id, 1, stage_data.dict())
+    return await application_service.update_stage_feedback(
+        application_id, 1, stage_data.dict(), current_user.id, current_user.role.value
+    )
 
 
 @router.put("/{application_id}/stage/2", response_model=ApplicationResponse)
@@ -191,7 +420,9 @@ async def update_stage2_feedback(
 ):
     """Update Stage 2: Hands-On Practical Lab Test feedback."""
     application_service = ApplicationService()
-    return await application_service.update_stage_feedback(application_id, 2, stage_data.dict())
+    return await application_service.update_stage_feedback(
+        application_id, 2, stage_data.dict(), current_user.id, current_user.role.value
+    )
 
 
 @router.put("/{application_id}/stage/3", response_model=ApplicationResponse)
@@ -202,7 +433,9 @@ async def update_stage3_feedback(
 ):
     """Update Stage 3: Technical Interview feedback."""
     application_service = ApplicationService()
-    return await application_service.update_stage_feedback(application_id, 3, stage_data.dict())
+    return await application_service.update_stage_feedback(
+        application_id, 3, stage_data.dict(), current_user.id, current_user.role.value
+    )
 
 
 @router.put("/{application_id}/stage/4", response_model=ApplicationResponse)
@@ -213,7 +446,9 @@ async def update_stage4_feedback(
 ):
     """Update Stage 4: HR Round feedback."""
     application_service = ApplicationService()
-    return await application_service.update_stage_feedback(application_id, 4, stage_data.dict())
+    return await application_service.update_stage_feedback(
+        application_id, 4, stage_data.dict(), current_user.id, current_user.role.value
+    )
 
 
 @router.put("/{application_id}/stage/5", response_model=ApplicationResponse)
@@ -224,7 +459,9 @@ async def update_stage5_feedback(
 ):
     """Update Stage 5: BU Lead Interview feedback."""
     application_service = ApplicationService()
-    return await application_service.update_stage_feedback(application_id, 5, stage_data.dict())
+    return await application_service.update_stage_feedback(
+        application_id, 5, stage_data.dict(), current_user.id, current_user.role.value
+    )
 
 
 @router.put("/{application_id}/stage/6", response_model=ApplicationResponse)
@@ -235,7 +472,9 @@ async def update_stage6_feedback(
 ):
     """Update Stage 6: CEO Interview feedback."""
     application_service = ApplicationService()
-    return await application_service.update_stage_feedback(application_id, 6, stage_data.dict())
+    return await application_service.update_stage_feedback(
+        application_id, 6, stage_data.dict(), current_user.id, current_user.role.value
+    )
 
 
 @router.put("/{application_id}/final-recommendation", response_model=ApplicationResponse)
@@ -246,7 +485,7 @@ async def update_final_recommendation(
 ):
     """Update final recommendation."""
     application_service = ApplicationService()
-    return await application_service.update_final_recommendation(application_id, recommendation_data.dict())
+    return await application_service.update_final_recommendation(application_id, recommendation_data.dict(), current_user.id)
 
 
 @router.delete("/{application_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -315,8 +554,7 @@ async def submit_team_member_feedback(
     
     # Submit feedback using interview service
     return await interview_service._submit_stage_feedback(
-        application_id, stage_number, feedback_model.dict(), current_user.id, 
-        f"stage{stage_number}_{interview_service._get_stage_field_name(stage_number)}"
+        application_id, stage_number, feedback_model.dict(), current_user.id
     )
 
 
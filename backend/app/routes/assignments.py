@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query
 from typing import List, Optional
 from datetime import datetime
 from ..models.application import StageAssignmentRequestModel, StageAssignmentModel
@@ -6,6 +6,8 @@ from ..models.user import UserResponse, UserRole
 from ..services.assignment_service import AssignmentService
 from ..auth.dependencies import get_current_active_user, require_admin, verify_stage_assignment
 from ..database import get_database
+from ..utils.delta_sync import parse_timestamp
+from ..utils.streaming import JSONArrayResponse
 from pydantic import BaseModel, Field
 
 router = APIRouter(prefix="/api/applications", tags=["Stage Assignments"])
@@ -79,20 +81,17 @@ async def get_stage_assignments(
     """
     assignment_service = AssignmentService()
     
-    # Get all assignments for the application
-    assignments = await assignment_service.get_stage_assignments(application_id)
+    # Validate the application before streaming starts (errors can't be sent mid-stream)
+    application = await assignment_service.get_application_for_assignments(application_id)
     
-    # If user is not admin, filter to only show their assignments
-    if current_user.role != UserRole.ADMIN:
-        assignments = [
-            assignment for assignment in assignments
-            if assignment.get("assigned_to") == current_user.id
-        ]
+    # If user is not admin, only show their assignments
+    assigned_to = None if current_user.role == UserRole.ADMIN else current_user.id
     
-    return {
-        "application_id": application_id,
-        "assignments": assignments
-    }
+    return JSONArrayResponse(
+        assignment_service.iter_stage_assignments(application, assigned_to=assigned_to),
+        envelope={"application_id": application_id},
+        key="assignments"
+    )
 
 
 @router.put("/{application_id}/reassign-stage")
@@ -133,14 +132,22 @@ async def reassign_stage(
 
 @router.get("/my-assignments")
 async def get_my_assignments(
+    updated_since: Optional[str] = Query(None, description="Only return assignments changed since this ISO timestamp"),
+    cursor: Optional[str] = Query(None, description="Resume a delta sync from the previous page's next_cursor"),
+    limit: int = Query(100, ge=1, le=500, description="Page size (applications) for delta sync"),
     current_user: UserResponse = Depends(get_current_active_user)
 ):
     """
     Get all assignments for the current team member.
     
     Returns list of stages assigned to the current user across all applications.
+    With updated_since or cursor, only assignments on changed applications are
+    returned, plus tombstones for removed ones (delta sync).
     
     Args:
+        updated_since: Optional ISO timestamp of the client's last sync
+        cursor: Optional cursor from the previous delta page
+        limit: Delta page size
         current_user: Current authenticated user
         
     Returns:
@@ -154,6 +161,21 @@ async def get_my_assignments(
         )
     
     assignment_service = AssignmentService()
+    
+    if updated_since or cursor:
+        delta = await assignment_service.get_my_assignments_delta(
+            current_user.id,
+            updated_since=parse_timestamp(updated_since) if updated_since else None,
+            cursor=cursor,
+            limit=limit
+        )
+        return {
+            "user_id": current_user.id,
+            "username": current_user.username,
+            **delta,
+            "total_count": len(delta["assignments"])
+        }
+    
     assignments = await assignment_service.get_my_assignments(current_user.id)
     
     return {
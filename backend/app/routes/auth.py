@@ -2,6 +2,8 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from ..models.user import UserCreate, UserLogin, UserResponse, Token
 from ..services.user_service import UserService
 from ..auth.dependencies import get_current_active_user
+from ..auth.jwt import create_download_token
+from ..config import settings
 from pydantic import BaseModel
 
 router = APIRouter(prefix="/api/auth", tags=["Authentication"])
@@ -11,6 +13,15 @@ class EmailCheck(BaseModel):
     email: str
 
 
+class DownloadTokenRequest(BaseModel):
+    path: str
+
+
+class DownloadToken(BaseModel):
+    token: str
+    expires_in: int
+
+
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
 async def register(user_data: UserCreate):
     """Register a new user."""
@@ -36,4 +47,27 @@ async def check_email_exists(email_data: EmailCheck):
 @router.get("/me", response_model=UserResponse)
 async def get_current_user_info(current_user: UserResponse = Depends(get_current_active_user)):
     """Get current user information."""
-    return current_user 
\ No newline at end of file
+    return current_user
+
+
+@router.post("/download-token", response_model=DownloadToken)
+async def get_download_token(
+    token_request: DownloadTokenRequest,
+    current_user: UserResponse = Depends(get_current_active_user)
+):
+    """
+    Issue a short-lived token for downloading one API path.
+    
+    The token goes in the download URL's ?token= so the browser can fetch
+    the file through a plain link and write it straight to disk. It only
+    authenticates that path, and the download route still checks access.
+    """
+    if not token_request.path.startswith("/api/"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Download path must be an API path"
+        )
+    return DownloadToken(
+        token=create_download_token(current_user.email, token_request.path),
+        expires_in=settings.download_token_expire_seconds
+    )
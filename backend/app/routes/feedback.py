@@ -135,8 +135,9 @@ async def start_stage_feedback(
     updated_application = await feedback_service.update_stage_status(
         application_id=application_id,
         stage_number=stage_number,
-        status="in_progress",
-        user_id=current_user.id
+        new_status="in_progress",
+        user_id=current_user.id,
+        user_role=current_user.role
     )
     
     return {
@@ -184,8 +185,9 @@ async def update_stage_status(
     updated_application = await feedback_service.update_stage_status(
         application_id=application_id,
         stage_number=stage_number,
-        status=status,
-        user_id=current_user.id
+        new_status=status,
+        user_id=current_user.id,
+        user_role=current_user.role
     )
     
     return {
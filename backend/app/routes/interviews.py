@@ -8,6 +8,7 @@ from ..models.application import (
 from ..models.user import UserResponse
 from ..services.interview_service import InterviewService
 from ..auth.dependencies import get_current_active_user
+from ..utils.streaming import JSONArrayResponse
 from ..models.user import UserRole
 
 router = APIRouter(prefix="/api/interviews", tags=["Interview Management"])
@@ -37,7 +38,8 @@ async def get_stage_assignments(
 ):
     """Get all stage assignments for an application."""
     interview_service = InterviewService()
-    return await interview_service.get_stage_assignments(application_id, current_user)
+    await interview_service.check_assignments_access(application_id, current_user)
+    return JSONArrayResponse(interview_service.iter_stage_assignments(application_id))
 
 
 @router.get("/my-assignments", response_model=List[dict])
@@ -52,7 +54,7 @@ async def get_my_assignments(
         )
     
     interview_service = InterviewService()
-    return await interview_service.get_my_assignments(current_user.id)
+    return JSONArrayResponse(interview_service.iter_my_assignments(current_user.id))
 
 
 # Stage 1: HR Screening
@@ -1,9 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Header, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
 from typing import List, Optional
-from ..models.job import JobCreate, JobResponse, JobUpdate, JobListResponse, JobStatus
+from urllib.parse import quote
+from ..models.job import (
+    JobCreate, JobResponse, JobUpdate, JobListResponse, JobStatus, JobSort,
+    JobType, ExperienceLevel, JobSearchResponse
+)
 from ..models.user import UserResponse
+from ..models.application import ApplicationListResponse
 from ..services.job_service import JobService
-from ..auth.dependencies import get_current_active_user, require_hr_or_admin
+from ..services.application_service import ApplicationService
+from ..services.match_scoring_service import MatchScoringService
+from ..services.job_cache import job_cache
+from ..services.active_jobs_feed import active_jobs_feed
+from ..auth.dependencies import get_current_active_user, require_hr_or_admin, require_hr_or_admin_download, require_admin
+from ..utils.fields import parse_fields, trim_document
+from ..utils.http_cache import make_etag, etag_matches, cache_headers, private_cache_headers, not_modified_response
+from ..config import settings
 
 router = APIRouter(prefix="/api/jobs", tags=["Jobs"])
 
@@ -22,39 +36,125 @@ async def create_job(
 async def get_jobs(
     status: Optional[JobStatus] = Query(None, description="Filter by job status"),
     department: Optional[str] = Query(None, description="Filter by department"),
+    page: int = Query(1, ge=1, description="Page number (ignored when cursor is given)"),
+    limit: int = Query(10, ge=1, le=100, description="Items per page"),
+    sort: JobSort = Query(JobSort.NEWEST, description="Sort order"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page (keyset pagination)"),
+    current_user: UserResponse = Depends(get_current_active_user)
+):
+    """Get all jobs with filtering, pagination and facet counts"""
+    job_service = JobService()
+    
+    # For candidates, only show active jobs
+    if current_user.role == "candidate":
+        status = JobStatus.ACTIVE
+    
+    return await job_service.get_all_jobs(
+        status=status, department=department, page=page, limit=limit, sort=sort, cursor=cursor
+    )
+
+
+@router.get("/search", response_model=JobSearchResponse)
+async def search_jobs(
+    q: str = Query(..., min_length=1, max_length=200, description="Search terms (quote phrases, prefix - to exclude)"),
+    location: Optional[str] = Query(None, description="Filter by location (case-insensitive substring)"),
+    job_type: Optional[JobType] = Query(None, description="Filter by job type"),
+    experience_level: Optional[ExperienceLevel] = Query(None, description="Filter by experience level"),
+    department: Optional[str] = Query(None, description="Filter by department"),
+    status: Optional[JobStatus] = Query(None, description="Filter by job status"),
     page: int = Query(1, ge=1, description="Page number"),
     limit: int = Query(10, ge=1, le=100, description="Items per page"),
     current_user: UserResponse = Depends(get_current_active_user)
 ):
-    """Get all jobs with filtering and pagination"""
+    """Search jobs by title, description, requirements and skills, ranked by relevance"""
     job_service = JobService()
     
     # For candidates, only show active jobs
     if current_user.role == "candidate":
         status = JobStatus.ACTIVE
     
-    return await job_service.get_all_jobs(status=status, department=department, page=page, limit=limit)
+    return await job_service.search_jobs(
+        q,
+        status=status,
+        location=location,
+        job_type=job_type,
+        experience_level=experience_level,
+        department=department,
+        page=page,
+        limit=limit
+    )
 
 
 @router.get("/active", response_model=List[JobResponse])
 async def get_active_jobs(
+    page: Optional[int] = Query(None, ge=1, description="Page number (omit for the full feed)"),
+    limit: int = Query(20, ge=1, le=100, description="Items per page when paginating"),
+    if_none_match: Optional[str] = Header(None),
     current_user: UserResponse = Depends(get_current_active_user)
 ):
-    """Get all active jobs (for candidates)"""
+    """Get all active jobs (for candidates), served from an in-memory snapshot"""
     job_service = JobService()
-    return await job_service.get_active_jobs()
+    snapshot = await job_service.get_active_jobs_snapshot()
+    
+    if page is None:
+        etag = snapshot.etag
+    else:
+        etag = snapshot.page_etag(page, limit)
+    headers = private_cache_headers(etag, settings.active_jobs_feed_max_age)
+    headers["X-Total-Count"] = str(snapshot.total)
+    
+    if etag_matches(if_none_match, etag):
+        return not_modified_response(etag, headers)
+    
+    body = snapshot.body if page is None else snapshot.page(page, limit)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+@router.get("/cache-stats")
+async def get_job_cache_stats(
+    current_user: UserResponse = Depends(require_admin)
+):
+    """Get job cache hit-rate metrics for this worker (Admin only)"""
+    stats = job_cache.stats()
+    stats["active_jobs_feed_rebuilds"] = active_jobs_feed.rebuilds
+    return stats
 
 
 @router.get("/{job_id}", response_model=JobResponse)
 async def get_job_by_id(
     job_id: str,
+    response: Response,
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return (e.g. title,status)"),
+    if_none_match: Optional[str] = Header(None),
     current_user: UserResponse = Depends(get_current_active_user)
 ):
     """Get a specific job by ID"""
     job_service = JobService()
+    requested_fields = parse_fields(fields, JobResponse.model_fields.keys())
+    
+    # Conditional GET: validate the client's copy with a tiny projected read
+    if if_none_match:
+        version = await job_service.get_job_version(job_id)
+        if version:
+            etag = make_etag(str(version["_id"]), version.get("updated_at"), requested_fields)
+            if etag_matches(if_none_match, etag):
+                return not_modified_response(etag)
+    
+    if requested_fields:
+        job = await job_service.get_job_fields(job_id, requested_fields)
+        if not job:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+        etag = make_etag(job["id"], job.get("updated_at"), requested_fields)
+        return JSONResponse(
+            content=jsonable_encoder(trim_document(job, requested_fields)),
+            headers=cache_headers(etag)
+        )
+    
     job = await job_service.get_job_by_id(job_id)
     if not job:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    
+    response.headers.update(cache_headers(make_etag(job.id, job.updated_at)))
     return job
 
 
@@ -91,6 +191,71 @@ async def close_job(
     return await job_service.close_job(job_id)
 
 
+@router.get("/{job_id}/shortlist", response_model=List[ApplicationListResponse])
+async def get_job_shortlist(
+    job_id: str,
+    limit: int = Query(20, ge=1, le=200, description="Number of applicants to return"),
+    current_user: UserResponse = Depends(require_hr_or_admin)
+):
+    """Get a job's applicants ranked by how well their resume skills match the job (HR/Admin only)"""
+    application_service = ApplicationService()
+    return await application_service.get_job_shortlist(job_id, limit)
+
+
+@router.get("/{job_id}/top-candidates", response_model=List[ApplicationListResponse])
+async def get_job_top_candidates(
+    job_id: str,
+    limit: int = Query(10, ge=1, le=200, description="Number of candidates to return"),
+    exclude_failed: bool = Query(True, description="Leave out candidates who failed a stage"),
+    current_user: UserResponse = Depends(require_hr_or_admin)
+):
+    """Get a job's candidates ranked by their interview scorecard (HR/Admin only)"""
+    application_service = ApplicationService()
+    return await application_service.get_job_top_candidates(job_id, limit, exclude_failed)
+
+
+@router.get("/{job_id}/resumes.zip")
+async def download_job_resumes(
+    job_id: str,
+    current_user: UserResponse = Depends(require_hr_or_admin_download)
+):
+    """
+    Download the resumes of all of a job's applicants as one ZIP archive (HR/Admin only).
+    
+    The archive is built while it is sent and ends with a manifest.csv listing
+    every application and whether its resume was included. Browsers link here
+    with a download token (POST /api/auth/download-token) so the archive
+    streams to disk.
+    """
+    job_service = JobService()
+    job = await job_service.get_job_by_id(job_id)
+    if not job:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    
+    application_service = ApplicationService()
+    archive_name = f"{job.title} resumes.zip"
+    return StreamingResponse(
+        application_service.job_resumes_zip(job_id),
+        media_type="application/zip",
+        headers={
+            "Content-Disposition": f"attachment; filename*=utf-8''{quote(archive_name)}",
+            "Cache-Control": "private, no-store",
+            # Let nginx pass the archive through as it is produced instead of buffering it
+            "X-Accel-Buffering": "no"
+        }
+    )
+
+
+@router.post("/{job_id}/match-scores/recompute")
+async def recompute_match_scores(
+    job_id: str,
+    current_user: UserResponse = Depends(require_hr_or_admin)
+):
+    """Recompute the skill match scores of all of a job's applicants (HR/Admin only)"""
+    updated = await MatchScoringService().score_job(job_id)
+    return {"job_id": job_id, "updated": updated}
+
+
 @router.get("/department/{department}", response_model=List[JobResponse])
 async def get_jobs_by_department(
     department: str,
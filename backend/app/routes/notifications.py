@@ -1,17 +1,20 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
-from ..models.notification import NotificationResponse
+from typing import List, Optional, Union
+from ..models.notification import NotificationResponse, NotificationDeltaResponse
 from ..models.user import UserResponse
 from ..services.notification_service import NotificationService
 from ..auth.dependencies import get_current_active_user
+from ..utils.delta_sync import parse_timestamp
 
 router = APIRouter(prefix="/notifications", tags=["notifications"])
 
 
-@router.get("/", response_model=List[NotificationResponse])
+@router.get("/", response_model=Union[List[NotificationResponse], NotificationDeltaResponse])
 async def get_notifications(
     unread_only: bool = False,
     limit: int = 50,
+    updated_since: Optional[str] = None,
+    cursor: Optional[str] = None,
     current_user: UserResponse = Depends(get_current_active_user)
 ):
     """
@@ -20,8 +23,19 @@ async def get_notifications(
     Query Parameters:
     - unread_only: If true, return only unread notifications
     - limit: Maximum number of notifications to return (default: 50)
+    - updated_since: ISO timestamp; return only notifications created/changed since then (delta sync)
+    - cursor: Resume a delta sync from the previous page's next_cursor
     """
     service = NotificationService()
+    
+    if updated_since or cursor:
+        return await service.get_user_notifications_delta(
+            user_id=current_user.id,
+            updated_since=parse_timestamp(updated_since) if updated_since else None,
+            cursor=cursor,
+            limit=limit
+        )
+    
     notifications = await service.get_user_notifications(
         user_id=current_user.id,
         unread_only=unread_only,
@@ -1,8 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
-from ..models.user import UserResponse, UserUpdate, UserCreate, UserRole
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
+from typing import List, Optional, Union
+from ..models.user import UserResponse, UserUpdate, UserCreate, UserRole, UserSearchResult, CandidateOptionPage, UserPage
 from ..services.user_service import UserService
 from ..auth.dependencies import require_admin, require_hr_or_admin
+from ..utils.fields import parse_fields, trim_document
+from ..utils.streaming import ndjson_lines, JSONArrayResponse
 
 router = APIRouter(prefix="/api/users", tags=["Users"])
 
@@ -23,11 +27,33 @@ async def create_user(
         )
 
 
-@router.get("/", response_model=List[UserResponse])
-async def get_all_users(current_user: UserResponse = Depends(require_admin)):
-    """Get all users (Admin only)."""
+@router.get("/", response_model=Union[List[UserResponse], UserPage])
+async def get_all_users(
+    role: Optional[UserRole] = Query(None, description="Only return users with this role"),
+    limit: Optional[int] = Query(None, ge=1, le=500, description="Page size; enables cursor pagination"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    format: str = Query("json", pattern="^(json|ndjson)$", description="ndjson streams every matching user"),
+    current_user: UserResponse = Depends(require_admin)
+):
+    """
+    Get all users (Admin only).
+    
+    With limit or cursor, returns one page ordered by username; with
+    format=ndjson, streams all matching users as newline-delimited JSON.
+    """
     user_service = UserService()
-    return await user_service.get_all_users()
+    
+    if format == "ndjson":
+        return StreamingResponse(
+            ndjson_lines(user_service.iter_users(role)),
+            media_type="application/x-ndjson",
+            headers={"Content-Disposition": 'attachment; filename="users.ndjson"'}
+        )
+    
+    if limit or cursor:
+        return await user_service.list_users(role, limit=limit or 50, cursor=cursor)
+    
+    return JSONArrayResponse(user_service.iter_users(role))
 
 
 @router.get("/team-members", response_model=List[UserResponse])
@@ -37,27 +63,69 @@ async def get_team_members(current_user: UserResponse = Depends(require_hr_or_ad
     return await user_service.get_users_by_role(UserRole.TEAM_MEMBER)
 
 
-@router.get("/candidates", response_model=List[UserResponse])
-async def get_candidates(current_user: UserResponse = Depends(require_hr_or_admin)):
+@router.get("/candidates", response_model=Union[List[UserResponse], UserPage])
+async def get_candidates(
+    limit: Optional[int] = Query(None, ge=1, le=500, description="Page size; enables cursor pagination"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    current_user: UserResponse = Depends(require_hr_or_admin)
+):
     """Get all candidates (HR/Admin only)."""
     user_service = UserService()
-    return await user_service.get_users_by_role(UserRole.CANDIDATE)
+    if limit or cursor:
+        return await user_service.list_users(UserRole.CANDIDATE, limit=limit or 50, cursor=cursor)
+    return JSONArrayResponse(user_service.iter_users(UserRole.CANDIDATE))
+
+
+@router.get("/candidates/search", response_model=CandidateOptionPage)
+async def search_candidates(
+    q: Optional[str] = Query(None, max_length=100, description="Username or email prefix"),
+    limit: int = Query(20, ge=1, le=50, description="Maximum number of candidates per page"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    current_user: UserResponse = Depends(require_hr_or_admin)
+):
+    """Typeahead for picking a candidate, e.g. when applying on their behalf (HR/Admin only)."""
+    user_service = UserService()
+    return await user_service.search_candidates(q, limit=limit, cursor=cursor)
 
 
 @router.get("/assignment-users", response_model=List[UserResponse])
 async def get_assignment_users(current_user: UserResponse = Depends(require_hr_or_admin)):
     """Get all users available for assignment (HR, Admin, Team Members - excluding candidates)."""
-    print(f"get_assignment_users called by user: {current_user.email} with role: {current_user.role}")
     user_service = UserService()
-    users = await user_service.get_assignment_users()
-    print(f"Found {len(users)} assignment users")
-    return users
+    return await user_service.get_assignment_users()
+
+
+@router.get("/search", response_model=List[UserSearchResult])
+async def search_users(
+    q: str = Query(..., min_length=1, max_length=100, description="Username, email or mobile (prefix or approximate)"),
+    role: Optional[UserRole] = Query(None, description="Only return users with this role"),
+    limit: int = Query(10, ge=1, le=50, description="Maximum number of results"),
+    current_user: UserResponse = Depends(require_hr_or_admin)
+):
+    """Search users by username, email or mobile (HR/Admin only)."""
+    user_service = UserService()
+    return await user_service.search_users(q, role=role, limit=limit)
 
 
 @router.get("/{user_id}", response_model=UserResponse)
-async def get_user_by_id(user_id: str, current_user: UserResponse = Depends(require_admin)):
+async def get_user_by_id(
+    user_id: str,
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return (e.g. username,email)"),
+    current_user: UserResponse = Depends(require_admin)
+):
     """Get user by ID (Admin only)."""
     user_service = UserService()
+    
+    requested_fields = parse_fields(fields, UserResponse.model_fields.keys())
+    if requested_fields:
+        user = await user_service.get_user_fields(user_id, requested_fields)
+        if not user:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="User not found"
+            )
+        return JSONResponse(content=jsonable_encoder(trim_document(user, requested_fields)))
+    
     user = await user_service.get_user_by_id(user_id)
     if not user:
         raise HTTPException(
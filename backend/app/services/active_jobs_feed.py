@@ -0,0 +1,94 @@
+import asyncio
+import hashlib
+import json
+import time
+from datetime import datetime
+from typing import Awaitable, Callable, List, Optional
+from fastapi.encoders import jsonable_encoder
+from ..config import settings
+from ..models.job import JobResponse
+
+
+def _dump(value) -> bytes:
+    """Serialize the way JSONResponse does."""
+    return json.dumps(
+        jsonable_encoder(value),
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":")
+    ).encode("utf-8")
+
+
+class ActiveJobsSnapshot:
+    """Immutable, pre-serialized copy of the active jobs list."""
+
+    def __init__(self, jobs: List[JobResponse], generation: int, ttl_seconds: int):
+        # Each job is serialized once; pages are byte-joined slices of these
+        self._items = [_dump(job) for job in jobs]
+        self.body = b"[" + b",".join(self._items) + b"]"
+        self.total = len(self._items)
+        self.version = hashlib.sha1(self.body).hexdigest()
+        self.etag = f'"{self.version}"'
+        self.generation = generation
+        self.built_at = datetime.utcnow()
+        self.expires_at = time.monotonic() + ttl_seconds
+
+    def page(self, page: int, limit: int) -> bytes:
+        """JSON array bytes for one page of the feed."""
+        start = (page - 1) * limit
+        return b"[" + b",".join(self._items[start:start + limit]) + b"]"
+
+    def page_etag(self, page: int, limit: int) -> str:
+        """ETag of one page (changes whenever the feed does)."""
+        return '"' + hashlib.sha1(f"{self.version}:{page}:{limit}".encode("utf-8")).hexdigest() + '"'
+
+
+class ActiveJobsFeed:
+    """
+    In-memory snapshot of the candidate-facing active-jobs feed.
+
+    JobService marks the feed stale when a job is created, edited or removed;
+    the next read rebuilds it with a single query while concurrent readers
+    wait on the same rebuild. Other worker processes don't see those writes,
+    so the snapshot also expires after ``ttl_seconds``; application counts,
+    which change with every apply, are only refreshed then.
+    """
+
+    def __init__(self, ttl_seconds: int):
+        self.ttl_seconds = ttl_seconds
+        self._snapshot: Optional[ActiveJobsSnapshot] = None
+        self._generation = 0
+        self._lock = asyncio.Lock()
+        self.rebuilds = 0
+
+    def invalidate(self):
+        """Mark the snapshot stale after a job was created, changed or removed."""
+        self._generation += 1
+
+    def _is_fresh(self, snapshot: Optional[ActiveJobsSnapshot]) -> bool:
+        return (
+            snapshot is not None
+            and snapshot.generation == self._generation
+            and snapshot.expires_at > time.monotonic()
+        )
+
+    async def get_snapshot(self, loader: Callable[[], Awaitable[List[JobResponse]]]) -> ActiveJobsSnapshot:
+        """Get the current snapshot, rebuilding it with ``loader`` if stale."""
+        if self._is_fresh(self._snapshot):
+            return self._snapshot
+
+        async with self._lock:
+            # Another request may have rebuilt it while we waited
+            if self._is_fresh(self._snapshot):
+                return self._snapshot
+
+            # A write during the load bumps the generation, so it is rebuilt again on the next read
+            generation = self._generation
+            jobs = await loader()
+            self._snapshot = ActiveJobsSnapshot(jobs, generation, self.ttl_seconds)
+            self.rebuilds += 1
+            return self._snapshot
+
+
+active_jobs_feed = ActiveJobsFeed(ttl_seconds=settings.active_jobs_feed_ttl_seconds)
@@ -1,17 +1,59 @@
-from typing import Optional, List
+import asyncio
+import logging
+import os
+import re
+import tempfile
+from typing import Optional, List, AsyncIterator
 from datetime import datetime
 from bson import ObjectId
 from ..database import get_database
 from ..models.application import (
     ApplicationCreate, ApplicationInDB, ApplicationResponse, 
-    ApplicationListResponse, ApplicationStages, HRScreening,
+    ApplicationListResponse, ApplicationDeltaResponse, ApplicationSearchResult, ApplicationStages, HRScreening,
     PracticalLabTest, TechnicalInterview, HRRound, 
     BULeadInterview, CEOInterview, FinalRecommendationOffer,
-    StageAssignmentRequest, StageAssignmentResponse
+    StageAssignmentRequest, StageAssignmentResponse, ResumeTextResponse, ResumeSearchHit, ResumeSearchResponse,
+    STAGE_FORM_NAMES
 )
 from ..models.user import UserRole
+from ..utils.fields import build_projection
+from ..utils.delta_sync import build_delta_filter, encode_cursor, sync_server_time
+from ..utils.search import build_search_fields, prefix_fuzzy_search
+from ..utils.resume_query import ResumeQuery
+from ..utils.file_upload import get_file_path
+from ..utils.streaming import csv_row
+from ..utils.zip_stream import ZipMember, zip_chunks, read_ahead
+from .tombstone_service import TombstoneService
+from .resume_blob_service import ResumeBlobService
+from .resume_extraction import resume_extraction_queue
+from .stage_workflow_service import StageWorkflowService
 from fastapi import HTTPException, status
 
+logger = logging.getLogger(__name__)
+
+STAGE_NUMBERS = range(1, 8)
+
+# A query term that is also one of the resume's detected skills counts this much extra
+SKILL_MATCH_WEIGHT = 2
+
+# Column order of CSV/NDJSON exports
+APPLICATION_EXPORT_COLUMNS = [
+    "id", "name", "email", "mobile", "job_id", "job_title", "job_department",
+    "status", "current_stage", "date_of_application", "created_at", "updated_at",
+    *[f"stage{stage_num}_status" for stage_num in STAGE_NUMBERS],
+    "resume_url"
+]
+
+
+# Columns of the manifest.csv included in a job's resume archive
+RESUME_ARCHIVE_MANIFEST_COLUMNS = [
+    "id", "name", "email", "mobile", "status", "current_stage", "date_of_application",
+    "match_score", "scorecard_score", "file", "included"
+]
+
+# Already compressed formats are stored as is in resume archives
+RESUME_ARCHIVE_STORED_EXTENSIONS = {".pdf", ".docx"}
+
 
 class ApplicationService:
     def __init__(self):
@@ -41,12 +83,27 @@ class ApplicationService:
                 detail="Email already has an application for this job"
             )
         
+        # Look up the job once; its title and department are stored on the application
+        from .job_service import JobService
+        job_service = JobService()
+        job = await job_service.get_job_by_id(application_data.job_id)
+        if not job:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Job not found"
+            )
+        
         # Create application document
         application_dict = application_data.dict()
         application_dict["candidate_id"] = candidate_id
+        application_dict["job_title"] = job.title
+        application_dict["job_department"] = job.department
         
         application_in_db = ApplicationInDB(**application_dict)
         application_doc = application_in_db.dict()
+        application_doc.update(build_search_fields(
+            application_in_db.name, application_in_db.email, mobile=application_in_db.mobile
+        ))
         
         # Insert into database
         result = await self.db.applications.insert_one(application_doc)
@@ -54,10 +111,20 @@ class ApplicationService:
         del application_doc["_id"]
         
         # Update job applications count
-        from .job_service import JobService
-        job_service = JobService()
         await job_service.update_applications_count(application_data.job_id, increment=True)
         
+        # Extract the resume's text in the background
+        if application_doc.get("resume_filename"):
+            try:
+                await resume_extraction_queue.enqueue(
+                    application_doc["id"],
+                    application_doc["job_id"],
+                    application_doc["resume_filename"],
+                    application_doc.get("resume_sha256")
+                )
+            except Exception as e:
+                logger.error(f"Failed to queue resume extraction for application {application_doc['id']}: {e}")
+        
         return ApplicationResponse(**application_doc)
 
     async def get_application_by_id(self, application_id: str) -> Optional[ApplicationResponse]:
@@ -70,19 +137,116 @@ class ApplicationService:
             application["id"] = str(application["_id"])
             del application["_id"]
             
-            # Get job title for the application
-            from .job_service import JobService
-            job_service = JobService()
-            job = await job_service.get_job_by_id(application["job_id"])
-            if job:
-                application["job_title"] = job.title
-            else:
-                application["job_title"] = "Unknown Job"
+            await self._fill_job_titles([application])
             
             return ApplicationResponse(**application)
         except Exception:
             return None
 
+    async def get_application_resume(self, application_id: str) -> dict:
+        """Get just the fields needed to authorize and serve an application's resume."""
+        try:
+            application = await self.db.applications.find_one(
+                {"_id": ObjectId(application_id)},
+                {"candidate_id": 1, "name": 1, "resume_filename": 1, "resume_sha256": 1}
+            )
+        except Exception:
+            application = None
+        
+        if not application or not application.get("resume_filename"):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Resume not found"
+            )
+        return application
+
+    async def get_resume_text(self, application_id: str) -> Optional[ResumeTextResponse]:
+        """Get the background extraction result for an application's resume, if any."""
+        document = await self.db.resume_text.find_one({"_id": application_id})
+        if not document:
+            return None
+        document["application_id"] = document.pop("_id")
+        return ResumeTextResponse(**document)
+
+    async def search_resumes(self, query: str, job_id: Optional[str] = None, limit: int = 50) -> ResumeSearchResponse:
+        """
+        Rank applications by a boolean/phrase query over their resume text.
+        
+        The query (see ResumeQuery) is answered from the resume_index
+        collection, whose multikey (job_id, terms) index is the inverted index.
+        Results are ranked by how many query terms and phrases they contain,
+        with matches on skills from the jobs' skills_required counting extra.
+        Every resume matching the filter is scored before the best ``limit``
+        are kept, so queries whose terms are all very common read all of
+        their matches; narrow them with job_id or a rarer required term.
+        
+        Args:
+            query: Query such as ``python (django OR flask) "machine learning" -php``
+            job_id: Only search applications for this job
+            limit: Maximum number of results
+            
+        Returns:
+            Ranked application IDs with their matched terms
+        """
+        resume_query = ResumeQuery(query)
+        rank_terms = resume_query.rank_terms()
+        match = {"$and": [{"job_id": job_id}, resume_query.filter]} if job_id else resume_query.filter
+        pipeline = [
+            {"$match": match},
+            {"$project": {
+                "matched_terms": {"$setIntersection": ["$terms", rank_terms]},
+                "matched_skills": {"$setIntersection": ["$skill_terms", rank_terms]}
+            }},
+            {"$addFields": {"score": {"$add": [
+                {"$size": "$matched_terms"},
+                {"$multiply": [SKILL_MATCH_WEIGHT, {"$size": "$matched_skills"}]}
+            ]}}},
+            {"$sort": {"score": -1, "_id": 1}},
+            {"$limit": limit}
+        ]
+        
+        results = [
+            ResumeSearchHit(application_id=hit.pop("_id"), **hit)
+            async for hit in self.db.resume_index.aggregate(pipeline)
+        ]
+        return ResumeSearchResponse(query=query, job_id=job_id, results=results)
+
+    async def count_resume_text_by_status(self) -> dict:
+        """Number of resume_text documents in each extraction status."""
+        pipeline = [{"$group": {"_id": "$status", "count": {"$sum": 1}}}]
+        return {group["_id"]: group["count"] async for group in self.db.resume_text.aggregate(pipeline)}
+
+    async def get_application_fields(self, application_id: str, fields: List[str]) -> Optional[dict]:
+        """Get only the requested fields of an application (sparse fieldset)."""
+        try:
+            projection = build_projection(fields, always=["candidate_id", "updated_at"])
+            if "job_title" in fields:
+                projection["job_id"] = 1
+            
+            application = await self.db.applications.find_one({"_id": ObjectId(application_id)}, projection)
+            if not application:
+                return None
+            
+            application["id"] = str(application["_id"])
+            del application["_id"]
+            
+            if "job_title" in fields:
+                await self._fill_job_titles([application])
+            
+            return application
+        except Exception:
+            return None
+
+    async def get_application_version(self, application_id: str) -> Optional[dict]:
+        """Get just the fields needed to validate a cached copy (ETag) of an application."""
+        try:
+            return await self.db.applications.find_one(
+                {"_id": ObjectId(application_id)},
+                {"updated_at": 1, "candidate_id": 1}
+            )
+        except Exception:
+            return None
+
     async def get_application_by_candidate_id(self, candidate_id: str) -> Optional[ApplicationResponse]:
         """Get application by candidate ID."""
         application = await self.db.applications.find_one({"candidate_id": candidate_id})
@@ -96,56 +260,212 @@ class ApplicationService:
 
     async def get_all_applications(self, user_role: UserRole, user_id: str = None) -> List[ApplicationListResponse]:
         """Get applications based on user role."""
-        applications = []
-        
+        return [application async for application in self.iter_all_applications(user_role, user_id)]
+
+    async def iter_all_applications(
+        self,
+        user_role: UserRole,
+        user_id: str = None,
+        batch_size: int = 500
+    ) -> AsyncIterator[ApplicationListResponse]:
+        """Yield applications visible to a role one cursor batch at a time (for streamed responses)."""
         if user_role == UserRole.CANDIDATE:
             # Candidates can only see their own applications
-            if user_id:
-                cursor = self.db.applications.find({"candidate_id": user_id})
-                async for application in cursor:
-                    application["id"] = str(application["_id"])
-                    del application["_id"]
-                    
-                    # Get job title for the application
-                    from .job_service import JobService
-                    job_service = JobService()
-                    job = await job_service.get_job_by_id(application["job_id"])
-                    if job:
-                        application["job_title"] = job.title
-                    else:
-                        application["job_title"] = "Unknown Job"
-                    
-                    applications.append(ApplicationListResponse(**application))
+            if not user_id:
+                return
+            cursor = self.db.applications.find({"candidate_id": user_id})
         else:
             # HR and Admin can see all applications
             cursor = self.db.applications.find({})
-            async for application in cursor:
-                application["id"] = str(application["_id"])
-                del application["_id"]
-                
-                # Get job title for the application
-                from .job_service import JobService
-                job_service = JobService()
-                job = await job_service.get_job_by_id(application["job_id"])
-                if job:
-                    application["job_title"] = job.title
-                else:
-                    application["job_title"] = "Unknown Job"
-                
-                applications.append(ApplicationListResponse(**application))
+        cursor = cursor.batch_size(batch_size)
+        
+        batch = []
+        async for application in cursor:
+            application["id"] = str(application["_id"])
+            del application["_id"]
+            batch.append(application)
+            if len(batch) >= batch_size:
+                await self._fill_job_titles(batch)
+                for document in batch:
+                    yield ApplicationListResponse(**document)
+                batch = []
+        
+        if batch:
+            await self._fill_job_titles(batch)
+            for document in batch:
+                yield ApplicationListResponse(**document)
+
+    async def iter_applications_for_export(
+        self,
+        resume_base_url: str,
+        updated_since: Optional[datetime] = None,
+        job_id: Optional[str] = None,
+        status_filter: Optional[str] = None,
+        batch_size: int = 1000
+    ) -> AsyncIterator[dict]:
+        """
+        Yield flat export rows straight from a Mongo cursor.
+        
+        Documents are processed one cursor batch at a time (so missing job
+        titles resolve with one lookup per batch) and never all held in
+        memory, whatever the size of the export.
+        """
+        query = {}
+        if updated_since:
+            query["updated_at"] = {"$gte": updated_since}
+        if job_id:
+            query["job_id"] = job_id
+        if status_filter:
+            query["status"] = status_filter
+        
+        projection = {
+            "name": 1, "email": 1, "mobile": 1, "job_id": 1, "job_title": 1, "job_department": 1,
+            "status": 1, "current_stage": 1, "date_of_application": 1, "created_at": 1,
+            "updated_at": 1, "resume_filename": 1,
+            **{f"stages.stage{stage_num}_status": 1 for stage_num in STAGE_NUMBERS}
+        }
+        cursor = self.db.applications.find(query, projection).sort("_id", 1).batch_size(batch_size)
+        
+        batch = []
+        async for application in cursor:
+            batch.append(application)
+            if len(batch) >= batch_size:
+                for row in await self._export_rows(batch, resume_base_url):
+                    yield row
+                batch = []
+        
+        if batch:
+            for row in await self._export_rows(batch, resume_base_url):
+                yield row
+
+    async def _export_rows(self, applications: List[dict], resume_base_url: str) -> List[dict]:
+        """Flatten one batch of projected applications into export rows."""
+        await self._fill_job_titles(applications)
+        
+        rows = []
+        for application in applications:
+            stages = application.get("stages") or {}
+            row = {column: application.get(column) for column in APPLICATION_EXPORT_COLUMNS}
+            row["id"] = str(application["_id"])
+            for stage_num in STAGE_NUMBERS:
+                row[f"stage{stage_num}_status"] = stages.get(f"stage{stage_num}_status")
+            if application.get("resume_filename"):
+                row["resume_url"] = f"{resume_base_url}/{row['id']}/resume"
+            rows.append(row)
+        return rows
+
+    async def search_applications(
+        self,
+        query: str,
+        user_role: UserRole,
+        user_id: str,
+        limit: int = 10
+    ) -> List[ApplicationSearchResult]:
+        """Search applications by candidate name, email or mobile (prefix, then fuzzy matches)."""
+        if user_role in (UserRole.HR, UserRole.ADMIN):
+            scope = {}
+        elif user_role == UserRole.CANDIDATE:
+            scope = {"candidate_id": user_id}
+        else:
+            # Team members only find applications with a stage assigned to them
+            scope = {"$or": [
+                {f"stages.stage{stage_num}_assigned_to": user_id}
+                for stage_num in range(1, 8)
+            ]}
+        
+        projection = {
+            "name": 1, "email": 1, "mobile": 1, "job_id": 1, "job_title": 1,
+            "current_stage": 1, "status": 1
+        }
+        matches = await prefix_fuzzy_search(self.db.applications, query, scope, projection, limit)
+        
+        documents = [document for document, _, _ in matches]
+        for document in documents:
+            document["id"] = str(document.pop("_id"))
+        await self._fill_job_titles(documents)
+        
+        return [
+            ApplicationSearchResult(**document, match=match, score=score)
+            for document, match, score in matches
+        ]
+
+    async def _fill_job_titles(self, applications: List[dict]):
+        """
+        Set job_title on applications stored before it was denormalized.
+        
+        Missing titles are resolved in bulk through the shared job cache.
+        """
+        missing = [application for application in applications if not application.get("job_title")]
+        if not missing:
+            return
+        
+        from .job_service import JobService
+        job_service = JobService()
+        jobs = await job_service.get_jobs_by_ids(application["job_id"] for application in missing)
+        for application in missing:
+            job = jobs.get(application["job_id"])
+            application["job_title"] = job.title if job else "Unknown Job"
+
+    async def get_applications_delta(
+        self,
+        user_role: UserRole,
+        user_id: str,
+        updated_since: Optional[datetime] = None,
+        cursor: Optional[str] = None,
+        limit: int = 100
+    ) -> ApplicationDeltaResponse:
+        """Get one page of applications changed since a timestamp, plus deletions."""
+        server_time = sync_server_time()
+        tombstone_service = TombstoneService()
+        
+        # Same visibility rules as get_all_applications
+        query = build_delta_filter(updated_since, cursor)
+        if user_role == UserRole.CANDIDATE:
+            query["candidate_id"] = user_id
+        
+        cursor_docs = self.db.applications.find(query).sort([("updated_at", 1), ("_id", 1)]).limit(limit)
+        
+        documents = []
+        async for application in cursor_docs:
+            application["id"] = str(application["_id"])
+            documents.append(application)
+        
+        await self._fill_job_titles(documents)
+        items = [ApplicationListResponse(**application) for application in documents]
+        
+        next_cursor = None
+        if len(documents) == limit:
+            next_cursor = encode_cursor(documents[-1]["updated_at"], documents[-1]["_id"])
+        
+        # Deletions are only sent with the first page of a sync
+        deleted = []
+        reset = False
+        if updated_since and not cursor:
+            reset = tombstone_service.is_expired(updated_since)
+            deleted = await tombstone_service.get_deletions(
+                "applications",
+                updated_since,
+                user_id if user_role == UserRole.CANDIDATE else None
+            )
         
-        return applications
+        return ApplicationDeltaResponse(
+            items=items,
+            deleted=deleted,
+            next_cursor=next_cursor,
+            server_time=server_time,
+            reset=reset
+        )
 
-    async def update_stage_feedback(self, application_id: str, stage: int, stage_data: dict) -> ApplicationResponse:
-        """Update feedback for a specific interview stage."""
+    async def update_stage_feedback(
+        self,
+        application_id: str,
+        stage: int,
+        stage_data: dict,
+        user_id: str,
+        user_role: str
+    ) -> ApplicationResponse:
+        """Update feedback for a specific interview stage, as an HR user or admin."""
         try:
-            application = await self.db.applications.find_one({"_id": ObjectId(application_id)})
-            if not application:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail="Application not found"
-                )
-            
             # Validate stage number
             if stage < 1 or stage > 6:
                 raise HTTPException(
@@ -153,30 +473,14 @@ class ApplicationService:
                     detail="Invalid stage number. Must be between 1 and 6."
                 )
             
-            # Update the specific stage
-            stage_field = f"stages.stage{stage}"
-            
             # Add completion timestamp
             stage_data["completed_at"] = datetime.utcnow()
             
-            # Update the application
-            result = await self.db.applications.update_one(
-                {"_id": ObjectId(application_id)},
-                {
-                    "$set": {
-                        stage_field: stage_data,
-                        "updated_at": datetime.utcnow()
-                    }
-                }
+            application = await StageWorkflowService().apply(
+                application_id, "submit", stage, user_id, user_role,
+                fields={STAGE_FORM_NAMES[stage]: stage_data}
             )
-            
-            if result.modified_count == 0:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Failed to update stage feedback"
-                )
-            
-            return await self.get_application_by_id(application_id)
+            return await self._to_response(application)
         except Exception as e:
             if isinstance(e, HTTPException):
                 raise e
@@ -185,38 +489,17 @@ class ApplicationService:
                 detail="Internal server error"
             )
 
-    async def update_final_recommendation(self, application_id: str, recommendation_data: dict) -> ApplicationResponse:
+    async def update_final_recommendation(self, application_id: str, recommendation_data: dict, user_id: str) -> ApplicationResponse:
         """Update final recommendation for an application."""
         try:
-            application = await self.db.applications.find_one({"_id": ObjectId(application_id)})
-            if not application:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail="Application not found"
-                )
-            
             # Add completion timestamp
             recommendation_data["completed_at"] = datetime.utcnow()
             
-            # Update the application
-            result = await self.db.applications.update_one(
-                {"_id": ObjectId(application_id)},
-                {
-                    "$set": {
-                        "stages.stage7_final_recommendation": recommendation_data,
-                        "status": "completed",
-                        "updated_at": datetime.utcnow()
-                    }
-                }
+            application = await StageWorkflowService().apply(
+                application_id, "finalize", 7, user_id,
+                fields={"final_recommendation": recommendation_data}
             )
-            
-            if result.modified_count == 0:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Failed to update final recommendation"
-                )
-            
-            return await self.get_application_by_id(application_id)
+            return await self._to_response(application)
         except Exception as e:
             if isinstance(e, HTTPException):
                 raise e
@@ -227,12 +510,130 @@ class ApplicationService:
 
     async def delete_application(self, application_id: str):
         """Delete an application."""
-        result = await self.db.applications.delete_one({"_id": ObjectId(application_id)})
-        if result.deleted_count == 0:
+        application = await self.db.applications.find_one_and_delete(
+            {"_id": ObjectId(application_id)},
+            projection={"candidate_id": 1, "stages": 1, "resume_sha256": 1}
+        )
+        if not application:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Application not found"
             )
+        
+        # Leave tombstones so delta-sync clients drop their copies
+        tombstone_service = TombstoneService()
+        await tombstone_service.record_deletion(
+            "applications", application_id, visible_to=[application["candidate_id"]]
+        )
+        stages = application.get("stages", {})
+        await tombstone_service.record_deletions("assignments", [
+            (f"{application_id}:{stage_num}", [stages[f"stage{stage_num}_assigned_to"]])
+            for stage_num in range(1, 8)
+            if stages.get(f"stage{stage_num}_assigned_to")
+        ])
+        
+        # Notifications about a deleted application are no longer listed either
+        notifications = await self.db.notifications.find(
+            {"application_id": application_id}, {"user_id": 1}
+        ).to_list(length=None)
+        await tombstone_service.record_deletions("notifications", [
+            (str(notification["_id"]), [notification["user_id"]])
+            for notification in notifications
+        ])
+        
+        await self.db.resume_text.delete_one({"_id": application_id})
+        await self.db.resume_index.delete_one({"_id": application_id})
+        
+        # Delete the resume file once no other application uses the same content
+        if application.get("resume_sha256"):
+            await ResumeBlobService().release(application["resume_sha256"])
+
+    async def get_job_shortlist(self, job_id: str, limit: int = 20) -> List[ApplicationListResponse]:
+        """A job's applications with the best skill match scores, read off the (job_id, match_score) index."""
+        cursor = self.db.applications.find(
+            {"job_id": job_id, "match_score": {"$ne": None}}
+        ).sort([("match_score", -1), ("_id", 1)]).limit(limit)
+        
+        applications = []
+        async for application in cursor:
+            application["id"] = str(application.pop("_id"))
+            applications.append(application)
+        
+        await self._fill_job_titles(applications)
+        
+        return [ApplicationListResponse(**application) for application in applications]
+
+    async def get_job_top_candidates(
+        self, job_id: str, limit: int = 10, exclude_failed: bool = True
+    ) -> List[ApplicationListResponse]:
+        """A job's applications with the best scorecard scores, read off the (job_id, scorecard.score) index."""
+        query = {"job_id": job_id, "scorecard.score": {"$ne": None}}
+        if exclude_failed:
+            query["scorecard.has_failed_stage"] = False
+        cursor = self.db.applications.find(query).sort([("scorecard.score", -1), ("_id", 1)]).limit(limit)
+        
+        applications = []
+        async for application in cursor:
+            application["id"] = str(application.pop("_id"))
+            applications.append(application)
+        
+        await self._fill_job_titles(applications)
+        
+        return [ApplicationListResponse(**application) for application in applications]
+
+    async def job_resumes_zip(self, job_id: str, batch_size: int = 500) -> AsyncIterator[bytes]:
+        """
+        Stream a ZIP archive of the resumes of a job's applications plus a manifest.csv.
+        
+        Applications are read one cursor batch at a time and each file is
+        streamed through a bounded read-ahead buffer, so memory use doesn't
+        depend on the number or size of the resumes. The manifest is written
+        last so it can say which resumes were missing on disk; its rows are
+        spooled to a temporary file until then.
+        """
+        projection = {
+            "name": 1, "email": 1, "mobile": 1, "status": 1, "current_stage": 1,
+            "date_of_application": 1, "match_score": 1, "scorecard.score": 1, "resume_filename": 1
+        }
+        cursor = self.db.applications.find({"job_id": job_id}, projection).sort("_id", 1).batch_size(batch_size)
+        
+        with tempfile.SpooledTemporaryFile(max_size=1024 * 1024) as manifest:
+            manifest.write(csv_row(RESUME_ARCHIVE_MANIFEST_COLUMNS))
+            
+            async def members() -> AsyncIterator[ZipMember]:
+                async for application in cursor:
+                    row = {
+                        **application,
+                        "id": str(application["_id"]),
+                        "scorecard_score": (application.get("scorecard") or {}).get("score"),
+                        "included": "no resume"
+                    }
+                    filename = application.get("resume_filename")
+                    if filename:
+                        extension = os.path.splitext(filename)[1].lower()
+                        safe_name = re.sub(r"[^\w.\- ]+", "_", application.get("name") or "").strip() or "resume"
+                        row["file"] = f"{safe_name} - {row['id']}{extension}"
+                        try:
+                            file = await asyncio.to_thread(open, get_file_path(filename), "rb")
+                        except (OSError, ValueError):
+                            row["included"] = "missing"
+                        else:
+                            try:
+                                modified_at = datetime.utcfromtimestamp(os.fstat(file.fileno()).st_mtime)
+                                yield ZipMember(
+                                    row["file"], modified_at, read_ahead(file),
+                                    compress=extension not in RESUME_ARCHIVE_STORED_EXTENSIONS
+                                )
+                                row["included"] = "yes"
+                            finally:
+                                file.close()
+                    manifest.write(csv_row([row.get(column) for column in RESUME_ARCHIVE_MANIFEST_COLUMNS]))
+                
+                manifest.seek(0)
+                yield ZipMember("manifest.csv", datetime.utcnow(), read_ahead(manifest), compress=True)
+            
+            async for chunk in zip_chunks(members()):
+                yield chunk
 
     async def get_applications_by_job(self, job_id: str) -> List[ApplicationListResponse]:
         """Get all applications for a specific job."""
@@ -241,19 +642,11 @@ class ApplicationService:
         async for application in cursor:
             application["id"] = str(application["_id"])
             del application["_id"]
-            
-            # Get job title for the application
-            from .job_service import JobService
-            job_service = JobService()
-            job = await job_service.get_job_by_id(application["job_id"])
-            if job:
-                application["job_title"] = job.title
-            else:
-                application["job_title"] = "Unknown Job"
-            
-            applications.append(ApplicationListResponse(**application))
+            applications.append(application)
         
-        return applications
+        await self._fill_job_titles(applications)
+        
+        return [ApplicationListResponse(**application) for application in applications]
 
     async def update_application_status(self, application_id: str, status: str) -> ApplicationResponse:
         """Update application status."""
@@ -277,124 +670,26 @@ class ApplicationService:
 
     async def forward_stage_to_hr(self, application_id: str, stage_number: int, user_id: str) -> ApplicationResponse:
         """Forward a completed stage to HR for review."""
-        # Verify application exists
-        application = await self.db.applications.find_one({"_id": ObjectId(application_id)})
-        if not application:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Application not found"
-            )
-        
-        # Check if current stage is completed
-        stage_status_field = f"stage{stage_number}_status"
-        if application.get("stages", {}).get(stage_status_field) != "completed":
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Stage {stage_number} must be completed before forwarding"
-            )
-        
-        # Update stage status to "forwarded"
-        result = await self.db.applications.update_one(
-            {"_id": ObjectId(application_id)},
-            {
-                "$set": {
-                    stage_status_field: "forwarded",
-                    "updated_at": datetime.utcnow()
-                }
-            }
-        )
-        
-        if result.modified_count == 0:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Failed to forward stage"
-            )
-        
-        return await self.get_application_by_id(application_id)
+        application = await StageWorkflowService().apply(application_id, "forward", stage_number, user_id)
+        return await self._to_response(application)
 
     async def approve_stage_by_hr(self, application_id: str, stage_number: int, user_id: str) -> ApplicationResponse:
         """Approve a forwarded stage and move to next stage."""
-        # Verify application exists
-        application = await self.db.applications.find_one({"_id": ObjectId(application_id)})
-        if not application:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Application not found"
-            )
-        
-        # Check if current stage is forwarded
-        stage_status_field = f"stage{stage_number}_status"
-        if application.get("stages", {}).get(stage_status_field) != "forwarded":
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Stage {stage_number} must be forwarded before approval"
-            )
-        
-        # Move to next stage
-        current_stage = application.get("current_stage", 1)
-        next_stage = current_stage + 1
-        
-        # Update application
-        updates = {
-            stage_status_field: "approved",
-            "current_stage": next_stage,
-            "updated_at": datetime.utcnow()
-        }
-        
-        result = await self.db.applications.update_one(
-            {"_id": ObjectId(application_id)},
-            {"$set": updates}
-        )
-        
-        if result.modified_count == 0:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Failed to approve stage"
-            )
-        
-        return await self.get_application_by_id(application_id)
+        application = await StageWorkflowService().apply(application_id, "approve", stage_number, user_id)
+        return await self._to_response(application)
 
     async def reject_stage_by_hr(self, application_id: str, stage_number: int, reason: str, user_id: str) -> ApplicationResponse:
         """Reject a forwarded stage and provide reason."""
-        # Verify application exists
-        application = await self.db.applications.find_one({"_id": ObjectId(application_id)})
-        if not application:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Application not found"
-            )
-        
-        # Check if current stage is forwarded
-        stage_status_field = f"stage{stage_number}_status"
-        if application.get("stages", {}).get(stage_status_field) != "forwarded":
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Stage {stage_number} must be forwarded before rejection"
-            )
-        
-        # Update application
-        updates = {
-            stage_status_field: "rejected",
-            "status": "rejected",
-            "updated_at": datetime.utcnow()
-        }
-        
-        # Add rejection reason
-        rejection_field = f"stage{stage_number}_rejection_reason"
-        updates[rejection_field] = reason
-        
-        result = await self.db.applications.update_one(
-            {"_id": ObjectId(application_id)},
-            {"$set": updates}
+        application = await StageWorkflowService().apply(
+            application_id, "reject", stage_number, user_id, fields={"rejection_reason": reason}
         )
-        
-        if result.modified_count == 0:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Failed to reject stage"
-            )
-        
-        return await self.get_application_by_id(application_id)
+        return await self._to_response(application)
+
+    async def _to_response(self, application: dict) -> ApplicationResponse:
+        """Build the response for an application document already read from the database."""
+        application["id"] = str(application.pop("_id"))
+        await self._fill_job_titles([application])
+        return ApplicationResponse(**application)
 
     async def get_all_interviewers_for_assignment(self) -> List[dict]:
         """Get all users available for assignment (HR, Admin, Team Members - excluding candidates)."""
@@ -6,6 +6,10 @@ from ..models.application import StageAssignmentModel, StageAssignmentRequestMod
 from ..models.user import UserRole
 from fastapi import HTTPException, status
 from .notification_service import NotificationService
+from .job_service import JobService
+from .tombstone_service import TombstoneService
+from .stage_workflow_service import StageWorkflowService
+from ..utils.delta_sync import build_delta_filter, encode_cursor, sync_server_time
 
 
 class AssignmentService:
@@ -14,6 +18,7 @@ class AssignmentService:
     def __init__(self):
         self.db = get_database()
         self.notification_service = NotificationService()
+        self.job_service = JobService()
 
     async def assign_stage(
         self,
@@ -41,38 +46,12 @@ class AssignmentService:
         Raises:
             HTTPException: If validation fails
         """
-        # Validate application exists
-        try:
-            application = await self.db.applications.find_one({"_id": ObjectId(application_id)})
-        except Exception:
+        if not ObjectId.is_valid(application_id):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Invalid application ID"
             )
         
-        if not application:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Application not found"
-            )
-        
-        # Validate stage number
-        if stage_number < 1 or stage_number > 7:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Stage number must be between 1 and 7"
-            )
-        
-        # Check if stage is in pending status
-        stage_status_field = f"stage{stage_number}_status"
-        current_status = application.get("stages", {}).get(stage_status_field, "pending")
-        
-        if current_status != "pending":
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Stage {stage_number} is not in pending status. Current status: {current_status}"
-            )
-        
         # Validate team member exists and has appropriate role
         try:
             team_member = await self.db.users.find_one({"_id": ObjectId(assigned_to)})
@@ -96,15 +75,13 @@ class AssignmentService:
                 detail="User must have team_member, hr, or admin role to be assigned"
             )
         
-        # Check for existing assignment (prevent duplicate assignments)
-        stage_assigned_to_field = f"stage{stage_number}_assigned_to"
-        existing_assignment = application.get("stages", {}).get(stage_assigned_to_field)
-        
-        if existing_assignment:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Stage {stage_number} is already assigned to another team member"
-            )
+        # Assign only a pending stage nobody holds yet, checked in the same write
+        stage_fields = {"assigned_to": assigned_to}
+        if deadline:
+            stage_fields["deadline"] = deadline
+        application = await StageWorkflowService().apply(
+            application_id, "assign", stage_number, assigned_by, fields=stage_fields
+        )
         
         # Create assignment record in audit trail
         assignment_data = StageAssignmentModel(
@@ -122,32 +99,13 @@ class AssignmentService:
         result = await self.db.stage_assignments.insert_one(assignment_dict)
         assignment_dict["_id"] = result.inserted_id
         
-        # Update application document
-        update_fields = {
-            f"stages.{stage_assigned_to_field}": assigned_to,
-            f"stages.{stage_status_field}": "assigned",
-            "updated_at": datetime.utcnow()
-        }
-        
-        # Add deadline to application stages if provided
-        if deadline:
-            stage_deadline_field = f"stage{stage_number}_deadline"
-            update_fields[f"stages.{stage_deadline_field}"] = deadline
-        
-        await self.db.applications.update_one(
-            {"_id": ObjectId(application_id)},
-            {"$set": update_fields}
-        )
-        
         # Send notification to assigned team member
         try:
             # Get assigned_by user details
             assigned_by_user = await self.db.users.find_one({"_id": ObjectId(assigned_by)})
             assigned_by_name = assigned_by_user.get("username", "Admin") if assigned_by_user else "Admin"
             
-            # Get job details
-            job = await self.db.jobs.find_one({"_id": ObjectId(application["job_id"])})
-            job_title = job.get("title", "Unknown Job") if job else "Unknown Job"
+            job_title = application.get("job_title") or await self.job_service.get_job_title(application["job_id"])
             
             await self.notification_service.send_assignment_notification(
                 user_id=assigned_to,
@@ -178,49 +136,135 @@ class AssignmentService:
         assignments = []
         
         # Query for each stage
+        assigned = []
         for stage_num in range(1, 8):
             stage_assigned_field = f"stages.stage{stage_num}_assigned_to"
-            stage_status_field = f"stages.stage{stage_num}_status"
             
             cursor = self.db.applications.find({stage_assigned_field: user_id})
             
             async for application in cursor:
-                application_id = str(application["_id"])
-                stage_status = application.get("stages", {}).get(f"stage{stage_num}_status", "pending")
-                
-                # Get job details
-                job = await self.db.jobs.find_one({"_id": ObjectId(application["job_id"])})
-                job_title = job.get("title", "Unknown Job") if job else "Unknown Job"
-                
-                # Get assignment details from audit trail
-                assignment_record = await self.db.stage_assignments.find_one({
-                    "application_id": application_id,
-                    "stage_number": stage_num,
-                    "assigned_to": user_id
-                })
-                
-                assignment_info = {
-                    "id": application_id,
-                    "application_id": application_id,
-                    "candidate_name": application.get("name"),
-                    "candidate_email": application.get("email"),
-                    "job_id": application.get("job_id"),
-                    "job_title": job_title,
-                    "stage_number": stage_num,
-                    "stage_name": self._get_stage_name(stage_num),
-                    "status": stage_status,
-                    "assigned_at": assignment_record.get("assigned_at") if assignment_record else None,
-                    "deadline": assignment_record.get("deadline") if assignment_record else None,
-                    "notes": assignment_record.get("notes") if assignment_record else None
-                }
-                
-                assignments.append(assignment_info)
+                assigned.append((application, stage_num))
+        
+        records = await self._assignment_records(assigned, user_id)
+        for application, stage_num in assigned:
+            assignments.append(await self._build_assignment_info(application, stage_num, records))
         
         # Sort by assigned_at (most recent first)
         assignments.sort(key=lambda x: x.get("assigned_at") or datetime.min, reverse=True)
         
         return assignments
 
+    async def get_my_assignments_delta(
+        self,
+        user_id: str,
+        updated_since: Optional[datetime] = None,
+        cursor: Optional[str] = None,
+        limit: int = 100
+    ) -> dict:
+        """
+        Get assignments on applications changed since a timestamp (delta sync).
+        
+        Clients should key assignments on (application_id, stage_number); deleted
+        or reassigned-away assignments come back as tombstones with id
+        "<application_id>:<stage_number>".
+        
+        Args:
+            user_id: User ID of the team member
+            updated_since: Only include applications changed at or after this time
+            cursor: Resume after the last application of the previous page
+            limit: Maximum number of applications per page
+            
+        Returns:
+            dict with assignments, deleted tombstones, next_cursor and server_time
+        """
+        server_time = sync_server_time()
+        tombstone_service = TombstoneService()
+        
+        # One clause per stage so each can use its (assigned_to, updated_at) index
+        delta_filter = build_delta_filter(updated_since, cursor)
+        query = {"$or": [
+            {"$and": [{f"stages.stage{stage_num}_assigned_to": user_id}, delta_filter]}
+            for stage_num in range(1, 8)
+        ]}
+        
+        applications_cursor = self.db.applications.find(query).sort([("updated_at", 1), ("_id", 1)]).limit(limit)
+        
+        assigned = []
+        application_count = 0
+        last_application = None
+        async for application in applications_cursor:
+            application_count += 1
+            last_application = application
+            stages = application.get("stages", {})
+            for stage_num in range(1, 8):
+                if stages.get(f"stage{stage_num}_assigned_to") == user_id:
+                    assigned.append((application, stage_num))
+        
+        records = await self._assignment_records(assigned, user_id)
+        assignments = [
+            await self._build_assignment_info(application, stage_num, records)
+            for application, stage_num in assigned
+        ]
+        
+        next_cursor = None
+        if application_count == limit:
+            next_cursor = encode_cursor(last_application["updated_at"], last_application["_id"])
+        
+        # Deletions are only sent with the first page of a sync
+        deleted = []
+        reset = False
+        if updated_since and not cursor:
+            reset = tombstone_service.is_expired(updated_since)
+            deleted = await tombstone_service.get_deletions("assignments", updated_since, user_id)
+        
+        return {
+            "assignments": assignments,
+            "deleted": [tombstone.dict() for tombstone in deleted],
+            "next_cursor": next_cursor,
+            "server_time": server_time,
+            "reset": reset
+        }
+
+    async def _assignment_records(self, assigned: List[tuple], user_id: str) -> dict:
+        """
+        The user's stage_assignments records for (application, stage number) pairs,
+        fetched with one query and keyed by (application_id, stage_number).
+        """
+        application_ids = list({str(application["_id"]) for application, _ in assigned})
+        if not application_ids:
+            return {}
+        records = {}
+        cursor = self.db.stage_assignments.find(
+            {"application_id": {"$in": application_ids}, "assigned_to": user_id}
+        ).sort("assigned_at", 1)
+        async for record in cursor:
+            # The latest record wins when the stage was assigned to the user more than once
+            records[(record["application_id"], record["stage_number"])] = record
+        return records
+
+    async def _build_assignment_info(self, application: dict, stage_num: int, records: dict) -> dict:
+        """Build the assignment entry for one assigned stage of an application."""
+        application_id = str(application["_id"])
+        stage_status = application.get("stages", {}).get(f"stage{stage_num}_status", "pending")
+        
+        # Assignment details from the audit trail
+        assignment_record = records.get((application_id, stage_num))
+        
+        return {
+            "id": application_id,
+            "application_id": application_id,
+            "candidate_name": application.get("name"),
+            "candidate_email": application.get("email"),
+            "job_id": application.get("job_id"),
+            "job_title": application.get("job_title") or await self.job_service.get_job_title(application["job_id"]),
+            "stage_number": stage_num,
+            "stage_name": self._get_stage_name(stage_num),
+            "status": stage_status,
+            "assigned_at": assignment_record.get("assigned_at") if assignment_record else None,
+            "deadline": assignment_record.get("deadline") if assignment_record else None,
+            "notes": assignment_record.get("notes") if assignment_record else None
+        }
+
     async def reassign_stage(
         self,
         application_id: str,
@@ -267,19 +311,8 @@ class AssignmentService:
                 detail="Stage number must be between 1 and 7"
             )
         
-        # Check if stage is not completed
-        stage_status_field = f"stage{stage_number}_status"
-        current_status = application.get("stages", {}).get(stage_status_field, "pending")
-        
-        if current_status == "completed":
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Cannot reassign completed stage {stage_number}"
-            )
-        
-        # Get current assignment
-        stage_assigned_to_field = f"stage{stage_number}_assigned_to"
-        old_assigned_to = application.get("stages", {}).get(stage_assigned_to_field)
+        # The current assignee, which the reassignment must still replace when it is written
+        old_assigned_to = application.get("stages", {}).get(f"stage{stage_number}_assigned_to")
         
         if not old_assigned_to:
             raise HTTPException(
@@ -310,6 +343,13 @@ class AssignmentService:
                 detail="User must have team_member, hr, or admin role to be assigned"
             )
         
+        # Reassign only an unfinished stage still held by old_assigned_to, checked in the same write
+        application = await StageWorkflowService().apply(
+            application_id, "reassign", stage_number, assigned_by,
+            fields={"assigned_to": new_assigned_to},
+            expected={"assigned_to": old_assigned_to}
+        )
+        
         # Create new assignment record with reassignment info
         assignment_data = StageAssignmentModel(
             application_id=application_id,
@@ -325,17 +365,11 @@ class AssignmentService:
         assignment_dict = assignment_data.dict()
         await self.db.stage_assignments.insert_one(assignment_dict)
         
-        # Update application document
-        update_fields = {
-            f"stages.{stage_assigned_to_field}": new_assigned_to,
-            f"stages.{stage_status_field}": "assigned",
-            "updated_at": datetime.utcnow()
-        }
-        
-        await self.db.applications.update_one(
-            {"_id": ObjectId(application_id)},
-            {"$set": update_fields}
-        )
+        # The previous assignee's delta sync must drop this assignment
+        if old_assigned_to != new_assigned_to:
+            await TombstoneService().record_deletion(
+                "assignments", f"{application_id}:{stage_number}", visible_to=[old_assigned_to]
+            )
         
         # Send notifications to both old and new assignees
         try:
@@ -343,9 +377,7 @@ class AssignmentService:
             assigned_by_user = await self.db.users.find_one({"_id": ObjectId(assigned_by)})
             assigned_by_name = assigned_by_user.get("username", "Admin") if assigned_by_user else "Admin"
             
-            # Get job details
-            job = await self.db.jobs.find_one({"_id": ObjectId(application["job_id"])})
-            job_title = job.get("title", "Unknown Job") if job else "Unknown Job"
+            job_title = application.get("job_title") or await self.job_service.get_job_title(application["job_id"])
             
             await self.notification_service.send_reassignment_notification(
                 old_user_id=old_assigned_to,
@@ -372,11 +404,26 @@ class AssignmentService:
             application_id: ID of the application
             
         Returns:
-            List of assignment records with user details
+            List of assignment records with user details, most recent first
+        """
+        application = await self.get_application_for_assignments(application_id)
+        return [assignment async for assignment in self.iter_stage_assignments(application)]
+    
+    async def get_application_for_assignments(self, application_id: str) -> dict:
+        """
+        Validate that an application exists before listing its assignments.
+        
+        Args:
+            application_id: ID of the application
+            
+        Returns:
+            The application's stages (needed to report feedback details)
         """
-        # Validate application exists
         try:
-            application = await self.db.applications.find_one({"_id": ObjectId(application_id)})
+            application = await self.db.applications.find_one(
+                {"_id": ObjectId(application_id)},
+                {"stages": 1}
+            )
         except Exception:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -388,30 +435,80 @@ class AssignmentService:
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Application not found"
             )
+        return application
+    
+    async def iter_stage_assignments(
+        self,
+        application: dict,
+        assigned_to: Optional[str] = None,
+        batch_size: int = 100
+    ):
+        """
+        Yield assignment records of an application, most recent first.
         
-        # Get all assignment records for this application
-        cursor = self.db.stage_assignments.find({"application_id": application_id})
-        assignments = []
+        User details are resolved with one query per cursor batch instead of
+        up to three lookups per record.
+        
+        Args:
+            application: Application returned by get_application_for_assignments
+            assigned_to: If set, only this user's assignments
+            batch_size: Cursor batch size
+            
+        Yields:
+            Assignment records with user details
+        """
+        application_id = str(application["_id"])
+        query = {"application_id": application_id}
+        if assigned_to:
+            query["assigned_to"] = assigned_to
         
+        cursor = self.db.stage_assignments.find(query).sort("assigned_at", -1).batch_size(batch_size)
+        
+        batch = []
         async for assignment in cursor:
+            batch.append(assignment)
+            if len(batch) >= batch_size:
+                for record in await self._build_assignment_records(batch, application):
+                    yield record
+                batch = []
+        
+        if batch:
+            for record in await self._build_assignment_records(batch, application):
+                yield record
+    
+    async def _build_assignment_records(self, assignments: List[dict], application: dict) -> List[dict]:
+        """Add user names/emails, stage name and feedback details to a batch of assignment records."""
+        user_ids = set()
+        for assignment in assignments:
+            for field in ("assigned_to", "assigned_by", "reassigned_from"):
+                if assignment.get(field) and ObjectId.is_valid(assignment[field]):
+                    user_ids.add(ObjectId(assignment[field]))
+        
+        users = {}
+        if user_ids:
+            async for user in self.db.users.find({"_id": {"$in": list(user_ids)}}, {"username": 1, "email": 1}):
+                users[str(user["_id"])] = user
+        
+        records = []
+        for assignment in assignments:
             assignment["id"] = str(assignment["_id"])
             del assignment["_id"]
             
             # Get assigned_to user details
-            assigned_to_user = await self.db.users.find_one({"_id": ObjectId(assignment["assigned_to"])})
+            assigned_to_user = users.get(assignment.get("assigned_to"))
             if assigned_to_user:
                 assignment["assigned_to_name"] = assigned_to_user.get("username")
                 assignment["assigned_to_email"] = assigned_to_user.get("email")
             
             # Get assigned_by user details
-            assigned_by_user = await self.db.users.find_one({"_id": ObjectId(assignment["assigned_by"])})
+            assigned_by_user = users.get(assignment.get("assigned_by"))
             if assigned_by_user:
                 assignment["assigned_by_name"] = assigned_by_user.get("username")
                 assignment["assigned_by_email"] = assigned_by_user.get("email")
             
             # Get reassigned_from user details if applicable
             if assignment.get("reassigned_from"):
-                reassigned_from_user = await self.db.users.find_one({"_id": ObjectId(assignment["reassigned_from"])})
+                reassigned_from_user = users.get(assignment["reassigned_from"])
                 if reassigned_from_user:
                     assignment["reassigned_from_name"] = reassigned_from_user.get("username")
             
@@ -426,12 +523,9 @@ class AssignmentService:
                     assignment["feedback_approval_status"] = feedback.get("approval_status")
                     assignment["feedback_rating"] = feedback.get("performance_rating")
             
-            assignments.append(assignment)
+            records.append(assignment)
         
-        # Sort by assigned_at (most recent first)
-        assignments.sort(key=lambda x: x.get("assigned_at", datetime.min), reverse=True)
-        
-        return assignments
+        return records
     
     async def record_status_change(
         self,
@@ -493,21 +587,12 @@ class AssignmentService:
         Raises:
             HTTPException: If validation fails
         """
-        # Validate application exists
-        try:
-            application = await self.db.applications.find_one({"_id": ObjectId(application_id)})
-        except Exception:
+        if not ObjectId.is_valid(application_id):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Invalid application ID"
             )
         
-        if not application:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Application not found"
-            )
-        
         # Validate stage numbers
         if not stage_numbers or len(stage_numbers) == 0:
             raise HTTPException(
@@ -545,82 +630,39 @@ class AssignmentService:
                 detail="User must have team_member, hr, or admin role to be assigned"
             )
         
-        # Validate all selected stages are in pending status
-        invalid_stages = []
-        for stage_number in stage_numbers:
-            stage_status_field = f"stage{stage_number}_status"
-            current_status = application.get("stages", {}).get(stage_status_field, "pending")
-            
-            if current_status != "pending":
-                invalid_stages.append({
-                    "stage_number": stage_number,
-                    "current_status": current_status
-                })
-        
-        if invalid_stages:
-            error_details = ", ".join([
-                f"Stage {s['stage_number']} ({s['current_status']})" 
-                for s in invalid_stages
-            ])
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"All selected stages must be in pending status. Invalid stages: {error_details}"
-            )
+        # Assign every selected stage in one write, which only matches if all of them
+        # are still pending and unassigned
+        stage_fields = {"assigned_to": assigned_to}
+        if deadline:
+            stage_fields["deadline"] = deadline
+        application = await StageWorkflowService().apply_to_stages(
+            application_id, "assign", stage_numbers, assigned_by, fields=stage_fields
+        )
         
-        # Create assignments for all selected stages
-        successful_assignments = []
+        # Create assignment records in audit trail
+        stage_numbers = list(dict.fromkeys(stage_numbers))
+        assigned_at = datetime.utcnow()
+        await self.db.stage_assignments.insert_many([
+            StageAssignmentModel(
+                application_id=application_id,
+                stage_number=stage_number,
+                assigned_to=assigned_to,
+                assigned_by=assigned_by,
+                assigned_at=assigned_at,
+                status="assigned",
+                deadline=deadline,
+                notes=notes
+            ).dict()
+            for stage_number in stage_numbers
+        ])
+        
+        successful_assignments = [
+            {"stage_number": stage_number, "stage_name": self._get_stage_name(stage_number)}
+            for stage_number in stage_numbers
+        ]
+        # The stages are assigned together or not at all, so nothing fails on its own
         failed_assignments = []
         
-        for stage_number in stage_numbers:
-            try:
-                # Create assignment record in audit trail
-                assignment_data = StageAssignmentModel(
-                    application_id=application_id,
-                    stage_number=stage_number,
-                    assigned_to=assigned_to,
-                    assigned_by=assigned_by,
-                    assigned_at=datetime.utcnow(),
-                    status="assigned",
-                    deadline=deadline,
-                    notes=notes
-                )
-                
-                assignment_dict = assignment_data.dict()
-                result = await self.db.stage_assignments.insert_one(assignment_dict)
-                assignment_dict["_id"] = result.inserted_id
-                
-                # Update application document
-                stage_assigned_to_field = f"stage{stage_number}_assigned_to"
-                stage_status_field = f"stage{stage_number}_status"
-                
-                update_fields = {
-                    f"stages.{stage_assigned_to_field}": assigned_to,
-                    f"stages.{stage_status_field}": "assigned",
-                    "updated_at": datetime.utcnow()
-                }
-                
-                # Add deadline to application stages if provided
-                if deadline:
-                    stage_deadline_field = f"stage{stage_number}_deadline"
-                    update_fields[f"stages.{stage_deadline_field}"] = deadline
-                
-                await self.db.applications.update_one(
-                    {"_id": ObjectId(application_id)},
-                    {"$set": update_fields}
-                )
-                
-                successful_assignments.append({
-                    "stage_number": stage_number,
-                    "stage_name": self._get_stage_name(stage_number)
-                })
-                
-            except Exception as e:
-                failed_assignments.append({
-                    "stage_number": stage_number,
-                    "stage_name": self._get_stage_name(stage_number),
-                    "error": str(e)
-                })
-        
         # Send notification to assigned team member for all successful assignments
         if successful_assignments:
             try:
@@ -628,9 +670,7 @@ class AssignmentService:
                 assigned_by_user = await self.db.users.find_one({"_id": ObjectId(assigned_by)})
                 assigned_by_name = assigned_by_user.get("username", "Admin") if assigned_by_user else "Admin"
                 
-                # Get job details
-                job = await self.db.jobs.find_one({"_id": ObjectId(application["job_id"])})
-                job_title = job.get("title", "Unknown Job") if job else "Unknown Job"
+                job_title = application.get("job_title") or await self.job_service.get_job_title(application["job_id"])
                 
                 # Send a single notification for bulk assignment
                 stage_list = ", ".join([f"Stage {a['stage_number']}" for a in successful_assignments])
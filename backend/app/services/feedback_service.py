@@ -4,6 +4,7 @@ from bson import ObjectId
 from ..database import get_database
 from ..models.application import StageFeedback, FeedbackSubmission
 from ..models.user import UserRole
+from .stage_workflow_service import StageWorkflowService, STATUS_TRANSITIONS
 from fastapi import HTTPException, status
 
 
@@ -59,8 +60,8 @@ class FeedbackService:
                 detail="Stage number must be between 1 and 7"
             )
         
-        # Verify user is assigned to this stage or is HR/Admin
-        # Get user to check role
+        # Get user to check role: HR and Admin can submit feedback for any stage,
+        # team members only for stages assigned to them (guarded by the workflow)
         user = await self.db.users.find_one({"_id": ObjectId(submitted_by)})
         if not user:
             raise HTTPException(
@@ -68,20 +69,6 @@ class FeedbackService:
                 detail="User not found"
             )
         
-        user_role = user.get("role")
-        
-        # HR and Admin can submit feedback for any stage
-        # Team members can only submit for stages assigned to them
-        if user_role not in ["hr", "admin"]:
-            stage_assigned_to_field = f"stage{stage_number}_assigned_to"
-            assigned_to = application.get("stages", {}).get(stage_assigned_to_field)
-            
-            if assigned_to != submitted_by:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail="You are not assigned to this stage. Only assigned team members can submit feedback."
-                )
-        
         # Check if feedback already exists (for edit validation)
         stage_feedback_field = f"stage{stage_number}_feedback"
         existing_feedback = application.get("stages", {}).get(stage_feedback_field)
@@ -120,38 +107,12 @@ class FeedbackService:
                 edit_count=0
             )
         
-        # Update application document with feedback
-        stage_status_field = f"stage{stage_number}_status"
-        update_fields = {
-            f"stages.{stage_feedback_field}": feedback_data.dict(),
-            f"stages.{stage_status_field}": "completed",
-            "updated_at": datetime.utcnow()
-        }
-        
-        await self.db.applications.update_one(
-            {"_id": ObjectId(application_id)},
-            {"$set": update_fields}
+        # Store the feedback and complete the stage
+        updated_application = await StageWorkflowService().apply(
+            application_id, "submit", stage_number, submitted_by, user.get("role"),
+            fields={"feedback": feedback_data.dict()}
         )
-        
-        # Update assignment record status to completed
-        await self.db.stage_assignments.update_one(
-            {
-                "application_id": application_id,
-                "stage_number": stage_number,
-                "assigned_to": submitted_by
-            },
-            {
-                "$set": {
-                    "status": "completed",
-                    "completed_at": datetime.utcnow()
-                }
-            }
-        )
-        
-        # Get updated application
-        updated_application = await self.db.applications.find_one({"_id": ObjectId(application_id)})
-        updated_application["id"] = str(updated_application["_id"])
-        del updated_application["_id"]
+        updated_application["id"] = str(updated_application.pop("_id"))
         
         return updated_application
 
@@ -300,8 +261,9 @@ class FeedbackService:
         self,
         application_id: str,
         stage_number: int,
-        status: str,
-        user_id: str
+        new_status: str,
+        user_id: str,
+        user_role: Optional[str] = None
     ) -> dict:
         """
         Update the status of a stage.
@@ -309,8 +271,9 @@ class FeedbackService:
         Args:
             application_id: ID of the application
             stage_number: Stage number (1-7)
-            status: New status (assigned, in_progress, completed)
+            new_status: New status (assigned, in_progress, completed)
             user_id: User ID making the update
+            user_role: Role of that user; HR and admins may update stages not assigned to them
             
         Returns:
             dict: Updated application
@@ -318,89 +281,23 @@ class FeedbackService:
         Raises:
             HTTPException: If validation fails
         """
-        # Validate application exists
-        try:
-            application = await self.db.applications.find_one({"_id": ObjectId(application_id)})
-        except Exception:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Invalid application ID"
-            )
-        
-        if not application:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Application not found"
-            )
-        
-        # Validate stage number
-        if stage_number < 1 or stage_number > 7:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Stage number must be between 1 and 7"
-            )
-        
         # Validate status value
         valid_statuses = ["pending", "assigned", "in_progress", "completed"]
-        if status not in valid_statuses:
+        if new_status not in valid_statuses:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"Invalid status. Must be one of: {', '.join(valid_statuses)}"
             )
-        
-        # Verify user is assigned to this stage
-        stage_assigned_to_field = f"stage{stage_number}_assigned_to"
-        assigned_to = application.get("stages", {}).get(stage_assigned_to_field)
-        
-        if assigned_to != user_id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="You are not assigned to this stage"
-            )
-        
-        # Validate status transitions
-        stage_status_field = f"stage{stage_number}_status"
-        current_status = application.get("stages", {}).get(stage_status_field, "pending")
-        
-        # Define valid transitions
-        valid_transitions = {
-            "pending": ["assigned"],
-            "assigned": ["in_progress"],
-            "in_progress": ["completed"],
-            "completed": []  # Cannot transition from completed
-        }
-        
-        if status not in valid_transitions.get(current_status, []):
+        if new_status not in STATUS_TRANSITIONS:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Invalid status transition from {current_status} to {status}"
+                detail=f"Invalid status transition to {new_status}"
             )
         
-        # Update stage status
-        update_fields = {
-            f"stages.{stage_status_field}": status,
-            "updated_at": datetime.utcnow()
-        }
-        
-        await self.db.applications.update_one(
-            {"_id": ObjectId(application_id)},
-            {"$set": update_fields}
+        updated_application = await StageWorkflowService().apply(
+            application_id, STATUS_TRANSITIONS[new_status], stage_number, user_id, user_role
         )
-        
-        # Update assignment record status
-        await self.db.stage_assignments.update_one(
-            {
-                "application_id": application_id,
-                "stage_number": stage_number,
-                "assigned_to": user_id
-            },
-            {"$set": {"status": status}}
-        )
-        
-        # Get updated application
-        updated_application = await self.db.applications.find_one({"_id": ObjectId(application_id)})
-        updated_application["id"] = str(updated_application["_id"])
-        del updated_application["_id"]
+        updated_application["id"] = str(updated_application.pop("_id"))
         
         return updated_application
 
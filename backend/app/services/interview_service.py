@@ -1,4 +1,4 @@
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, AsyncIterator
 from datetime import datetime
 from bson import ObjectId
 from fastapi import HTTPException, status
@@ -6,16 +6,21 @@ from ..database import get_database
 from ..models.application import (
     StageAssignmentRequest, StageAssignmentResponse, ApplicationResponse,
     HRScreening, PracticalLabTest, TechnicalInterview, HRRound, 
-    BULeadInterview, CEOInterview, FinalRecommendationOffer, ApplicationStages
+    BULeadInterview, CEOInterview, FinalRecommendationOffer, ApplicationStages,
+    STAGE_FORM_NAMES
 )
 from ..models.user import UserResponse, UserRole
 from ..services.user_service import UserService
+from ..services.job_service import JobService
+from ..services.stage_workflow_service import StageWorkflowService
+from ..services.tombstone_service import TombstoneService
 
 
 class InterviewService:
     def __init__(self):
         self.db = get_database()
         self.user_service = UserService()
+        self.job_service = JobService()
 
     async def assign_stage(
         self, 
@@ -40,6 +45,28 @@ class InterviewService:
                 detail="Invalid team member assigned"
             )
         
+        # Assign a free pending stage, or take an unfinished one over from whoever
+        # holds it now; either way the stage is checked in the same write
+        current_assignee = (application.get("stages") or {}).get(
+            f"stage{assignment.stage_number}_assigned_to"
+        )
+        if current_assignee:
+            await StageWorkflowService().apply(
+                application_id, "reassign", assignment.stage_number, assigned_by,
+                fields={"assigned_to": assignment.assigned_to},
+                expected={"assigned_to": current_assignee}
+            )
+            # The previous assignee's delta sync must drop this assignment
+            if current_assignee != assignment.assigned_to:
+                await TombstoneService().record_deletion(
+                    "assignments", f"{application_id}:{assignment.stage_number}", visible_to=[current_assignee]
+                )
+        else:
+            await StageWorkflowService().apply(
+                application_id, "assign", assignment.stage_number, assigned_by,
+                fields={"assigned_to": assignment.assigned_to}
+            )
+        
         # Create stage assignment
         assignment_doc = {
             "application_id": application_id,
@@ -75,19 +102,6 @@ class InterviewService:
             result = await self.db.stage_assignments.insert_one(assignment_doc)
             assignment_doc["id"] = str(result.inserted_id)
         
-        # Update application stages
-        stage_field = f"stage{assignment.stage_number}_assigned_to"
-        status_field = f"stage{assignment.stage_number}_status"
-        
-        await self.db.applications.update_one(
-            {"_id": ObjectId(application_id)},
-            {"$set": {
-                stage_field: assignment.assigned_to,
-                status_field: "assigned",
-                "updated_at": datetime.utcnow()
-            }}
-        )
-        
         return StageAssignmentResponse(**assignment_doc)
 
     async def get_stage_assignments(
@@ -96,8 +110,15 @@ class InterviewService:
         current_user: UserResponse
     ) -> List[StageAssignmentResponse]:
         """Get all stage assignments for an application."""
-        # Verify application exists and user has access
-        application = await self.db.applications.find_one({"_id": ObjectId(application_id)})
+        await self.check_assignments_access(application_id, current_user)
+        return [assignment async for assignment in self.iter_stage_assignments(application_id)]
+
+    async def check_assignments_access(self, application_id: str, current_user: UserResponse):
+        """Verify an application exists and the user may see its assignments."""
+        application = await self.db.applications.find_one(
+            {"_id": ObjectId(application_id)},
+            {"candidate_id": 1}
+        )
         if not application:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -110,34 +131,61 @@ class InterviewService:
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Access denied"
             )
-        
-        assignments = await self.db.stage_assignments.find({
-            "application_id": application_id
-        }).to_list(length=None)
-        
-        return [StageAssignmentResponse(**{**assignment, "id": str(assignment["_id"])}) 
-                for assignment in assignments]
+
+    async def iter_stage_assignments(self, application_id: str) -> AsyncIterator[StageAssignmentResponse]:
+        """Yield an application's stage assignments as they are read (call check_assignments_access first)."""
+        cursor = self.db.stage_assignments.find({"application_id": application_id})
+        async for assignment in cursor:
+            yield StageAssignmentResponse(**{**assignment, "id": str(assignment["_id"])})
 
     async def get_my_assignments(self, user_id: str) -> List[Dict[str, Any]]:
         """Get all applications assigned to the current team member."""
-        assignments = await self.db.stage_assignments.find({
+        return [assignment async for assignment in self.iter_my_assignments(user_id)]
+
+    async def iter_my_assignments(self, user_id: str, batch_size: int = 100) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yield the open assignments of a team member with their application and job.
+        
+        Applications are loaded with one $in query per cursor batch.
+        """
+        cursor = self.db.stage_assignments.find({
             "assigned_to": user_id,
             "status": {"$in": ["pending", "assigned"]}
-        }).to_list(length=None)
+        }).batch_size(batch_size)
+        
+        batch = []
+        async for assignment in cursor:
+            batch.append(assignment)
+            if len(batch) >= batch_size:
+                for item in await self._build_my_assignments(batch):
+                    yield item
+                batch = []
+        
+        if batch:
+            for item in await self._build_my_assignments(batch):
+                yield item
+
+    async def _build_my_assignments(self, assignments: List[dict]) -> List[Dict[str, Any]]:
+        """Join a batch of assignments with their applications."""
+        application_ids = [
+            ObjectId(assignment["application_id"])
+            for assignment in assignments
+            if ObjectId.is_valid(assignment["application_id"])
+        ]
+        applications = {}
+        async for application in self.db.applications.find(
+            {"_id": {"$in": application_ids}},
+            {"name": 1, "email": 1, "mobile": 1, "current_stage": 1, "status": 1,
+             "job_id": 1, "job_title": 1, "job_department": 1}
+        ):
+            applications[str(application["_id"])] = application
         
         result = []
         for assignment in assignments:
             # Get application details
-            application = await self.db.applications.find_one({
-                "_id": ObjectId(assignment["application_id"])
-            })
+            application = applications.get(assignment["application_id"])
             
             if application:
-                # Get job details
-                job = await self.db.jobs.find_one({
-                    "_id": ObjectId(application["job_id"])
-                })
-                
                 result.append({
                     "assignment_id": str(assignment["_id"]),
                     "application_id": assignment["application_id"],
@@ -154,10 +202,10 @@ class InterviewService:
                         "status": application.get("status", "pending")
                     },
                     "job": {
-                        "id": str(job["_id"]),
-                        "title": job["title"],
-                        "department": job["department"]
-                    } if job else None
+                        "id": application["job_id"],
+                        "title": application.get("job_title") or await self.job_service.get_job_title(application["job_id"]),
+                        "department": application.get("job_department")
+                    }
                 })
         
         return result
@@ -169,9 +217,7 @@ class InterviewService:
         user_id: str
     ) -> ApplicationResponse:
         """Submit HR Screening feedback."""
-        return await self._submit_stage_feedback(
-            application_id, 1, feedback.dict(), user_id, "stage1_hr_screening"
-        )
+        return await self._submit_stage_feedback(application_id, 1, feedback.dict(), user_id)
 
     async def submit_stage2_feedback(
         self, 
@@ -180,9 +226,7 @@ class InterviewService:
         user_id: str
     ) -> ApplicationResponse:
         """Submit Practical Lab Test feedback."""
-        return await self._submit_stage_feedback(
-            application_id, 2, feedback.dict(), user_id, "stage2_practical_lab"
-        )
+        return await self._submit_stage_feedback(application_id, 2, feedback.dict(), user_id)
 
     async def submit_stage3_feedback(
         self, 
@@ -191,9 +235,7 @@ class InterviewService:
         user_id: str
     ) -> ApplicationResponse:
         """Submit Technical Interview feedback."""
-        return await self._submit_stage_feedback(
-            application_id, 3, feedback.dict(), user_id, "stage3_technical_interview"
-        )
+        return await self._submit_stage_feedback(application_id, 3, feedback.dict(), user_id)
 
     async def submit_stage4_feedback(
         self, 
@@ -202,9 +244,7 @@ class InterviewService:
         user_id: str
     ) -> ApplicationResponse:
         """Submit HR Round feedback."""
-        return await self._submit_stage_feedback(
-            application_id, 4, feedback.dict(), user_id, "stage4_hr_round"
-        )
+        return await self._submit_stage_feedback(application_id, 4, feedback.dict(), user_id)
 
     async def submit_stage5_feedback(
         self, 
@@ -213,9 +253,7 @@ class InterviewService:
         user_id: str
     ) -> ApplicationResponse:
         """Submit BU Lead Interview feedback."""
-        return await self._submit_stage_feedback(
-            application_id, 5, feedback.dict(), user_id, "stage5_bu_lead_interview"
-        )
+        return await self._submit_stage_feedback(application_id, 5, feedback.dict(), user_id)
 
     async def submit_stage6_feedback(
         self, 
@@ -224,9 +262,7 @@ class InterviewService:
         user_id: str
     ) -> ApplicationResponse:
         """Submit CEO Interview feedback."""
-        return await self._submit_stage_feedback(
-            application_id, 6, feedback.dict(), user_id, "stage6_ceo_interview"
-        )
+        return await self._submit_stage_feedback(application_id, 6, feedback.dict(), user_id)
 
     async def submit_stage7_feedback(
         self, 
@@ -239,26 +275,12 @@ class InterviewService:
         feedback_dict["completed_at"] = datetime.utcnow()
         feedback_dict["submitted_by"] = user_id  # Track who submitted for blind feedback
         
-        # Update application with final recommendation
-        result = await self.db.applications.update_one(
-            {"_id": ObjectId(application_id)},
-            {"$set": {
-                "stages.stage7_final_recommendation": feedback_dict,
-                "status": "completed",
-                "updated_at": datetime.utcnow()
-            }}
+        # Store the final recommendation and complete the application
+        application = await StageWorkflowService().apply(
+            application_id, "finalize", 7, user_id,
+            fields={"final_recommendation": feedback_dict}
         )
-        
-        if result.modified_count == 0:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Application not found"
-            )
-        
-        # Get updated application
-        application = await self.db.applications.find_one({"_id": ObjectId(application_id)})
-        application["id"] = str(application["_id"])
-        del application["_id"]
+        application["id"] = str(application.pop("_id"))
         
         return ApplicationResponse(**application)
 
@@ -267,106 +289,29 @@ class InterviewService:
         application_id: str, 
         stage_number: int, 
         feedback: dict, 
-        user_id: str, 
-        stage_field: str
+        user_id: str
     ) -> ApplicationResponse:
         """Generic method to submit stage feedback."""
-        # Verify application exists
-        application = await self.db.applications.find_one({"_id": ObjectId(application_id)})
-        if not application:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Application not found"
-            )
-        
-        # Check if user is assigned to this stage (for team members)
+        # Team members can only submit feedback for stages assigned to them
         current_user = await self.user_service.get_user_by_id(user_id)
-        if current_user.role == UserRole.TEAM_MEMBER:
-            assignment = await self.db.stage_assignments.find_one({
-                "application_id": application_id,
-                "stage_number": stage_number,
-                "assigned_to": user_id
-            })
-            if not assignment:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail="You are not assigned to this stage"
-                )
         
         # Add completion timestamp and submitter info
         feedback["completed_at"] = datetime.utcnow()
         feedback["submitted_by"] = user_id  # Track who submitted for blind feedback
         
-        # Update application with stage feedback
-        stage_status_field = f"stage{stage_number}_status"
-        
-        result = await self.db.applications.update_one(
-            {"_id": ObjectId(application_id)},
-            {"$set": {
-                f"stages.{stage_field}": feedback,
-                stage_status_field: "completed",
-                "updated_at": datetime.utcnow()
-            }}
-        )
-        
-        if result.modified_count == 0:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Application not found"
-            )
-        
-        # Update stage assignment status
-        await self.db.stage_assignments.update_one(
-            {
-                "application_id": application_id,
-                "stage_number": stage_number
-            },
-            {"$set": {"status": "completed"}}
+        # Store the stage feedback and complete the stage
+        application = await StageWorkflowService().apply(
+            application_id, "submit", stage_number, user_id, current_user.role if current_user else None,
+            fields={STAGE_FORM_NAMES[stage_number]: feedback}
         )
-        
-        # Get updated application
-        application = await self.db.applications.find_one({"_id": ObjectId(application_id)})
-        application["id"] = str(application["_id"])
-        del application["_id"]
+        application["id"] = str(application.pop("_id"))
         
         return ApplicationResponse(**application)
 
     async def forward_to_next_stage(self, application_id: str, user_id: str) -> Dict[str, Any]:
         """Forward application to the next interview stage."""
-        # Verify application exists
-        application = await self.db.applications.find_one({"_id": ObjectId(application_id)})
-        if not application:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Application not found"
-            )
-        
-        current_stage = application.get("current_stage", 1)
-        
-        # Check if current stage is completed
-        stage_status_field = f"stage{current_stage}_status"
-        if application.get("stages", {}).get(stage_status_field) != "completed":
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Stage {current_stage} must be completed before forwarding"
-            )
-        
-        # Move to next stage
-        next_stage = current_stage + 1
-        if next_stage > 7:  # Updated to 7 stages
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Application has completed all interview stages"
-            )
-        
-        # Update application
-        await self.db.applications.update_one(
-            {"_id": ObjectId(application_id)},
-            {"$set": {
-                "current_stage": next_stage,
-                "updated_at": datetime.utcnow()
-            }}
-        )
+        application = await StageWorkflowService().apply(application_id, "advance", None, user_id)
+        next_stage = application["current_stage"]
         
         return {
             "message": f"Application forwarded to stage {next_stage}",
@@ -443,12 +388,12 @@ class InterviewService:
         
         # For Admin and HR, they can see all feedback
         if user.role in [UserRole.ADMIN, UserRole.HR]:
-            stage_field = f"stage{stage_number}_{self._get_stage_field_name(stage_number)}"
+            stage_field = f"stage{stage_number}_{STAGE_FORM_NAMES.get(stage_number, '')}"
             return application.get("stages", {}).get(stage_field)
         
         # For Team Members and Requesters, they can only see their own feedback
         if user.role in [UserRole.TEAM_MEMBER, UserRole.CANDIDATE]:
-            stage_field = f"stage{stage_number}_{self._get_stage_field_name(stage_number)}"
+            stage_field = f"stage{stage_number}_{STAGE_FORM_NAMES.get(stage_number, '')}"
             feedback = application.get("stages", {}).get(stage_field)
             if feedback and feedback.get("submitted_by") == user_id:
                 return feedback
@@ -456,16 +401,3 @@ class InterviewService:
             return None
         
         return None
-    
-    def _get_stage_field_name(self, stage_number: int) -> str:
-        """Get the field name for a stage."""
-        stage_fields = {
-            1: "hr_screening",
-            2: "practical_lab",
-            3: "technical_interview",
-            4: "hr_round",
-            5: "bu_lead_interview",
-            6: "ceo_interview",
-            7: "final_recommendation"
-        }
-        return stage_fields.get(stage_number, "")
\ No newline at end of file
@@ -0,0 +1,84 @@
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
+from ..config import settings
+from ..models.job import JobResponse
+
+
+class JobCache:
+    """
+    Process-wide LRU cache of jobs with a TTL.
+
+    JobService fills it on point lookups and bulk $in warm-ups and invalidates
+    entries whenever it writes a job. Each worker process has its own cache,
+    so the TTL bounds how stale another worker's copy can get.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: int):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, JobResponse]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, job_id: str) -> Optional[JobResponse]:
+        """Get a cached job, or None if missing or expired."""
+        entry = self._entries.get(job_id)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, job = entry
+        if expires_at < time.monotonic():
+            del self._entries[job_id]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(job_id)
+        self.hits += 1
+        return job
+
+    def get_many(self, job_ids: Iterable[str]) -> Dict[str, JobResponse]:
+        """Get all cached jobs among job_ids."""
+        found = {}
+        for job_id in job_ids:
+            job = self.get(job_id)
+            if job is not None:
+                found[job_id] = job
+        return found
+
+    def set(self, job: JobResponse):
+        """Cache a job, evicting the least recently used entry if full."""
+        self._entries[job.id] = (time.monotonic() + self.ttl_seconds, job)
+        self._entries.move_to_end(job.id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, job_id: str):
+        """Drop a job after it was changed or deleted."""
+        if self._entries.pop(job_id, None) is not None:
+            self.invalidations += 1
+
+    def clear(self):
+        """Drop all cached jobs."""
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        """Hit-rate metrics."""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations
+        }
+
+
+job_cache = JobCache(max_size=settings.job_cache_size, ttl_seconds=settings.job_cache_ttl_seconds)
@@ -1,10 +1,31 @@
-from typing import Optional, List
+import asyncio
+import re
+from typing import Optional, List, Dict, Iterable
 from datetime import datetime
 from bson import ObjectId
 from ..database import get_database
-from ..models.job import JobCreate, JobInDB, JobUpdate, JobResponse, JobListResponse, JobStatus
+from ..models.job import (
+    JobCreate, JobInDB, JobUpdate, JobResponse, JobListResponse, JobStatus, JobSort,
+    JobType, ExperienceLevel, JobSearchResult, JobSearchResponse
+)
+from ..utils.fields import build_projection
+from ..utils.pagination import encode_keyset_cursor, build_keyset_filter
+from .job_cache import job_cache
+from .active_jobs_feed import active_jobs_feed, ActiveJobsSnapshot
+from .match_scoring_service import job_rescore_queue
 from fastapi import HTTPException, status
 
+# Sort options for job listings: (field, direction); _id breaks ties in the same direction
+JOB_SORTS = {
+    JobSort.NEWEST: ("created_at", -1),
+    JobSort.OLDEST: ("created_at", 1),
+    JobSort.TITLE: ("title", 1),
+}
+
+JOB_FACET_FIELDS = ["status", "department", "job_type", "experience_level"]
+
+JOB_SEARCH_FACET_FIELDS = ["location", "department", "job_type", "experience_level"]
+
 
 class JobService:
     def __init__(self):
@@ -20,24 +41,91 @@ class JobService:
         
         result = await self.db.jobs.insert_one(job.dict())
         job.id = str(result.inserted_id)
+        active_jobs_feed.invalidate()
         
         return JobResponse(**job.dict())
 
     async def get_job_by_id(self, job_id: str) -> Optional[JobResponse]:
-        """Get a job by ID"""
+        """Get a job by ID (served from the shared job cache when possible)"""
+        job = job_cache.get(job_id)
+        if job:
+            return job
+        if not ObjectId.is_valid(job_id):
+            return None
+        
         job_data = await self.db.jobs.find_one({"_id": ObjectId(job_id)})
         if not job_data:
             return None
         
+        job = self._to_response(job_data)
+        job_cache.set(job)
+        return job
+
+    async def get_jobs_by_ids(self, job_ids: Iterable[str]) -> Dict[str, JobResponse]:
+        """Get several jobs at once; cache misses are loaded with a single $in query"""
+        unique_ids = set(job_ids)
+        jobs = job_cache.get_many(unique_ids)
+        
+        missing_ids = [ObjectId(job_id) for job_id in unique_ids - jobs.keys() if ObjectId.is_valid(job_id)]
+        if missing_ids:
+            async for job_data in self.db.jobs.find({"_id": {"$in": missing_ids}}):
+                job = self._to_response(job_data)
+                job_cache.set(job)
+                jobs[job.id] = job
+        
+        return jobs
+
+    async def get_job_title(self, job_id: str) -> str:
+        """Get a job's title, for records that don't store it"""
+        try:
+            job = await self.get_job_by_id(job_id)
+        except Exception:
+            job = None
+        return job.title if job else "Unknown Job"
+
+    def _to_response(self, job_data: dict, model=JobResponse) -> JobResponse:
+        """Convert a job document to a JobResponse (or a subclass such as JobSearchResult)"""
         job_data["id"] = str(job_data["_id"])
         if "posted_by" in job_data and isinstance(job_data["posted_by"], ObjectId):
             job_data["posted_by"] = str(job_data["posted_by"])
-        return JobResponse(**job_data)
+        return model(**job_data)
+
+    def _facet_counts(self, result: dict, facet_fields: List[str]) -> Dict[str, Dict[str, int]]:
+        """Turn $facet $group buckets into {field: {value: count}}"""
+        return {
+            facet_field: {
+                str(bucket["_id"]): bucket["count"]
+                for bucket in result.get(facet_field, [])
+                if bucket["_id"] is not None
+            }
+            for facet_field in facet_fields
+        }
+
+    async def get_job_fields(self, job_id: str, fields: List[str]) -> Optional[dict]:
+        """Get only the requested fields of a job (sparse fieldset)"""
+        if not ObjectId.is_valid(job_id):
+            return None
+        job_data = await self.db.jobs.find_one({"_id": ObjectId(job_id)}, build_projection(fields, always=["updated_at"]))
+        if not job_data:
+            return None
+        
+        job_data["id"] = str(job_data.pop("_id"))
+        if "posted_by" in job_data and isinstance(job_data["posted_by"], ObjectId):
+            job_data["posted_by"] = str(job_data["posted_by"])
+        return job_data
+
+    async def get_job_version(self, job_id: str) -> Optional[dict]:
+        """Get just the updated_at of a job to validate a cached copy (ETag)"""
+        if not ObjectId.is_valid(job_id):
+            return None
+        return await self.db.jobs.find_one({"_id": ObjectId(job_id)}, {"updated_at": 1})
 
     async def get_all_jobs(self, status: Optional[JobStatus] = None, 
                           department: Optional[str] = None,
-                          page: int = 1, limit: int = 10) -> JobListResponse:
-        """Get all jobs with optional filtering and pagination"""
+                          page: int = 1, limit: int = 10,
+                          sort: JobSort = JobSort.NEWEST,
+                          cursor: Optional[str] = None) -> JobListResponse:
+        """Get one page of jobs plus total and facet counts (a $facet aggregation run alongside)"""
         filter_query = {}
         
         if status:
@@ -46,25 +134,102 @@ class JobService:
         if department:
             filter_query["department"] = department
         
-        # Count total jobs
-        total = await self.db.jobs.count_documents(filter_query)
+        sort_field, direction = JOB_SORTS[sort]
         
-        # Get jobs with pagination
-        skip = (page - 1) * limit
-        cursor = self.db.jobs.find(filter_query).sort("created_at", -1).skip(skip).limit(limit)
+        # The page is a plain find so the keyset filter and sort use the (filter, sort, _id)
+        # indexes; $facet can't use indexes inside its sub-pipelines, so it only counts
+        if cursor:
+            page_query = {"$and": [filter_query, build_keyset_filter(sort_field, direction, cursor)]}
+            skip = 0
+        else:
+            page_query = filter_query
+            skip = (page - 1) * limit
+        page_cursor = self.db.jobs.find(page_query).sort(
+            [(sort_field, direction), ("_id", direction)]
+        ).skip(skip).limit(limit + 1)
         
-        jobs = []
-        async for job_data in cursor:
-            job_data["id"] = str(job_data["_id"])
-            if "posted_by" in job_data and isinstance(job_data["posted_by"], ObjectId):
-                job_data["posted_by"] = str(job_data["posted_by"])
-            jobs.append(JobResponse(**job_data))
+        facets = {"total": [{"$count": "count"}]}
+        for facet_field in JOB_FACET_FIELDS:
+            facets[facet_field] = [{"$group": {"_id": f"${facet_field}", "count": {"$sum": 1}}}]
+        pipeline = [{"$match": filter_query}, {"$facet": facets}]
+        
+        documents, results = await asyncio.gather(
+            page_cursor.to_list(length=limit + 1),
+            self.db.jobs.aggregate(pipeline).to_list(length=1)
+        )
+        result = results[0] if results else {}
+        
+        next_cursor = None
+        if len(documents) > limit:
+            documents = documents[:limit]
+            last = documents[-1]
+            next_cursor = encode_keyset_cursor(last.get(sort_field), last["_id"])
+        
+        total = result["total"][0]["count"] if result.get("total") else 0
+        facet_counts = self._facet_counts(result, JOB_FACET_FIELDS)
         
         return JobListResponse(
-            jobs=jobs,
+            jobs=[self._to_response(job_data) for job_data in documents],
             total=total,
             page=page,
-            limit=limit
+            limit=limit,
+            next_cursor=next_cursor,
+            facets=facet_counts
+        )
+
+    async def search_jobs(self, query: str,
+                          status: Optional[JobStatus] = None,
+                          location: Optional[str] = None,
+                          job_type: Optional[JobType] = None,
+                          experience_level: Optional[ExperienceLevel] = None,
+                          department: Optional[str] = None,
+                          page: int = 1, limit: int = 10) -> JobSearchResponse:
+        """Full-text search over the weighted jobs text index, ranked by relevance, with facet counts"""
+        filter_query = {"$text": {"$search": query}}
+        
+        if status:
+            filter_query["status"] = status.value
+        
+        if location:
+            filter_query["location"] = {"$regex": re.escape(location), "$options": "i"}
+        
+        if job_type:
+            filter_query["job_type"] = job_type.value
+        
+        if experience_level:
+            filter_query["experience_level"] = experience_level.value
+        
+        if department:
+            filter_query["department"] = department
+        
+        facets = {
+            "jobs": [
+                {"$sort": {"score": -1, "_id": 1}},
+                {"$skip": (page - 1) * limit},
+                {"$limit": limit}
+            ],
+            "total": [{"$count": "count"}]
+        }
+        for facet_field in JOB_SEARCH_FACET_FIELDS:
+            facets[facet_field] = [{"$group": {"_id": f"${facet_field}", "count": {"$sum": 1}}}]
+        
+        pipeline = [
+            {"$match": filter_query},
+            {"$addFields": {"score": {"$meta": "textScore"}}},
+            {"$facet": facets}
+        ]
+        results = await self.db.jobs.aggregate(pipeline).to_list(length=1)
+        result = results[0] if results else {}
+        
+        total = result["total"][0]["count"] if result.get("total") else 0
+        facet_counts = self._facet_counts(result, JOB_SEARCH_FACET_FIELDS)
+        
+        return JobSearchResponse(
+            jobs=[self._to_response(job_data, JobSearchResult) for job_data in result.get("jobs", [])],
+            total=total,
+            page=page,
+            limit=limit,
+            facets=facet_counts
         )
 
     async def get_active_jobs(self) -> List[JobResponse]:
@@ -73,13 +238,14 @@ class JobService:
         
         jobs = []
         async for job_data in cursor:
-            job_data["id"] = str(job_data["_id"])
-            if "posted_by" in job_data and isinstance(job_data["posted_by"], ObjectId):
-                job_data["posted_by"] = str(job_data["posted_by"])
-            jobs.append(JobResponse(**job_data))
+            jobs.append(self._to_response(job_data))
         
         return jobs
 
+    async def get_active_jobs_snapshot(self) -> ActiveJobsSnapshot:
+        """Get the pre-serialized active jobs feed, rebuilding it only after job writes"""
+        return await active_jobs_feed.get_snapshot(self.get_active_jobs)
+
     async def update_job(self, job_id: str, job_data: JobUpdate, updated_by: str) -> JobResponse:
         """Update a job posting"""
         job = await self.get_job_by_id(job_id)
@@ -98,24 +264,74 @@ class JobService:
         if result.modified_count == 0:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Failed to update job")
         
+        job_cache.invalidate(job_id)
+        active_jobs_feed.invalidate()
+        
         # Return updated job
         updated_job = await self.get_job_by_id(job_id)
         if not updated_job:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found after update")
+        
+        # Applications store the job title/department; keep them in sync
+        if "title" in update_data or "department" in update_data:
+            await self.propagate_job_fields(job_id, updated_job.title, updated_job.department)
+        
+        # Applicants' skill match scores are relative to the job's skills; rescoring
+        # every applicant runs in the background rather than in this request
+        if "skills_required" in update_data or "requirements" in update_data:
+            job_rescore_queue.schedule(job_id)
+        
         return updated_job
 
+    async def propagate_job_fields(self, job_id: str, title: str, department: str) -> int:
+        """Copy a job's title and department onto its applications in a single update_many"""
+        result = await self.db.applications.update_many(
+            {
+                "job_id": job_id,
+                "$or": [
+                    {"job_title": {"$ne": title}},
+                    {"job_department": {"$ne": department}}
+                ]
+            },
+            {
+                "$set": {
+                    "job_title": title,
+                    "job_department": department,
+                    "updated_at": datetime.utcnow()
+                }
+            }
+        )
+        return result.modified_count
+
+    async def repair_application_job_fields(self) -> int:
+        """Consistency check: repair applications whose denormalized job fields drifted from the job"""
+        repaired = 0
+        async for job_data in self.db.jobs.find({}, {"title": 1, "department": 1}):
+            repaired += await self.propagate_job_fields(
+                str(job_data["_id"]), job_data.get("title"), job_data.get("department")
+            )
+        return repaired
+
     async def delete_job(self, job_id: str) -> bool:
         """Delete a job posting"""
         result = await self.db.jobs.delete_one({"_id": ObjectId(job_id)})
+        job_cache.invalidate(job_id)
+        active_jobs_feed.invalidate()
         return result.deleted_count > 0
 
     async def update_applications_count(self, job_id: str, increment: bool = True) -> bool:
         """Update the applications count for a job"""
-        operation = "$inc" if increment else "$dec"
+        # Bump updated_at as well so cached copies (ETags) of the job are invalidated
         result = await self.db.jobs.update_one(
             {"_id": ObjectId(job_id)},
-            {operation: {"applications_count": 1}}
+            {
+                "$inc": {"applications_count": 1 if increment else -1},
+                "$set": {"updated_at": datetime.utcnow()}
+            }
         )
+        job_cache.invalidate(job_id)
+        # Not the active jobs feed: this runs on every application, and a rebuild
+        # per apply would defeat it. Its applications_count is refreshed with its TTL
         return result.modified_count > 0
 
     async def get_jobs_by_department(self, department: str) -> List[JobResponse]:
@@ -124,10 +340,7 @@ class JobService:
         
         jobs = []
         async for job_data in cursor:
-            job_data["id"] = str(job_data["_id"])
-            if "posted_by" in job_data and isinstance(job_data["posted_by"], ObjectId):
-                job_data["posted_by"] = str(job_data["posted_by"])
-            jobs.append(JobResponse(**job_data))
+            jobs.append(self._to_response(job_data))
         
         return jobs
 
@@ -150,6 +363,9 @@ class JobService:
         if result.modified_count == 0:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Failed to close job")
         
+        job_cache.invalidate(job_id)
+        active_jobs_feed.invalidate()
+        
         closed_job = await self.get_job_by_id(job_id)
         if not closed_job:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found after closing")
@@ -0,0 +1,158 @@
+import asyncio
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional, Set
+from bson import ObjectId
+from pymongo import UpdateOne
+from ..database import get_database
+from ..utils.skill_match import JobSkillVector, build_job_vector, applicant_matrix, match_scores
+
+logger = logging.getLogger(__name__)
+
+# Applicants scored per NumPy batch (and per bulk write)
+SCORING_BATCH_SIZE = 2000
+
+
+class MatchScoringService:
+    """
+    Skill match scores of applications against their job.
+
+    A job's skills become a weighted vector (see skill_match.build_job_vector),
+    each applicant a bit vector of the same skills found in their resume's
+    resume_index entry, and a batch of applicants is scored with one
+    matrix-vector product. Scores are stored on the applications as
+    ``match_score`` (0-1) and ``matched_skills``, indexed by (job_id,
+    match_score). Applications whose resume has not been indexed yet have no
+    score.
+    """
+
+    def __init__(self):
+        self.db = get_database()
+
+    async def job_vector(self, job_id: str, vocabulary: Optional[List[str]] = None) -> Optional[JobSkillVector]:
+        """
+        Build a job's skill vector.
+
+        Args:
+            job_id: ID of the job
+            vocabulary: Known skills to look for in the requirements; all jobs' skills_required if omitted
+        """
+        try:
+            job = await self.db.jobs.find_one({"_id": ObjectId(job_id)}, {"skills_required": 1, "requirements": 1})
+        except Exception:
+            return None
+        if not job:
+            return None
+        if vocabulary is None:
+            vocabulary = [skill for skill in await self.db.jobs.distinct("skills_required") if isinstance(skill, str)]
+        return build_job_vector(job.get("skills_required"), job.get("requirements"), vocabulary)
+
+    async def score_job(self, job_id: str) -> int:
+        """
+        Recompute the scores of all of a job's applications, e.g. after its skills changed.
+
+        Returns:
+            Number of applications whose score changed
+        """
+        vector = await self.job_vector(job_id)
+        if vector is None:
+            return 0
+        return await self._score(vector, {"job_id": job_id})
+
+    async def score_application(self, application_id: str, job_id: str, vocabulary: Optional[List[str]] = None) -> int:
+        """Recompute one application's score, e.g. after its resume was (re)indexed."""
+        vector = await self.job_vector(job_id, vocabulary)
+        if vector is None:
+            return 0
+        return await self._score(vector, {"_id": application_id})
+
+    async def _score(self, vector: JobSkillVector, match: dict) -> int:
+        # Only the job's skill terms come back from the server, not whole term lists
+        pipeline = [
+            {"$match": match},
+            {"$project": {"present": {"$setUnion": [
+                {"$setIntersection": ["$terms", vector.terms]},
+                {"$setIntersection": ["$skill_terms", vector.terms]}
+            ]}}}
+        ]
+        changed = 0
+        batch = []
+        async for entry in self.db.resume_index.aggregate(pipeline):
+            batch.append(entry)
+            if len(batch) >= SCORING_BATCH_SIZE:
+                changed += await self._store_batch(vector, batch)
+                batch = []
+
+        if batch:
+            changed += await self._store_batch(vector, batch)
+        return changed
+
+    async def _store_batch(self, vector: JobSkillVector, batch: List[dict]) -> int:
+        matrix = applicant_matrix([entry["present"] for entry in batch], vector)
+        scores = match_scores(matrix, vector)
+        now = datetime.utcnow()
+        operations = []
+        for entry, row, score in zip(batch, matrix, scores):
+            score = round(float(score), 4)
+            matched_skills = [label for label, has_skill in zip(vector.labels, row) if has_skill]
+            # Unchanged results are not rewritten, so delta sync doesn't resend them; the
+            # skills are compared too, as a renamed skill of the same weight keeps the score
+            operations.append(UpdateOne(
+                {
+                    "_id": ObjectId(entry["_id"]),
+                    "$or": [{"match_score": {"$ne": score}}, {"matched_skills": {"$ne": matched_skills}}]
+                },
+                {"$set": {
+                    "match_score": score,
+                    "matched_skills": matched_skills,
+                    "updated_at": now
+                }}
+            ))
+        result = await self.db.applications.bulk_write(operations, ordered=False)
+        return result.modified_count
+
+
+class JobRescoreQueue:
+    """
+    Rescores a job's applicants in the background after its skills change,
+    so the job update request doesn't wait for every applicant to be scored.
+
+    At most one pass per job runs at a time; changes made during a pass
+    trigger one more pass once it finishes, so the last change always wins.
+    """
+
+    def __init__(self):
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._rerun: Set[str] = set()
+
+    def schedule(self, job_id: str):
+        """Rescore a job's applicants soon."""
+        if job_id in self._tasks:
+            self._rerun.add(job_id)
+            return
+        self._tasks[job_id] = asyncio.create_task(self._run(job_id))
+
+    async def _run(self, job_id: str):
+        try:
+            while True:
+                self._rerun.discard(job_id)
+                try:
+                    changed = await MatchScoringService().score_job(job_id)
+                    logger.info(f"Rescored job {job_id}: {changed} match scores changed")
+                except Exception as e:
+                    logger.error(f"Rescoring applicants of job {job_id} failed: {e}")
+                if job_id not in self._rerun:
+                    return
+        finally:
+            self._tasks.pop(job_id, None)
+
+    async def stop(self):
+        """Cancel running passes; score_applications.py recomputes every score if needed."""
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._rerun.clear()
+
+
+job_rescore_queue = JobRescoreQueue()
@@ -2,7 +2,10 @@ from typing import List, Optional
 from datetime import datetime, timedelta
 from bson import ObjectId
 from ..database import get_database
-from ..models.notification import NotificationModel, NotificationResponse
+from ..models.notification import NotificationModel, NotificationResponse, NotificationDeltaResponse
+from ..utils.delta_sync import build_delta_filter, encode_cursor, sync_server_time
+from .tombstone_service import TombstoneService
+from .job_service import JobService
 from fastapi import HTTPException, status
 import logging
 
@@ -14,6 +17,7 @@ class NotificationService:
     
     def __init__(self):
         self.db = get_database()
+        self.job_service = JobService()
     
     async def create_notification(
         self,
@@ -29,7 +33,7 @@ class NotificationService:
         
         Args:
             user_id: User ID who receives the notification
-            notification_type: Type of notification (assignment, reassignment, deadline_warning)
+            notification_type: Type of notification (assignment, reassignment, deadline_warning, stage_review)
             title: Notification title
             message: Notification message
             application_id: Related application ID
@@ -219,6 +223,44 @@ class NotificationService:
             stage_number=stage_number
         )
     
+    async def send_stage_review_notification(
+        self,
+        user_id: str,
+        application_id: str,
+        stage_number: int,
+        decision: str,
+        candidate_name: str,
+        job_title: str,
+        reason: Optional[str] = None
+    ):
+        """
+        Send notification when HR approves or rejects a stage.
+        
+        Args:
+            user_id: User ID of the stage's assigned team member
+            application_id: Application ID
+            stage_number: Stage number
+            decision: New stage status (approved, rejected)
+            candidate_name: Name of the candidate
+            job_title: Job title
+            reason: Reason for rejection
+        """
+        stage_name = self._get_stage_name(stage_number)
+        
+        title = f"Stage {decision.capitalize()}: {stage_name}"
+        message = f"HR {decision} {stage_name} for {candidate_name} ({job_title})"
+        if reason:
+            message += f". Reason: {reason}"
+        
+        await self.create_notification(
+            user_id=user_id,
+            notification_type="stage_review",
+            title=title,
+            message=message,
+            application_id=application_id,
+            stage_number=stage_number
+        )
+    
     async def get_user_notifications(
         self,
         user_id: str,
@@ -244,38 +286,102 @@ class NotificationService:
         
         notifications = []
         async for notification in cursor:
-            notification_id = str(notification["_id"])
-            del notification["_id"]
+            notification_response = await self._build_notification_response(notification)
+            if notification_response:
+                notifications.append(notification_response)
+        
+        return notifications
+    
+    async def get_user_notifications_delta(
+        self,
+        user_id: str,
+        updated_since: Optional[datetime] = None,
+        cursor: Optional[str] = None,
+        limit: int = 50
+    ) -> NotificationDeltaResponse:
+        """
+        Get notifications created or changed (e.g. read) since a timestamp.
+        
+        Args:
+            user_id: User ID
+            updated_since: Only include notifications changed at or after this time
+            cursor: Resume after the last notification of the previous page
+            limit: Maximum number of notifications per page
             
-            # Get application details
-            try:
-                application = await self.db.applications.find_one(
-                    {"_id": ObjectId(notification["application_id"])}
-                )
-                
-                if application:
-                    # Get job details
-                    job = await self.db.jobs.find_one({"_id": ObjectId(application["job_id"])})
-                    
-                    notification_response = NotificationResponse(
-                        id=notification_id,
-                        **notification,
-                        candidate_name=application.get("name"),
-                        job_title=job.get("title") if job else "Unknown Job",
-                        stage_name=self._get_stage_name(notification["stage_number"])
-                    )
-                    notifications.append(notification_response)
-            except Exception as e:
-                logger.error(f"Error fetching notification details: {e}")
-                # Still include notification even if details can't be fetched
-                notification_response = NotificationResponse(
+        Returns:
+            NotificationDeltaResponse with changed notifications and tombstones
+        """
+        server_time = sync_server_time()
+        tombstone_service = TombstoneService()
+        
+        # Pages are keyed on updated_at alone; notifications from before delta sync
+        # need backfill_notification_updated_at and are left out until then
+        query = build_delta_filter(updated_since, cursor) or {"updated_at": {"$ne": None}}
+        query["user_id"] = user_id
+        
+        cursor_docs = self.db.notifications.find(query).sort([("updated_at", 1), ("_id", 1)]).limit(limit)
+        
+        items = []
+        fetched = 0
+        last_notification = None
+        async for notification in cursor_docs:
+            fetched += 1
+            last_notification = notification
+            notification_response = await self._build_notification_response(dict(notification))
+            if notification_response:
+                items.append(notification_response)
+        
+        next_cursor = None
+        if fetched == limit:
+            next_cursor = encode_cursor(last_notification["updated_at"], last_notification["_id"])
+        
+        # Deletions are only sent with the first page of a sync
+        deleted = []
+        reset = False
+        if updated_since and not cursor:
+            reset = tombstone_service.is_expired(updated_since)
+            deleted = await tombstone_service.get_deletions("notifications", updated_since, user_id)
+        
+        return NotificationDeltaResponse(
+            items=items,
+            deleted=deleted,
+            next_cursor=next_cursor,
+            server_time=server_time,
+            reset=reset
+        )
+    
+    async def _build_notification_response(self, notification: dict) -> Optional[NotificationResponse]:
+        """
+        Build a notification response with candidate and job details.
+        
+        Returns None if the related application no longer exists.
+        """
+        notification_id = str(notification["_id"])
+        del notification["_id"]
+        
+        # Get application details
+        try:
+            application = await self.db.applications.find_one(
+                {"_id": ObjectId(notification["application_id"])}
+            )
+            
+            if application:
+                return NotificationResponse(
                     id=notification_id,
                     **notification,
+                    candidate_name=application.get("name"),
+                    job_title=application.get("job_title") or await self.job_service.get_job_title(application["job_id"]),
                     stage_name=self._get_stage_name(notification["stage_number"])
                 )
-                notifications.append(notification_response)
-        
-        return notifications
+            return None
+        except Exception as e:
+            logger.error(f"Error fetching notification details: {e}")
+            # Still include notification even if details can't be fetched
+            return NotificationResponse(
+                id=notification_id,
+                **notification,
+                stage_name=self._get_stage_name(notification["stage_number"])
+            )
     
     async def get_unread_count(self, user_id: str) -> int:
         """
@@ -316,7 +422,8 @@ class NotificationService:
                 {
                     "$set": {
                         "is_read": True,
-                        "read_at": datetime.utcnow()
+                        "read_at": datetime.utcnow(),
+                        "updated_at": datetime.utcnow()
                     }
                 }
             )
@@ -354,7 +461,8 @@ class NotificationService:
             {
                 "$set": {
                     "is_read": True,
-                    "read_at": datetime.utcnow()
+                    "read_at": datetime.utcnow(),
+                    "updated_at": datetime.utcnow()
                 }
             }
         )
@@ -388,21 +496,20 @@ class NotificationService:
             })
             
             if not existing_warning:
-                # Get application and job details
+                # Get application details (job title is stored on the application)
                 try:
                     application = await self.db.applications.find_one(
-                        {"_id": ObjectId(assignment["application_id"])}
+                        {"_id": ObjectId(assignment["application_id"])},
+                        {"name": 1, "job_id": 1, "job_title": 1}
                     )
                     
                     if application:
-                        job = await self.db.jobs.find_one({"_id": ObjectId(application["job_id"])})
-                        
                         await self.send_deadline_warning_notification(
                             user_id=assignment["assigned_to"],
                             application_id=assignment["application_id"],
                             stage_number=assignment["stage_number"],
                             candidate_name=application.get("name", "Unknown"),
-                            job_title=job.get("title") if job else "Unknown Job",
+                            job_title=application.get("job_title") or await self.job_service.get_job_title(application["job_id"]),
                             deadline=assignment["deadline"]
                         )
                 except Exception as e:
@@ -0,0 +1,127 @@
+import asyncio
+import os
+from datetime import datetime, timedelta
+from typing import NamedTuple
+from fastapi import UploadFile, HTTPException, status
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from ..config import settings
+from ..database import get_database
+from ..utils.file_upload import (
+    receive_upload_file, commit_received_file, discard_received_file, blob_filename
+)
+
+# A blob claimed for deletion longer ago than this belongs to a crashed
+# release() and may be reused by new uploads
+STALE_DELETE_CLAIM = timedelta(minutes=1)
+
+# How often an upload retries while the same content is being deleted
+DELETE_CLAIM_RETRIES = 20
+DELETE_CLAIM_RETRY_DELAY = 0.05
+
+
+class StoredResume(NamedTuple):
+    filename: str  # Content-addressed path relative to the upload directory
+    sha256: str
+    size: int
+
+
+class ResumeBlobService:
+    """
+    Reference-counted, content-addressed resume storage.
+
+    Each distinct resume is stored once under its SHA-256 (see
+    file_upload.blob_filename) and has a ``resume_blobs`` document counting the
+    applications that use it. A blob is deleted when its last application is.
+    """
+
+    def __init__(self):
+        self.db = get_database()
+
+    async def store(self, upload_file: UploadFile) -> StoredResume:
+        """
+        Save an uploaded resume and take one reference to its blob.
+
+        The reference is taken before the file is moved into place, so a
+        concurrent release() of the same content can never delete the file
+        out from under this upload. Callers that end up not attaching the
+        resume to an application must release() it.
+        """
+        received = await receive_upload_file(upload_file)
+        try:
+            filename = blob_filename(received.sha256, received.extension)
+            await self._add_reference(received.sha256, filename, received.size)
+            try:
+                commit_received_file(received)
+            except Exception as e:
+                await self.release(received.sha256)
+                raise HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail=f"Failed to save file: {str(e)}"
+                )
+            return StoredResume(filename, received.sha256, received.size)
+        finally:
+            discard_received_file(received)
+
+    async def _add_reference(self, sha256: str, filename: str, size: int):
+        """Increment a blob's reference count, creating its record if needed."""
+        for _ in range(DELETE_CLAIM_RETRIES):
+            now = datetime.utcnow()
+            try:
+                await self.db.resume_blobs.update_one(
+                    {
+                        "_id": sha256,
+                        "$or": [
+                            {"deleting_at": None},
+                            {"deleting_at": {"$lt": now - STALE_DELETE_CLAIM}}
+                        ]
+                    },
+                    {
+                        "$inc": {"ref_count": 1},
+                        "$set": {"updated_at": now},
+                        "$unset": {"deleting_at": ""},
+                        "$setOnInsert": {"filename": filename, "size": size, "created_at": now}
+                    },
+                    upsert=True
+                )
+                return
+            except DuplicateKeyError:
+                # The record exists but release() is deleting the file; wait for it to finish
+                await asyncio.sleep(DELETE_CLAIM_RETRY_DELAY)
+
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Resume storage is busy, please retry the upload"
+        )
+
+    async def release(self, sha256: str) -> bool:
+        """
+        Drop one reference to a blob and delete the blob if it was the last.
+
+        Deletion first claims the record (ref_count 0, deleting_at set) so
+        uploads of the same content wait rather than re-referencing a file
+        that is about to disappear.
+
+        Returns:
+            True if the blob's file was deleted
+        """
+        blob = await self.db.resume_blobs.find_one_and_update(
+            {"_id": sha256, "ref_count": {"$gt": 0}},
+            {"$inc": {"ref_count": -1}, "$set": {"updated_at": datetime.utcnow()}},
+            return_document=ReturnDocument.AFTER
+        )
+        if not blob or blob["ref_count"] > 0:
+            return False
+
+        claimed = await self.db.resume_blobs.find_one_and_update(
+            {"_id": sha256, "ref_count": 0, "deleting_at": None},
+            {"$set": {"deleting_at": datetime.utcnow()}}
+        )
+        if not claimed:
+            return False
+
+        file_path = os.path.join(settings.upload_dir, claimed["filename"])
+        if os.path.exists(file_path):
+            os.remove(file_path)
+        await self.db.resume_blobs.delete_one({"_id": sha256, "ref_count": 0})
+        return True
@@ -0,0 +1,414 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import signal
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+from pymongo import ReturnDocument
+from ..config import settings
+from ..database import get_database
+from ..utils.file_upload import get_file_path
+from ..utils.resume_text import extract_resume_text
+from .match_scoring_service import MatchScoringService
+
+logger = logging.getLogger(__name__)
+
+# How long the job skills vocabulary used for skill detection is reused
+SKILL_VOCABULARY_TTL_SECONDS = 300
+
+
+def _record_worker_pid(pids):
+    """Process pool initializer: report the worker's PID so a hung pool can be killed."""
+    pids.put(os.getpid())
+
+
+class ResumeExtractionQueue:
+    """
+    Background text extraction for uploaded resumes.
+
+    Each application with a resume gets a ``resume_text`` document (keyed by
+    application ID, carrying its job_id) that moves pending -> processing ->
+    done | failed; completing one also writes the resume's ``resume_index``
+    document, which resume search queries, and scores the application
+    against its job. The CPU-bound parsing runs in a
+    bounded process pool so requests never wait for it; this process only
+    queues IDs and writes results. Failed attempts are retried with
+    exponential backoff.
+
+    Pending work lives in MongoDB, so it survives restarts: recover() queues
+    whatever a previous run left behind, and documents are claimed atomically
+    so several API workers never extract the same resume twice. recover()
+    runs on start and then every timeout_seconds, so claims left by an API
+    worker that died are picked up once they expire, whichever worker
+    survives.
+    """
+
+    def __init__(self, processes: int, max_attempts: int, retry_base_seconds: float, timeout_seconds: int):
+        self.processes = processes
+        self.max_attempts = max_attempts
+        self.retry_base_seconds = retry_base_seconds
+        self.timeout_seconds = timeout_seconds
+        self._queue: Optional[asyncio.Queue] = None
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._executor_pids = None
+        self._workers: List[asyncio.Task] = []
+        self._sweeper: Optional[asyncio.Task] = None
+        self._queued = set()
+        self._retry_handles: Dict[str, asyncio.TimerHandle] = {}
+        self._vocabulary: List[str] = []
+        self._vocabulary_expires_at = 0.0
+        self.in_flight = 0
+        self.enqueued = 0
+        self.completed = 0
+        self.discarded = 0
+        self.reused = 0
+        self.pool_restarts = 0
+        self.retries = 0
+        self.failed = 0
+        self.extraction_seconds = 0.0
+
+    @property
+    def running(self) -> bool:
+        return bool(self._workers)
+
+    def start(self):
+        """Start the worker tasks, process pool and recovery sweep (idempotent)."""
+        if self.running:
+            return
+        self._queue = asyncio.Queue()
+        self._queued.clear()
+        self._executor, self._executor_pids = self._new_executor()
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.processes)]
+        self._sweeper = asyncio.create_task(self._sweep())
+
+    async def stop(self):
+        """Stop the workers; unfinished documents stay pending for the next start."""
+        for handle in self._retry_handles.values():
+            handle.cancel()
+        self._retry_handles.clear()
+        tasks = self._workers + ([self._sweeper] if self._sweeper else [])
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._workers = []
+        self._sweeper = None
+        if self._executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor_pids.close()
+            self._executor = self._executor_pids = None
+
+    def _new_executor(self):
+        pids = multiprocessing.SimpleQueue()
+        executor = ProcessPoolExecutor(
+            max_workers=self.processes, initializer=_record_worker_pid, initargs=(pids,)
+        )
+        return executor, pids
+
+    async def _sweep(self):
+        """Run recover() now and then every timeout_seconds, until stopped."""
+        while True:
+            try:
+                recovered = await self.recover()
+                if recovered:
+                    logger.info(f"Queued {recovered} pending resume extractions")
+            except Exception as e:
+                logger.error(f"Recovering resume extractions failed: {e}")
+            await asyncio.sleep(self.timeout_seconds)
+
+    async def drain(self):
+        """Wait until the queue is empty and no retries are scheduled."""
+        while self.running:
+            await self._queue.join()
+            if not self._retry_handles:
+                return
+            await asyncio.sleep(0.5)
+
+    async def enqueue(
+        self,
+        application_id: str,
+        job_id: str,
+        resume_filename: str,
+        resume_sha256: Optional[str] = None
+    ):
+        """
+        Record a pending extraction for an application's resume and queue it.
+
+        Only a small upsert happens here; the extraction itself runs later.
+        """
+        db = get_database()
+        await db.resume_text.update_one(
+            {"_id": application_id},
+            {
+                "$set": {
+                    "job_id": job_id,
+                    "resume_filename": resume_filename,
+                    "resume_sha256": resume_sha256,
+                    "status": "pending",
+                    "attempts": 0,
+                    "queued_at": datetime.utcnow()
+                },
+                "$unset": {"error": "", "next_attempt_at": "", "claimed_at": ""}
+            },
+            upsert=True
+        )
+        self._put(application_id)
+
+    async def recover(self) -> int:
+        """
+        Queue pending extractions and ones abandoned mid-way by a crashed worker.
+
+        Returns:
+            Number of documents queued
+        """
+        db = get_database()
+        now = datetime.utcnow()
+        cursor = db.resume_text.find(
+            {"$or": [
+                {"status": "pending"},
+                {"status": "processing", "claimed_at": {"$lt": self._stale_claim_time(now)}}
+            ]},
+            {"next_attempt_at": 1}
+        )
+        recovered = 0
+        async for document in cursor:
+            next_attempt_at = document.get("next_attempt_at")
+            delay = (next_attempt_at - now).total_seconds() if next_attempt_at else 0
+            self._schedule(document["_id"], delay)
+            recovered += 1
+        return recovered
+
+    def _stale_claim_time(self, now: datetime) -> datetime:
+        # A claim older than twice the timeout belongs to a worker that died
+        return now - timedelta(seconds=self.timeout_seconds * 2)
+
+    def _put(self, application_id: str):
+        # Not started (e.g. a script using ApplicationService): the document
+        # stays pending and is picked up by recover() on the next start
+        # Already waiting in the queue, e.g. found again by the recovery sweep
+        if not self.running or application_id in self._queued:
+            return
+        self._queued.add(application_id)
+        self._queue.put_nowait(application_id)
+        self.enqueued += 1
+
+    def _schedule(self, application_id: str, delay: float):
+        if delay <= 0:
+            self._put(application_id)
+            return
+        if not self.running:
+            return
+        previous = self._retry_handles.pop(application_id, None)
+        if previous:
+            previous.cancel()
+        self._retry_handles[application_id] = asyncio.get_running_loop().call_later(
+            delay, self._retry_due, application_id
+        )
+
+    def _retry_due(self, application_id: str):
+        self._retry_handles.pop(application_id, None)
+        self._put(application_id)
+
+    async def _worker(self):
+        while True:
+            application_id = await self._queue.get()
+            self._queued.discard(application_id)
+            try:
+                await self._process(application_id)
+            except Exception as e:
+                logger.error(f"Resume extraction for application {application_id} crashed: {e}")
+            finally:
+                self._queue.task_done()
+
+    async def _process(self, application_id: str):
+        """Claim one pending document, extract its resume and store the result."""
+        db = get_database()
+        now = datetime.utcnow()
+        job = await db.resume_text.find_one_and_update(
+            {
+                "_id": application_id,
+                "$or": [
+                    {"status": "pending"},
+                    {"status": "processing", "claimed_at": {"$lt": self._stale_claim_time(now)}}
+                ]
+            },
+            {"$set": {"status": "processing", "claimed_at": now}, "$inc": {"attempts": 1}},
+            projection={"job_id": 1, "resume_filename": 1, "resume_sha256": 1, "attempts": 1},
+            return_document=ReturnDocument.AFTER
+        )
+        if not job:
+            # Claimed by another worker, already done, or the application was deleted
+            return
+
+        # Content-addressed resumes: the same file may already be extracted for another application
+        if job.get("resume_sha256"):
+            existing = await db.resume_text.find_one(
+                {"resume_sha256": job["resume_sha256"], "status": "done", "_id": {"$ne": application_id}},
+                {"text": 1, "truncated": 1, "page_count": 1, "skills": 1}
+            )
+            existing_index = existing and await db.resume_index.find_one(
+                {"_id": existing["_id"]}, {"terms": 1, "skill_terms": 1}
+            )
+            if existing_index:
+                existing.pop("_id")
+                existing_index.pop("_id")
+                if await self._complete(job, {**existing, "index": existing_index}):
+                    self.reused += 1
+                return
+
+        vocabulary = await self._skill_vocabulary()
+        executor = self._executor
+        self.in_flight += 1
+        started = time.monotonic()
+        try:
+            result = await asyncio.wait_for(
+                asyncio.get_running_loop().run_in_executor(
+                    executor,
+                    extract_resume_text,
+                    get_file_path(job["resume_filename"]),
+                    vocabulary,
+                    settings.resume_text_max_chars
+                ),
+                timeout=self.timeout_seconds
+            )
+        except Exception as e:
+            # A worker process died (e.g. on a malformed file), or is stuck parsing one
+            # and would keep its slot in the pool; replace the pool
+            if isinstance(e, (BrokenProcessPool, asyncio.TimeoutError)):
+                self._replace_executor(executor, kill=isinstance(e, asyncio.TimeoutError))
+            await self._retry_or_fail(job, e)
+            return
+        finally:
+            self.in_flight -= 1
+
+        if await self._complete(job, result):
+            self.extraction_seconds += time.monotonic() - started
+
+    def _replace_executor(self, executor: ProcessPoolExecutor, kill: bool = True):
+        """
+        Swap in a new process pool and shut the old one down.
+
+        shutdown() doesn't stop a task that is already running, so with kill
+        the old pool's workers, which reported their PIDs on startup, are
+        terminated; extractions still running in them fail with
+        BrokenProcessPool and are retried. A broken pool has already
+        terminated its own workers.
+        """
+        if executor is not self._executor:
+            # Another worker task already replaced it
+            return
+        pids = self._executor_pids
+        self._executor, self._executor_pids = self._new_executor()
+        self.pool_restarts += 1
+        while kill and not pids.empty():
+            try:
+                os.kill(pids.get(), signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        pids.close()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    async def _complete(self, job: dict, result: dict) -> bool:
+        """
+        Store an extraction result and add the resume to the search index.
+
+        Returns False if the result was discarded because the document is no
+        longer being processed (e.g. the application was deleted meanwhile).
+        """
+        db = get_database()
+        index_fields = result.pop("index")
+        stored = await db.resume_text.update_one(
+            {"_id": job["_id"], "status": "processing"},
+            {
+                "$set": {**result, "status": "done", "extracted_at": datetime.utcnow()},
+                "$unset": {"error": "", "claimed_at": "", "next_attempt_at": ""}
+            }
+        )
+        # Skip the index if the application was deleted meanwhile
+        if not stored.matched_count:
+            self.discarded += 1
+            return False
+
+        await db.resume_index.replace_one(
+            {"_id": job["_id"]},
+            {"job_id": job.get("job_id"), **index_fields},
+            upsert=True
+        )
+        if job.get("job_id"):
+            try:
+                await MatchScoringService().score_application(
+                    job["_id"], job["job_id"], await self._skill_vocabulary()
+                )
+            except Exception as e:
+                logger.error(f"Scoring application {job['_id']} after extraction failed: {e}")
+        self.completed += 1
+        return True
+
+    async def _retry_or_fail(self, job: dict, error: Exception):
+        db = get_database()
+        message = str(error) or type(error).__name__
+        # Missing files and missing parser packages won't fix themselves
+        permanent = isinstance(error, (FileNotFoundError, ImportError, ValueError))
+        if permanent or job["attempts"] >= self.max_attempts:
+            await db.resume_text.update_one(
+                {"_id": job["_id"], "status": "processing"},
+                {"$set": {"status": "failed", "error": message}, "$unset": {"claimed_at": ""}}
+            )
+            self.failed += 1
+            logger.warning(f"Resume extraction for application {job['_id']} failed: {message}")
+            return
+
+        delay = self.retry_base_seconds * 2 ** (job["attempts"] - 1)
+        await db.resume_text.update_one(
+            {"_id": job["_id"], "status": "processing"},
+            {
+                "$set": {
+                    "status": "pending",
+                    "error": message,
+                    "next_attempt_at": datetime.utcnow() + timedelta(seconds=delay)
+                },
+                "$unset": {"claimed_at": ""}
+            }
+        )
+        self.retries += 1
+        self._schedule(job["_id"], delay)
+
+    async def _skill_vocabulary(self) -> List[str]:
+        """Distinct skills required by any job, refreshed every few minutes."""
+        if time.monotonic() >= self._vocabulary_expires_at:
+            db = get_database()
+            self._vocabulary = sorted(
+                skill for skill in await db.jobs.distinct("skills_required") if isinstance(skill, str) and skill.strip()
+            )
+            self._vocabulary_expires_at = time.monotonic() + SKILL_VOCABULARY_TTL_SECONDS
+        return self._vocabulary
+
+    def stats(self) -> dict:
+        """Queue depth and throughput metrics for this worker process."""
+        return {
+            "running": self.running,
+            "processes": self.processes,
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+            "scheduled_retries": len(self._retry_handles),
+            "in_flight": self.in_flight,
+            "enqueued": self.enqueued,
+            "completed": self.completed,
+            "discarded": self.discarded,
+            "reused": self.reused,
+            "pool_restarts": self.pool_restarts,
+            "retries": self.retries,
+            "failed": self.failed,
+            "avg_extraction_seconds": round(self.extraction_seconds / (self.completed - self.reused), 3)
+            if self.completed > self.reused else 0.0
+        }
+
+
+resume_extraction_queue = ResumeExtractionQueue(
+    processes=settings.resume_extraction_processes,
+    max_attempts=settings.resume_extraction_max_attempts,
+    retry_base_seconds=settings.resume_extraction_retry_base_seconds,
+    timeout_seconds=settings.resume_extraction_timeout_seconds
+)
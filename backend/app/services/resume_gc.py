@@ -0,0 +1,394 @@
+import asyncio
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+from pymongo.errors import DuplicateKeyError
+from ..config import settings
+from ..database import get_database
+from ..utils.file_upload import BLOB_DIR, TEMP_DIR
+
+logger = logging.getLogger(__name__)
+
+# Orphans are moved here (keeping their relative path) until they are purged
+QUARANTINE_DIR = "quarantine"
+
+# Files checked against the database per query
+RESUME_GC_BATCH_SIZE = 500
+
+# A pass holding the lease longer than this is assumed dead and may be taken over
+RESUME_GC_LEASE = timedelta(minutes=15)
+
+STATE_ID = "scanner"
+
+
+class ScannedFile(NamedTuple):
+    filename: str  # Relative to the upload directory, as stored in resume_filename
+    size: int
+    modified_at: datetime
+
+
+def _blob_sha256(filename: str) -> Optional[str]:
+    """The content hash of a blob path (resumes/ab/cd/<sha256>.pdf); None for other files."""
+    if not filename.startswith(BLOB_DIR + os.sep):
+        return None
+    return os.path.splitext(os.path.basename(filename))[0]
+
+
+def _list_files(directory: str, after: Optional[str]) -> List[ScannedFile]:
+    """Regular files directly in a directory of the upload dir, by name, starting after the given one."""
+    path = os.path.join(settings.upload_dir, directory)
+    files = []
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if after is not None and entry.name <= after:
+                    continue
+                if not entry.is_file(follow_symlinks=False):
+                    continue
+                stat = entry.stat(follow_symlinks=False)
+                files.append(ScannedFile(
+                    os.path.join(directory, entry.name) if directory else entry.name,
+                    stat.st_size,
+                    datetime.utcfromtimestamp(stat.st_mtime)
+                ))
+    except FileNotFoundError:
+        return []
+    files.sort()
+    return files
+
+
+def _subdirectories(directory: str) -> List[str]:
+    try:
+        with os.scandir(os.path.join(settings.upload_dir, directory)) as entries:
+            return sorted(entry.name for entry in entries if entry.is_dir(follow_symlinks=False))
+    except FileNotFoundError:
+        return []
+
+
+def _shards_from(start: str) -> Iterator[str]:
+    """
+    Directories holding resumes, in scan order, from ``start`` on: the upload
+    directory itself (legacy flat files), the upload temp directory, then each
+    resumes/ab/cd blob directory. Only the blob directories needed are listed.
+    """
+    fixed = ["", TEMP_DIR]
+    if start in fixed:
+        yield from fixed[fixed.index(start):]
+        start_top, start_sub = "", ""
+    else:
+        start_top, start_sub = start.split(os.sep)[1:3]
+
+    for top in _subdirectories(BLOB_DIR):
+        if top < start_top:
+            continue
+        for sub in _subdirectories(os.path.join(BLOB_DIR, top)):
+            if top == start_top and sub < start_sub:
+                continue
+            yield os.path.join(BLOB_DIR, top, sub)
+
+
+def _move(source: str, destination: str):
+    source_path = os.path.join(settings.upload_dir, source)
+    destination_path = os.path.join(settings.upload_dir, destination)
+    os.makedirs(os.path.dirname(destination_path), exist_ok=True)
+    os.replace(source_path, destination_path)
+
+
+def _remove(filename: str):
+    try:
+        os.remove(os.path.join(settings.upload_dir, filename))
+    except FileNotFoundError:
+        pass
+
+
+class ResumeGarbageCollector:
+    """
+    Background removal of resume files that no application uses.
+
+    Files are orphaned by uploads whose request failed after the file was
+    stored, by references leaked when a worker crashed between storing a blob
+    and inserting its application, by abandoned uploads in the temp directory
+    and by legacy flat files of deleted applications.
+
+    Each pass scans at most ``files_per_pass`` files and checkpoints its
+    position (directory and last file name) in ``resume_gc_state``, so
+    millions of files are covered over successive passes without listing the
+    whole upload directory each time; blob directories are visited in sorted
+    order and only the current one is listed. Files are checked against
+    ``applications.resume_filename`` in batches with ``$in``. An orphan older
+    than the grace period is moved to the quarantine directory and recorded in
+    ``resume_quarantine``; it is deleted once it has been quarantined for the
+    retention period, unless an application references it again, in which
+    case it is restored. Flat files listed in a blob's ``legacy_names`` were
+    moved by shard_legacy_uploads, which removes them itself, and are skipped.
+    A lease on the state document keeps several API workers from scanning at
+    the same time.
+    """
+
+    def __init__(self, interval_seconds: int, files_per_pass: int, grace: timedelta, retention: timedelta):
+        self.interval_seconds = interval_seconds
+        self.files_per_pass = files_per_pass
+        self.grace = grace
+        self.retention = retention
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    def start(self):
+        """Start collecting in the background every interval_seconds (idempotent; 0 disables it)."""
+        if self.running or self.interval_seconds <= 0:
+            return
+        self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        """Stop the background loop; a pass cut short resumes from its last checkpoint."""
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _loop(self):
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            try:
+                report = await self.run_pass()
+                if report and (report["quarantined_files"] or report["reclaimed_files"]):
+                    logger.info(f"Resume GC: {report}")
+            except Exception as e:
+                logger.error(f"Resume garbage collection failed: {e}")
+
+    async def run_pass(self) -> Optional[Dict]:
+        """
+        Scan the next files_per_pass files and purge expired quarantined files.
+
+        Returns:
+            The pass's report, or None if another worker holds the lease
+        """
+        db = get_database()
+        now = datetime.utcnow()
+        try:
+            state = await db.resume_gc_state.find_one_and_update(
+                {"_id": STATE_ID, "$or": [{"lease_until": None}, {"lease_until": {"$lt": now}}]},
+                {"$set": {"lease_until": now + RESUME_GC_LEASE}},
+                upsert=True
+            )
+        except DuplicateKeyError:
+            return None
+        state = state or {}
+
+        report = {
+            "scanned_files": 0,
+            "quarantined_files": 0,
+            "quarantined_bytes": 0,
+            "reclaimed_files": 0,
+            "reclaimed_bytes": 0,
+            "restored_files": 0,
+            "completed_scan": False
+        }
+        shard, after = state.get("shard", ""), state.get("after")
+        try:
+            shard, after = await self._scan(shard, after, report)
+            await self._purge(report)
+        finally:
+            update = {
+                "$set": {"shard": shard, "after": after, "lease_until": None, "last_pass_at": datetime.utcnow()},
+                "$inc": {f"totals.{key}": value for key, value in report.items() if key != "completed_scan"}
+            }
+            if report["completed_scan"]:
+                update["$set"]["last_completed_scan_at"] = datetime.utcnow()
+            await db.resume_gc_state.update_one({"_id": STATE_ID}, update)
+        return report
+
+    async def _scan(self, shard: str, after: Optional[str], report: Dict) -> Tuple[str, Optional[str]]:
+        """Check files from the checkpoint on; return the new checkpoint."""
+        budget = self.files_per_pass
+        shards = await asyncio.to_thread(lambda: list(_shards_from(shard)))
+        for current in shards:
+            files = await asyncio.to_thread(_list_files, current, after if current == shard else None)
+            for offset in range(0, len(files), RESUME_GC_BATCH_SIZE):
+                batch = files[offset:offset + min(RESUME_GC_BATCH_SIZE, budget)]
+                await self._check_batch(batch, report)
+                report["scanned_files"] += len(batch)
+                budget -= len(batch)
+                if budget <= 0:
+                    return current, os.path.basename(batch[-1].filename)
+
+        # Reached the last blob directory: the next pass starts over
+        report["completed_scan"] = True
+        return "", None
+
+    async def _check_batch(self, files: List[ScannedFile], report: Dict):
+        """Quarantine the files of one batch that are old enough and unreferenced."""
+        db = get_database()
+        cutoff = datetime.utcnow() - self.grace
+        candidates = [file for file in files if file.modified_at < cutoff]
+        if not candidates:
+            return
+
+        # Abandoned uploads are never referenced
+        temp_prefix = TEMP_DIR + os.sep
+        for file in [file for file in candidates if file.filename.startswith(temp_prefix)]:
+            await self._quarantine(file, None, report)
+        candidates = [file for file in candidates if not file.filename.startswith(temp_prefix)]
+        if not candidates:
+            return
+
+        referenced = set(await db.applications.distinct(
+            "resume_filename", {"resume_filename": {"$in": [file.filename for file in candidates]}}
+        ))
+        orphans = [file for file in candidates if file.filename not in referenced]
+
+        # Flat files shard_legacy_uploads moved into a blob keep their old mtime (hard
+        # links) and stay until its removal delay ends; the migration removes them
+        flat = [file.filename for file in orphans if _blob_sha256(file.filename) is None]
+        if flat:
+            moved = set(await db.resume_blobs.distinct("legacy_names", {"legacy_names": {"$in": flat}}))
+            orphans = [file for file in orphans if file.filename not in moved]
+
+        blobs = {}
+        shas = [sha256 for sha256 in (_blob_sha256(file.filename) for file in orphans) if sha256]
+        if shas:
+            async for blob in db.resume_blobs.find({"_id": {"$in": shas}}):
+                blobs[blob["_id"]] = blob
+
+        for file in orphans:
+            sha256 = _blob_sha256(file.filename)
+            if sha256 is None:
+                await self._quarantine(file, None, report)
+                continue
+            blob = blobs.get(sha256)
+            # Referenced recently: an upload whose application is about to be inserted
+            if blob and blob.get("updated_at") and blob["updated_at"] >= cutoff:
+                continue
+            if await self._claim_blob(sha256, file, blob):
+                await self._quarantine(file, sha256, report)
+
+    async def _claim_blob(self, sha256: str, file: ScannedFile, blob: Optional[dict]) -> bool:
+        """
+        Mark an unreferenced blob as being deleted, the way ResumeBlobService.release
+        does, so uploads of the same content wait instead of reusing the file.
+        """
+        db = get_database()
+        now = datetime.utcnow()
+        if blob:
+            # Only if no upload took a reference since the batch was checked
+            claimed = await db.resume_blobs.find_one_and_update(
+                {"_id": sha256, "updated_at": blob.get("updated_at")},
+                {"$set": {"ref_count": 0, "deleting_at": now}}
+            )
+            if not claimed:
+                return False
+        else:
+            try:
+                await db.resume_blobs.insert_one({
+                    "_id": sha256, "filename": file.filename, "size": file.size,
+                    "ref_count": 0, "created_at": now, "updated_at": now, "deleting_at": now
+                })
+            except DuplicateKeyError:
+                return False
+
+        # An application inserted between the batch check and the claim
+        if await db.applications.find_one({"resume_filename": file.filename}, {"_id": 1}):
+            await db.resume_blobs.update_one(
+                {"_id": sha256},
+                {"$set": {"ref_count": await db.applications.count_documents({"resume_sha256": sha256})},
+                 "$unset": {"deleting_at": ""}}
+            )
+            return False
+        return True
+
+    async def _quarantine(self, file: ScannedFile, sha256: Optional[str], report: Dict):
+        db = get_database()
+        try:
+            await asyncio.to_thread(_move, file.filename, os.path.join(QUARANTINE_DIR, file.filename))
+        except FileNotFoundError:
+            pass
+        else:
+            await db.resume_quarantine.replace_one(
+                {"_id": file.filename},
+                {"size": file.size, "sha256": sha256, "quarantined_at": datetime.utcnow()},
+                upsert=True
+            )
+            report["quarantined_files"] += 1
+            report["quarantined_bytes"] += file.size
+        if sha256:
+            await db.resume_blobs.delete_one({"_id": sha256, "ref_count": 0})
+
+    async def _purge(self, report: Dict):
+        """Delete files quarantined longer than the retention period, restoring any referenced again."""
+        db = get_database()
+        cursor = db.resume_quarantine.find(
+            {"quarantined_at": {"$lt": datetime.utcnow() - self.retention}}
+        ).limit(self.files_per_pass)
+        batch = []
+        async for entry in cursor:
+            batch.append(entry)
+            if len(batch) >= RESUME_GC_BATCH_SIZE:
+                await self._purge_batch(batch, report)
+                batch = []
+        if batch:
+            await self._purge_batch(batch, report)
+
+    async def _purge_batch(self, entries: List[dict], report: Dict):
+        db = get_database()
+        referenced = set(await db.applications.distinct(
+            "resume_filename", {"resume_filename": {"$in": [entry["_id"] for entry in entries]}}
+        ))
+        for entry in entries:
+            filename = entry["_id"]
+            quarantined = os.path.join(QUARANTINE_DIR, filename)
+            if filename in referenced and not os.path.exists(os.path.join(settings.upload_dir, filename)):
+                await self._restore(entry)
+                report["restored_files"] += 1
+            else:
+                # Unreferenced, or a new upload of the same content replaced it
+                await asyncio.to_thread(_remove, quarantined)
+                report["reclaimed_files"] += 1
+                report["reclaimed_bytes"] += entry.get("size", 0)
+            await db.resume_quarantine.delete_one({"_id": filename})
+
+    async def _restore(self, entry: dict):
+        db = get_database()
+        filename = entry["_id"]
+        await asyncio.to_thread(_move, os.path.join(QUARANTINE_DIR, filename), filename)
+        sha256 = entry.get("sha256")
+        if sha256:
+            now = datetime.utcnow()
+            await db.resume_blobs.update_one(
+                {"_id": sha256},
+                {"$setOnInsert": {
+                    "filename": filename, "size": entry.get("size", 0), "created_at": now, "updated_at": now,
+                    "ref_count": await db.applications.count_documents({"resume_sha256": sha256})
+                }},
+                upsert=True
+            )
+        logger.warning(f"Restored quarantined resume {filename}: an application references it")
+
+    async def stats(self) -> dict:
+        """Scan position, lifetime totals and what is currently quarantined."""
+        db = get_database()
+        state = await db.resume_gc_state.find_one({"_id": STATE_ID}) or {}
+        quarantine = await db.resume_quarantine.aggregate([
+            {"$group": {"_id": None, "files": {"$sum": 1}, "bytes": {"$sum": "$size"}}}
+        ]).to_list(1)
+        return {
+            "running": self.running,
+            "scan_position": {"directory": state.get("shard", ""), "after": state.get("after")},
+            "pass_in_progress": bool(state.get("lease_until")),
+            "last_pass_at": state.get("last_pass_at"),
+            "last_completed_scan_at": state.get("last_completed_scan_at"),
+            "totals": state.get("totals", {}),
+            "quarantined_files": quarantine[0]["files"] if quarantine else 0,
+            "quarantined_bytes": quarantine[0]["bytes"] if quarantine else 0
+        }
+
+
+resume_garbage_collector = ResumeGarbageCollector(
+    interval_seconds=settings.resume_gc_interval_seconds,
+    files_per_pass=settings.resume_gc_files_per_pass,
+    grace=timedelta(hours=settings.resume_gc_grace_hours),
+    retention=timedelta(days=settings.resume_gc_quarantine_days)
+)
@@ -0,0 +1,59 @@
+from typing import Optional
+from bson import ObjectId
+from ..database import get_database
+from ..utils.scorecard import build_scorecard
+
+# Re-reads before giving up when stage feedback keeps changing under a refresh
+SCORECARD_REFRESH_ATTEMPTS = 3
+
+
+class ScorecardService:
+    """
+    Candidate scorecards, precomputed from stage feedback.
+
+    The scorecard (see scorecard.build_scorecard) is stored on the application
+    as ``scorecard`` and indexed by (job_id, scorecard.score), so a job's best
+    candidates are read off the index instead of being scored on every request.
+    It is refreshed after each stage submission.
+    """
+
+    def __init__(self):
+        self.db = get_database()
+
+    async def refresh(self, application_id: str, application: Optional[dict] = None) -> Optional[dict]:
+        """
+        Recompute and store an application's scorecard.
+
+        Args:
+            application_id: ID of the application
+            application: The application as just read or updated, if the caller has it; saves a read
+
+        Returns:
+            The stored scorecard, or None if the application doesn't exist
+        """
+        for _ in range(SCORECARD_REFRESH_ATTEMPTS):
+            if application is None:
+                application = await self.db.applications.find_one(
+                    {"_id": ObjectId(application_id)}, {"stages": 1}
+                )
+                if not application:
+                    return None
+
+            stages = application.get("stages")
+            scorecard = build_scorecard(stages)
+            # Only store it if no other submission changed the stages since they were read,
+            # otherwise score again from the newer feedback
+            # updated_at moves with it, so a delta sync that read the new feedback
+            # before the scorecard was stored picks the scorecard up next time
+            result = await self.db.applications.update_one(
+                {"_id": application["_id"], "stages": stages},
+                {"$set": {"scorecard": scorecard, "updated_at": scorecard["updated_at"]}}
+            )
+            if result.matched_count:
+                application["scorecard"] = scorecard
+                application["updated_at"] = scorecard["updated_at"]
+                return scorecard
+            application = None
+
+        # Whichever submission is still changing the stages refreshes after it
+        return None
@@ -0,0 +1,385 @@
+import logging
+from datetime import datetime
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from bson import ObjectId
+from pymongo import ReturnDocument
+from fastapi import HTTPException, status
+from ..database import get_database
+from ..models.user import UserRole
+from .job_service import JobService
+from .notification_service import NotificationService
+from .scorecard_service import ScorecardService
+
+logger = logging.getLogger(__name__)
+
+ALL_STAGES = tuple(range(1, 8))
+
+# Stage statuses in which feedback can still be submitted or edited; reviewed stages are locked
+OPEN_STATUSES = ("pending", "assigned", "in_progress", "completed")
+
+# Roles that act on any stage; everyone else only on the stages assigned to them
+REVIEWER_ROLES = (UserRole.HR.value, UserRole.ADMIN.value)
+
+
+class StageTransition(NamedTuple):
+    """One row of the stage workflow: when a transition applies and what it changes."""
+    from_statuses: Tuple[str, ...]  # Stage statuses it starts from; "pending" includes no status yet
+    to_status: Optional[str]  # New stage status, None to leave it unchanged
+    conflict: str  # 400 detail when the stage is in another status, formatted with stage and status
+    stages: Tuple[int, ...] = ALL_STAGES
+    assignee_only: bool = False  # Guard: only the stage's assignee, HR or admins
+    unassigned_only: bool = False  # Guard: only stages nobody is assigned to yet
+    advance: bool = False  # Move the application's current_stage past the stage
+    application_status: Optional[str] = None  # New application status
+    hooks: Tuple[str, ...] = ("audit",)  # Side effects run after the transition, in order
+
+
+STAGE_TRANSITIONS: Dict[str, StageTransition] = {
+    # Admin assignment; the assignee (and deadline) come in as fields
+    "assign": StageTransition(
+        ("pending",), "assigned", "Stage {stage} is not in pending status. Current status: {status}",
+        unassigned_only=True
+    ),
+    # Handing an unfinished stage to someone else; callers pass the assignee they expect to replace
+    "reassign": StageTransition(
+        ("pending", "assigned", "in_progress"), "assigned", "Cannot reassign {status} stage {stage}"
+    ),
+    # Team member progress on an assigned stage, mirrored on the assignment record
+    "start": StageTransition(
+        ("assigned",), "in_progress", "Invalid status transition from {status} to in_progress",
+        assignee_only=True, hooks=("assignment", "audit")
+    ),
+    "complete": StageTransition(
+        ("in_progress",), "completed", "Invalid status transition from {status} to completed",
+        assignee_only=True, hooks=("assignment", "audit")
+    ),
+    # Feedback submission (or an edit of it) completes the stage and rescores the candidate
+    "submit": StageTransition(
+        OPEN_STATUSES, "completed", "Stage {stage} has been {status} and its feedback can no longer be changed",
+        assignee_only=True, hooks=("assignment", "audit", "scorecard")
+    ),
+    "finalize": StageTransition(
+        OPEN_STATUSES, "completed", "Stage {stage} has been {status} and its feedback can no longer be changed",
+        stages=(7,), application_status="completed", hooks=("assignment", "audit")
+    ),
+    # HR review of completed stages
+    "forward": StageTransition(
+        ("completed",), "forwarded", "Stage {stage} must be completed before forwarding"
+    ),
+    "approve": StageTransition(
+        ("forwarded",), "approved", "Stage {stage} must be forwarded before approval",
+        advance=True, hooks=("audit", "notify")
+    ),
+    "reject": StageTransition(
+        ("forwarded",), "rejected", "Stage {stage} must be forwarded before rejection",
+        application_status="rejected", hooks=("audit", "notify")
+    ),
+    # Move on from the application's current stage once it is completed
+    "advance": StageTransition(
+        ("completed",), None, "Stage {stage} must be completed before forwarding",
+        stages=ALL_STAGES[:-1], advance=True
+    ),
+}
+
+# Stage statuses a team member can set directly, and the transition into each;
+# "assigned" is only set by an admin's assignment
+STATUS_TRANSITIONS = {"in_progress": "start", "completed": "complete"}
+
+
+class StageWorkflowService:
+    """
+    The interview stage workflow.
+
+    Every stage state change goes through apply(), which looks the change up
+    in STAGE_TRANSITIONS and runs it as one find_one_and_update whose filter
+    holds the transition's guards (the stage's status, and its assignee for
+    team members or for an admin's assignment). Concurrent requests can't
+    both pass the check, and the updated application comes back from the
+    same call. Only a failed transition reads the application again, to
+    tell the caller why.
+
+    Hooks run after the write: "assignment" mirrors the stage status on the
+    assignee's stage_assignments record, "audit" appends to stage_transitions,
+    "notify" tells the assignee about HR's decision and "scorecard" refreshes
+    the candidate's scorecard. A failing hook is logged; the transition stands.
+    """
+
+    def __init__(self):
+        self.db = get_database()
+
+    async def apply(
+        self,
+        application_id: str,
+        action: str,
+        stage_number: Optional[int],
+        user_id: str,
+        user_role: Optional[str] = None,
+        fields: Optional[dict] = None,
+        expected: Optional[dict] = None
+    ) -> dict:
+        """
+        Run a stage transition.
+
+        Args:
+            application_id: ID of the application
+            action: Key of the transition in STAGE_TRANSITIONS
+            stage_number: Stage number (1-7), or None for the application's current stage
+                (only for transitions that don't set stage fields, e.g. "advance")
+            user_id: User ID making the change
+            user_role: Role of that user; assignee guards apply unless it is HR or admin
+            fields: Stage fields to set along with the status, by name without the
+                stageN_ prefix (e.g. {"feedback": {...}})
+            expected: Stage fields that must still hold these values, by name without
+                the stageN_ prefix (e.g. {"assigned_to": previous_assignee})
+
+        Returns:
+            dict: The updated application document
+
+        Raises:
+            HTTPException: 404 if the application doesn't exist, 403 if the user
+                isn't assigned to the stage, 409 if an expected field changed,
+                400 if the stage can't make the transition
+        """
+        if stage_number is not None:
+            return await self.apply_to_stages(
+                application_id, action, [stage_number], user_id, user_role, fields, expected
+            )
+
+        transition = STAGE_TRANSITIONS[action]
+        if transition.to_status or fields:
+            # The stage's field names depend on which stage the guard matches
+            raise ValueError(f"Stage transition {action!r} sets stage fields and needs a stage number")
+        object_id = self._object_id(application_id)
+        guard = {"$or": [
+            {"current_stage": stage, **self._guard(transition, stage, user_id, user_role, expected)}
+            for stage in transition.stages
+        ]}
+        application = await self.db.applications.find_one_and_update(
+            {"_id": object_id, **guard},
+            self._update(transition, None, fields),
+            return_document=ReturnDocument.AFTER
+        )
+        if not application:
+            await self._raise_rejection(object_id, transition, None, user_id, user_role, expected)
+
+        stage = application["current_stage"] - 1 if transition.advance else application["current_stage"]
+        await self._run_hooks(action, transition, application, stage, user_id)
+        return application
+
+    async def apply_to_stages(
+        self,
+        application_id: str,
+        action: str,
+        stage_numbers: List[int],
+        user_id: str,
+        user_role: Optional[str] = None,
+        fields: Optional[dict] = None,
+        expected: Optional[dict] = None
+    ) -> dict:
+        """
+        Run a stage transition on several stages of one application in a single
+        write: either every stage makes it or none does.
+
+        Args and Raises as for apply(), with stage_numbers naming the stages;
+        fields and expected apply to each of them.
+
+        Returns:
+            dict: The updated application document
+        """
+        transition = STAGE_TRANSITIONS[action]
+        stage_numbers = list(dict.fromkeys(stage_numbers))
+        for stage_number in stage_numbers:
+            if stage_number not in transition.stages:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Stage number must be between 1 and 7"
+                    if stage_number not in ALL_STAGES else "Invalid stage number"
+                )
+        object_id = self._object_id(application_id)
+
+        guard = {}
+        for stage in stage_numbers:
+            guard.update(self._guard(transition, stage, user_id, user_role, expected))
+        application = await self.db.applications.find_one_and_update(
+            {"_id": object_id, **guard},
+            self._update(transition, stage_numbers, fields),
+            return_document=ReturnDocument.AFTER
+        )
+        if not application:
+            await self._raise_rejection(object_id, transition, stage_numbers, user_id, user_role, expected)
+
+        for stage in stage_numbers:
+            await self._run_hooks(action, transition, application, stage, user_id)
+        return application
+
+    def _object_id(self, application_id: str) -> ObjectId:
+        try:
+            return ObjectId(application_id)
+        except Exception:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Application not found"
+            )
+
+    def _guard(
+        self,
+        transition: StageTransition,
+        stage: int,
+        user_id: str,
+        user_role: Optional[str],
+        expected: Optional[dict] = None
+    ) -> dict:
+        """Filter matching an application whose stage can make the transition for this user."""
+        statuses = list(transition.from_statuses)
+        if "pending" in statuses:
+            statuses.append(None)  # Stages nobody touched yet have no status
+        guard = {f"stages.stage{stage}_status": {"$in": statuses}}
+        if transition.assignee_only and user_role not in REVIEWER_ROLES:
+            guard[f"stages.stage{stage}_assigned_to"] = user_id
+        if transition.unassigned_only:
+            guard[f"stages.stage{stage}_assigned_to"] = None  # Matches a missing field too
+        for name, value in (expected or {}).items():
+            guard[f"stages.stage{stage}_{name}"] = value
+        return guard
+
+    def _update(self, transition: StageTransition, stages: Optional[List[int]], fields: Optional[dict]) -> dict:
+        """The update making the transition on the given stages, or on the current stage if None."""
+        changes = {"updated_at": datetime.utcnow()}
+        for stage in stages or ():
+            if transition.to_status:
+                changes[f"stages.stage{stage}_status"] = transition.to_status
+            for name, value in (fields or {}).items():
+                changes[f"stages.stage{stage}_{name}"] = value
+        if transition.application_status:
+            changes["status"] = transition.application_status
+
+        update = {"$set": changes}
+        if transition.advance:
+            if stages is None:
+                # The guard matched the current stage, which isn't the last one
+                update["$inc"] = {"current_stage": 1}
+            elif max(stages) < ALL_STAGES[-1]:
+                # Approving an earlier stage again must not move the application back
+                update["$max"] = {"current_stage": max(stages) + 1}
+        return update
+
+    async def _raise_rejection(
+        self,
+        object_id: ObjectId,
+        transition: StageTransition,
+        stage_numbers: Optional[List[int]],
+        user_id: str,
+        user_role: Optional[str],
+        expected: Optional[dict] = None
+    ):
+        """Read the application once to explain why a transition didn't match."""
+        application = await self.db.applications.find_one(
+            {"_id": object_id}, {"current_stage": 1, "stages": 1}
+        )
+        if not application:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Application not found"
+            )
+
+        stages = application.get("stages") or {}
+        stage_numbers = stage_numbers or [application.get("current_stage", 1)]
+        conflicts = []
+        for stage in stage_numbers:
+            if stage not in transition.stages:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Application has completed all interview stages"
+                )
+
+            assigned_to = stages.get(f"stage{stage}_assigned_to")
+            if transition.assignee_only and user_role not in REVIEWER_ROLES and assigned_to != user_id:
+                raise HTTPException(
+                    status_code=status.HTTP_403_FORBIDDEN,
+                    detail="You are not assigned to this stage"
+                )
+
+            stage_status = stages.get(f"stage{stage}_status") or "pending"
+            if stage_status not in transition.from_statuses:
+                conflicts.append(transition.conflict.format(stage=stage, status=stage_status))
+            elif transition.unassigned_only and assigned_to is not None:
+                conflicts.append(f"Stage {stage} is already assigned to another team member")
+            elif any(stages.get(f"stage{stage}_{name}") != value for name, value in (expected or {}).items()):
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail=f"Stage {stage} was changed by someone else; reload it and try again"
+                )
+
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="; ".join(conflicts) or transition.conflict.format(
+                stage=stage_numbers[0], status=stages.get(f"stage{stage_numbers[0]}_status") or "pending"
+            )
+        )
+
+    async def _run_hooks(self, action: str, transition: StageTransition, application: dict, stage: int, user_id: str):
+        hooks = {
+            "assignment": self._update_assignment,
+            "audit": self._record_transition,
+            "notify": self._notify_assignee,
+            "scorecard": self._refresh_scorecard,
+        }
+        for name in transition.hooks:
+            try:
+                await hooks[name](action, transition, application, stage, user_id)
+            except Exception as e:
+                logger.error(f"Stage {action} hook {name} failed for application {application['_id']}: {e}")
+
+    async def _update_assignment(self, action, transition, application, stage, user_id):
+        """Mirror the stage status on the current assignee's stage_assignments record."""
+        assigned_to = (application.get("stages") or {}).get(f"stage{stage}_assigned_to")
+        if not assigned_to:
+            return
+        now = datetime.utcnow()
+        changes = {
+            "status": transition.to_status,
+            "status_changed_at": now,
+            "status_changed_by": user_id
+        }
+        if transition.to_status == "completed":
+            changes["completed_at"] = now
+        await self.db.stage_assignments.update_one(
+            {
+                "application_id": str(application["_id"]),
+                "stage_number": stage,
+                "assigned_to": assigned_to
+            },
+            {"$set": changes}
+        )
+
+    async def _record_transition(self, action, transition, application, stage, user_id):
+        """Append the transition to the application's stage history."""
+        await self.db.stage_transitions.insert_one({
+            "application_id": str(application["_id"]),
+            "stage_number": stage,
+            "action": action,
+            "status": (application.get("stages") or {}).get(f"stage{stage}_status"),
+            "current_stage": application.get("current_stage"),
+            "changed_by": user_id,
+            "changed_at": application["updated_at"]
+        })
+
+    async def _notify_assignee(self, action, transition, application, stage, user_id):
+        """Tell the stage's assignee that HR approved or rejected it."""
+        stages = application.get("stages") or {}
+        assigned_to = stages.get(f"stage{stage}_assigned_to")
+        if not assigned_to or assigned_to == user_id:
+            return
+        job_title = application.get("job_title") or await JobService().get_job_title(application["job_id"])
+        await NotificationService().send_stage_review_notification(
+            user_id=assigned_to,
+            application_id=str(application["_id"]),
+            stage_number=stage,
+            decision=transition.to_status,
+            candidate_name=application.get("name", "Unknown"),
+            job_title=job_title,
+            reason=stages.get(f"stage{stage}_rejection_reason")
+        )
+
+    async def _refresh_scorecard(self, action, transition, application, stage, user_id):
+        await ScorecardService().refresh(str(application["_id"]), application)
@@ -0,0 +1,86 @@
+from typing import List, Optional, Tuple
+from datetime import datetime, timedelta
+from ..config import settings
+from ..database import get_database
+from ..models.sync import Tombstone
+
+
+class TombstoneService:
+    """Service for recording deletions so delta-sync clients can drop stale copies."""
+
+    def __init__(self):
+        self.db = get_database()
+
+    async def record_deletion(
+        self,
+        collection: str,
+        document_id: str,
+        visible_to: Optional[List[str]] = None
+    ):
+        """
+        Record that a document was deleted.
+
+        Args:
+            collection: Logical collection name (applications, assignments, ...)
+            document_id: ID of the deleted document as clients know it
+            visible_to: User IDs whose scoped lists contained the document
+        """
+        await self.db.tombstones.insert_one({
+            "collection": collection,
+            "document_id": document_id,
+            "visible_to": visible_to or [],
+            "deleted_at": datetime.utcnow()
+        })
+
+    async def record_deletions(self, collection: str, deletions: List[Tuple[str, List[str]]]):
+        """
+        Record several deletions in one round trip.
+
+        Args:
+            collection: Logical collection name
+            deletions: (document_id, visible_to) pairs
+        """
+        if not deletions:
+            return
+        deleted_at = datetime.utcnow()
+        await self.db.tombstones.insert_many([
+            {
+                "collection": collection,
+                "document_id": document_id,
+                "visible_to": visible_to,
+                "deleted_at": deleted_at
+            }
+            for document_id, visible_to in deletions
+        ])
+
+    async def get_deletions(
+        self,
+        collection: str,
+        since: datetime,
+        user_id: Optional[str] = None
+    ) -> List[Tombstone]:
+        """
+        Get deletions in a collection since a timestamp.
+
+        Args:
+            collection: Logical collection name
+            since: Only return deletions at or after this time
+            user_id: If set, only return deletions visible to this user
+
+        Returns:
+            List of tombstones, oldest first
+        """
+        query = {"collection": collection, "deleted_at": {"$gte": since}}
+        if user_id:
+            query["visible_to"] = user_id
+
+        cursor = self.db.tombstones.find(query, {"document_id": 1, "deleted_at": 1}).sort("deleted_at", 1)
+
+        return [
+            Tombstone(id=tombstone["document_id"], deleted_at=tombstone["deleted_at"])
+            async for tombstone in cursor
+        ]
+
+    def is_expired(self, since: datetime) -> bool:
+        """Check whether tombstones for a sync starting at ``since`` may already be gone (TTL index)."""
+        return since < datetime.utcnow() - timedelta(days=settings.tombstone_retention_days)
@@ -1,12 +1,25 @@
-from typing import Optional, List
+import logging
+from typing import Optional, List, AsyncIterator, Union
 from datetime import datetime
 from bson import ObjectId
 from ..database import get_database
-from ..models.user import UserCreate, UserInDB, UserUpdate, UserResponse, UserLogin, Token
+from ..models.user import (
+    UserCreate, UserInDB, UserUpdate, UserResponse, UserLogin, Token, UserSearchResult,
+    CandidateOption, CandidateOptionPage, UserPage
+)
 from ..auth.jwt import get_password_hash, verify_password, create_access_token
+from ..utils.fields import build_projection
+from ..utils.search import build_user_search_fields, normalize_text, prefix_query, prefix_fuzzy_search
+from ..utils.pagination import encode_keyset_cursor, build_keyset_filter
 from fastapi import HTTPException, status
 from ..models.user import UserRole
 
+logger = logging.getLogger(__name__)
+
+# Listings only read the fields UserResponse needs (never hashed_password);
+# username_lower is the keyset pagination sort key
+USER_LIST_PROJECTION = build_projection(UserResponse.model_fields.keys(), always=["username_lower"])
+
 
 class UserService:
     def __init__(self):
@@ -45,6 +58,7 @@ class UserService:
         
         user_in_db = UserInDB(**user_dict)
         user_doc = user_in_db.dict()
+        user_doc.update(build_user_search_fields(user_in_db.username, user_in_db.email, user_in_db.mobile))
         
         # Insert into database
         result = await self.db.users.insert_one(user_doc)
@@ -113,6 +127,20 @@ class UserService:
         except Exception:
             return None
 
+    async def get_user_fields(self, user_id: str, fields: List[str]) -> Optional[dict]:
+        """Get only the requested fields of a user (sparse fieldset)."""
+        try:
+            user = await self.db.users.find_one({"_id": ObjectId(user_id)}, build_projection(fields))
+            if not user:
+                return None
+            
+            user["id"] = str(user["_id"])
+            del user["_id"]
+            
+            return user
+        except Exception:
+            return None
+
     async def get_user_by_email(self, email: str) -> Optional[UserResponse]:
         """Get user by email."""
         user = await self.db.users.find_one({"email": email})
@@ -124,53 +152,137 @@ class UserService:
         
         return UserResponse(**user)
 
+    def _role_filter(self, role: Optional[Union[UserRole, List[UserRole]]]) -> dict:
+        """Filter on one role or any of several roles (all users if None)."""
+        if role is None:
+            return {}
+        if isinstance(role, list):
+            return {"role": {"$in": [r.value for r in role]}}
+        return {"role": role.value}
+
+    def _to_response(self, user: dict) -> UserResponse:
+        """Convert a projected user document to a UserResponse."""
+        user["id"] = str(user.pop("_id"))
+        return UserResponse(**user)
+
     async def get_all_users(self) -> List[UserResponse]:
         """Get all users."""
-        try:
-            users = await self.db.users.find().to_list(length=None)
-            user_responses = []
-            for user in users:
-                user["id"] = str(user["_id"])
-                del user["_id"]
-                user_responses.append(UserResponse(**user))
-            return user_responses
-        except Exception:
-            return []
+        return await self.get_users_by_role(None)
 
-    async def get_users_by_role(self, role: UserRole) -> List[UserResponse]:
-        """Get users by role."""
+    async def get_users_by_role(self, role: Optional[Union[UserRole, List[UserRole]]]) -> List[UserResponse]:
+        """Get users by role (or any of several roles)."""
         try:
-            users = await self.db.users.find({"role": role.value}).to_list(length=None)
-            user_responses = []
-            for user in users:
-                user["id"] = str(user["_id"])
-                del user["_id"]
-                user_responses.append(UserResponse(**user))
-            return user_responses
+            cursor = self.db.users.find(self._role_filter(role), USER_LIST_PROJECTION)
+            return [self._to_response(user) async for user in cursor]
         except Exception:
+            logger.exception("Failed to list users")
             return []
 
+    async def list_users(
+        self,
+        role: Optional[Union[UserRole, List[UserRole]]] = None,
+        limit: int = 50,
+        cursor: Optional[str] = None
+    ) -> UserPage:
+        """
+        Get one page of users ordered by username.
+        
+        Pages are (username_lower, _id) keyset ranges, so deep pages cost the
+        same as the first one.
+        """
+        conditions = [self._role_filter(role)]
+        if cursor:
+            conditions.append(build_keyset_filter("username_lower", 1, cursor))
+        
+        users = await self.db.users.find(
+            {"$and": conditions}, USER_LIST_PROJECTION
+        ).sort([("username_lower", 1), ("_id", 1)]).limit(limit + 1).to_list(length=limit + 1)
+        
+        next_cursor = None
+        if len(users) > limit:
+            users = users[:limit]
+            next_cursor = encode_keyset_cursor(users[-1].get("username_lower"), users[-1]["_id"])
+        
+        return UserPage(items=[self._to_response(user) for user in users], next_cursor=next_cursor)
+
+    async def iter_users(
+        self,
+        role: Optional[Union[UserRole, List[UserRole]]] = None,
+        batch_size: int = 1000
+    ) -> AsyncIterator[UserResponse]:
+        """Yield users one at a time straight from the cursor (for streaming exports)."""
+        cursor = self.db.users.find(self._role_filter(role), USER_LIST_PROJECTION).batch_size(batch_size)
+        async for user in cursor:
+            yield self._to_response(user)
+
+    async def search_users(
+        self,
+        query: str,
+        role: Optional[UserRole] = None,
+        limit: int = 10
+    ) -> List[UserSearchResult]:
+        """Search users by username, email or mobile (prefix, then fuzzy matches)."""
+        scope = {"role": role.value} if role else {}
+        projection = {"username": 1, "email": 1, "mobile": 1, "role": 1}
+        matches = await prefix_fuzzy_search(self.db.users, query, scope, projection, limit)
+        
+        results = []
+        for user, match, score in matches:
+            user["id"] = str(user.pop("_id"))
+            results.append(UserSearchResult(**user, match=match, score=score))
+        return results
+
+    async def search_candidates(
+        self,
+        query: Optional[str] = None,
+        limit: int = 20,
+        cursor: Optional[str] = None
+    ) -> CandidateOptionPage:
+        """
+        Typeahead over candidates by username or email prefix, ordered by username.
+        
+        Uses the (role, username_lower, _id) index, so each page is a bounded
+        index range scan and only the option fields are read.
+        """
+        conditions = [{"role": UserRole.CANDIDATE.value}]
+        
+        term = normalize_text(query)
+        if term:
+            conditions.append({"$or": [
+                {"username_lower": prefix_query(term)},
+                {"email_lower": prefix_query(term)}
+            ]})
+        
+        if cursor:
+            conditions.append(build_keyset_filter("username_lower", 1, cursor))
+        
+        candidates = await self.db.users.find(
+            {"$and": conditions},
+            {"username": 1, "email": 1, "mobile": 1, "username_lower": 1}
+        ).sort([("username_lower", 1), ("_id", 1)]).limit(limit + 1).to_list(length=limit + 1)
+        
+        next_cursor = None
+        if len(candidates) > limit:
+            candidates = candidates[:limit]
+            last = candidates[-1]
+            next_cursor = encode_keyset_cursor(last.get("username_lower"), last["_id"])
+        
+        return CandidateOptionPage(
+            items=[
+                CandidateOption(
+                    id=str(candidate["_id"]),
+                    username=candidate["username"],
+                    email=candidate["email"],
+                    mobile=candidate["mobile"]
+                )
+                for candidate in candidates
+            ],
+            next_cursor=next_cursor
+        )
+
     async def get_assignment_users(self) -> List[UserResponse]:
         """Get all users available for assignment (HR, Admin, Team Members - excluding candidates)."""
-        try:
-            print("get_assignment_users: Querying database for assignment users...")
-            users = await self.db.users.find({
-                "role": {"$in": ["hr", "admin", "team_member"]}
-            }).to_list(length=None)
-            print(f"get_assignment_users: Found {len(users)} users in database")
-            
-            user_responses = []
-            for user in users:
-                user["id"] = str(user["_id"])
-                del user["_id"]
-                user_responses.append(UserResponse(**user))
-                print(f"get_assignment_users: Added user {user['username']} with role {user['role']}")
-            
-            print(f"get_assignment_users: Returning {len(user_responses)} users")
-            return user_responses
-        except Exception as e:
-            print(f"get_assignment_users: Error occurred: {e}")
-            return []
+        return await self.get_users_by_role([UserRole.HR, UserRole.ADMIN, UserRole.TEAM_MEMBER])
 
     async def update_user(self, user_id: str, user_update: UserUpdate) -> Optional[UserResponse]:
         """Update user information."""
@@ -219,6 +331,18 @@ class UserService:
                         detail="Mobile number already registered"
                     )
             
+            # Keep the normalized search/typeahead fields in step with username/email/mobile
+            if {"username", "email", "mobile"} & update_data.keys():
+                current = await self.db.users.find_one(
+                    {"_id": ObjectId(user_id)},
+                    {"username": 1, "email": 1, "mobile": 1}
+                )
+                if current:
+                    merged = {**current, **update_data}
+                    update_data.update(build_user_search_fields(
+                        merged.get("username"), merged.get("email"), merged.get("mobile")
+                    ))
+            
             update_data["updated_at"] = datetime.utcnow()
             
             result = await self.db.users.update_one(
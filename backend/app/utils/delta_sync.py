@@ -0,0 +1,70 @@
+import base64
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple
+from bson import ObjectId
+from fastapi import HTTPException, status
+
+# Returned server_time lags "now" by this much so writes that were in flight
+# while a page was read are picked up again by the next sync (merges are idempotent)
+SYNC_OVERLAP = timedelta(seconds=5)
+
+
+def parse_timestamp(value: str) -> datetime:
+    """Parse an ISO timestamp into a naive UTC datetime (the form Mongo returns)."""
+    try:
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid updated_since format. Use ISO format (YYYY-MM-DDTHH:MM:SS)"
+        )
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def encode_cursor(updated_at: datetime, document_id: ObjectId) -> str:
+    """Encode the (updated_at, _id) position of the last document on a page."""
+    raw = f"{updated_at.isoformat()}|{document_id}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, ObjectId]:
+    """Decode a cursor produced by encode_cursor."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+        updated_at, document_id = raw.split("|", 1)
+        return datetime.fromisoformat(updated_at), ObjectId(document_id)
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+def build_delta_filter(
+    updated_since: Optional[datetime],
+    cursor: Optional[str],
+    field: str = "updated_at"
+) -> dict:
+    """
+    Build the filter for one page of changed documents.
+
+    Pages are ordered by (field, _id); a cursor resumes strictly after the
+    last document returned, otherwise everything changed since updated_since
+    is included.
+    """
+    if cursor:
+        last_updated_at, last_id = decode_cursor(cursor)
+        return {"$or": [
+            {field: {"$gt": last_updated_at}},
+            {field: last_updated_at, "_id": {"$gt": last_id}}
+        ]}
+    if updated_since:
+        return {field: {"$gte": updated_since}}
+    return {}
+
+
+def sync_server_time() -> datetime:
+    """The value clients should send as updated_since on their next sync."""
+    return datetime.utcnow() - SYNC_OVERLAP
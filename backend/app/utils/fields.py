@@ -0,0 +1,57 @@
+from typing import Iterable, List, Optional
+from fastapi import HTTPException, status
+
+
+def parse_fields(fields: Optional[str], allowed: Iterable[str]) -> Optional[List[str]]:
+    """
+    Parse a comma-separated ``fields`` query parameter.
+
+    Dotted paths (e.g. ``stages.stage1_status``) are accepted as long as their
+    top-level name is allowed. Returns None when no fields were requested.
+    """
+    if not fields:
+        return None
+
+    allowed_names = set(allowed)
+    requested = []
+    for raw_name in fields.split(","):
+        name = raw_name.strip()
+        if not name:
+            continue
+        if name.split(".", 1)[0] not in allowed_names:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown field '{name}'. Allowed fields: {', '.join(sorted(allowed_names))}"
+            )
+        if name not in requested:
+            requested.append(name)
+
+    return requested or None
+
+
+def build_projection(fields: List[str], always: Iterable[str] = ()) -> dict:
+    """
+    Build a Mongo projection for the requested fields.
+
+    ``always`` names are projected even if not requested (e.g. fields needed for
+    access checks).
+    """
+    paths = [name for name in list(fields) + list(always) if name != "id"]
+
+    # Mongo rejects a projection containing both a path and one of its parents
+    projection = {}
+    for path in sorted(set(paths), key=len):
+        if any(path.startswith(f"{parent}.") for parent in projection):
+            continue
+        projection[path] = 1
+
+    # Always project at least _id so an empty projection doesn't return the whole document
+    projection.setdefault("_id", 1)
+    return projection
+
+
+def trim_document(document: dict, fields: List[str]) -> dict:
+    """Keep only the requested top-level fields (plus ``id``) of a projected document."""
+    top_level = {name.split(".", 1)[0] for name in fields}
+    top_level.add("id")
+    return {key: value for key, value in document.items() if key in top_level}
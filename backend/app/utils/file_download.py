@@ -0,0 +1,205 @@
+import os
+import stat
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Optional, Tuple
+from urllib.parse import quote
+import anyio
+from fastapi import HTTPException, Request, Response, status
+from fastapi.responses import FileResponse
+from starlette.types import Receive, Scope, Send
+from ..config import settings
+from .file_upload import get_file_path
+from .http_cache import etag_matches, cache_headers, not_modified_response
+
+RESUME_MEDIA_TYPES = {
+    '.pdf': 'application/pdf',
+    '.doc': 'application/msword',
+    '.docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+}
+
+# ASGI extension servers advertise when they can send a file with sendfile(2)
+ZEROCOPY_EXTENSION = "http.response.zerocopysend"
+
+
+def parse_range(range_header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single-range ``Range: bytes=...`` header into inclusive (start, end).
+
+    Returns None when the whole file should be sent (no header, an unknown
+    unit, or several ranges, which servers may answer with the full body).
+    """
+    if not range_header or not range_header.startswith("bytes="):
+        return None
+    spec = range_header[len("bytes="):].strip()
+    if "," in spec:
+        return None
+
+    start_text, _, end_text = spec.partition("-")
+    try:
+        if start_text:
+            start = int(start_text)
+            end = int(end_text) if end_text else size - 1
+        else:
+            # Suffix range: the last N bytes
+            start = max(size - int(end_text), 0)
+            end = size - 1
+    except ValueError:
+        return None
+
+    if start > end or start >= size:
+        raise HTTPException(
+            status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+            detail="Requested range not satisfiable",
+            headers={"Content-Range": f"bytes */{size}"}
+        )
+    return start, min(end, size - 1)
+
+
+def _not_modified_since(request: Request, mtime: float) -> bool:
+    if_modified_since = request.headers.get("if-modified-since")
+    if not if_modified_since:
+        return False
+    try:
+        return int(mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+    except (TypeError, ValueError):
+        return False
+
+
+def _range_applies(request: Request, etag: str, last_modified: str) -> bool:
+    """If-Range: only honor Range when the client's copy is still current."""
+    if_range = request.headers.get("if-range")
+    if not if_range:
+        return True
+    if if_range.startswith('"') or if_range.startswith("W/"):
+        return if_range == etag
+    return if_range == last_modified
+
+
+class RangeFileResponse(FileResponse):
+    """
+    FileResponse that can send one byte range (206) of the file.
+
+    When the ASGI server supports the zero-copy send extension the kernel
+    copies the bytes; otherwise the range is read in chunks on a worker thread.
+    """
+
+    def __init__(self, path: str, stat_result: os.stat_result, byte_range: Optional[Tuple[int, int]] = None, **kwargs):
+        self.byte_range = byte_range
+        super().__init__(path, stat_result=stat_result, **kwargs)
+        if byte_range:
+            start, end = byte_range
+            self.status_code = status.HTTP_206_PARTIAL_CONTENT
+            self.headers["content-range"] = f"bytes {start}-{end}/{stat_result.st_size}"
+            self.headers["content-length"] = str(end - start + 1)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        start, end = self.byte_range or (0, self.stat_result.st_size - 1)
+        await send({
+            "type": "http.response.start",
+            "status": self.status_code,
+            "headers": self.raw_headers,
+        })
+        if self.send_header_only or end < start:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+
+        if ZEROCOPY_EXTENSION in scope.get("extensions", {}):
+            with open(self.path, "rb") as file:
+                await send({
+                    "type": ZEROCOPY_EXTENSION,
+                    "file": file,
+                    "offset": start,
+                    "count": end - start + 1,
+                    "more_body": False,
+                })
+            return
+
+        async with await anyio.open_file(self.path, mode="rb") as file:
+            await file.seek(start)
+            remaining = end - start + 1
+            while remaining > 0:
+                chunk = await file.read(min(self.chunk_size, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                await send({
+                    "type": "http.response.body",
+                    "body": chunk,
+                    "more_body": remaining > 0,
+                })
+            if remaining > 0:
+                await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+
+def stored_file_response(request: Request, filename: str, download_name: str, etag: Optional[str] = None) -> Response:
+    """
+    Serve a file from the upload directory after the caller has authorized it.
+
+    With ``settings.download_accel_redirect_prefix`` set, the response is an
+    empty X-Accel-Redirect and nginx sends the file itself (including Range
+    and conditional requests). Otherwise the file is sent from here with
+    ETag/Last-Modified validation and single-range support.
+
+    Args:
+        filename: Path relative to the upload directory
+        download_name: File name offered to the browser
+        etag: Strong validator, e.g. the content hash; derived from size and mtime if omitted
+    """
+    extension = os.path.splitext(filename)[1].lower()
+    media_type = RESUME_MEDIA_TYPES.get(extension, "application/octet-stream")
+    disposition = f"attachment; filename*=utf-8''{quote(download_name)}"
+
+    try:
+        path = get_file_path(filename)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Resume file not found"
+        )
+
+    if settings.download_accel_redirect_prefix:
+        return Response(
+            media_type=media_type,
+            headers={
+                "X-Accel-Redirect": settings.download_accel_redirect_prefix + quote(filename),
+                "Content-Disposition": disposition,
+                "Cache-Control": "private, no-cache",
+            }
+        )
+
+    try:
+        stat_result = os.stat(path)
+    except FileNotFoundError:
+        stat_result = None
+    if stat_result is None or not stat.S_ISREG(stat_result.st_mode):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Resume file not found"
+        )
+
+    etag = etag or f'"{int(stat_result.st_mtime)}-{stat_result.st_size}"'
+    last_modified = formatdate(stat_result.st_mtime, usegmt=True)
+    headers = {
+        **cache_headers(etag),
+        "Last-Modified": last_modified,
+        "Accept-Ranges": "bytes",
+        "Content-Disposition": disposition,
+    }
+
+    # If-None-Match wins over If-Modified-Since when both are sent
+    if_none_match = request.headers.get("if-none-match")
+    if etag_matches(if_none_match, etag) or (not if_none_match and _not_modified_since(request, stat_result.st_mtime)):
+        return not_modified_response(etag, headers={**cache_headers(etag), "Last-Modified": last_modified})
+
+    byte_range = None
+    if _range_applies(request, etag, last_modified):
+        byte_range = parse_range(request.headers.get("range"), stat_result.st_size)
+
+    return RangeFileResponse(
+        path,
+        stat_result=stat_result,
+        byte_range=byte_range,
+        headers=headers,
+        media_type=media_type,
+        method=request.method,
+    )
@@ -1,24 +1,65 @@
+import hashlib
 import os
 import aiofiles
 import uuid
-from datetime import datetime
+from typing import NamedTuple
 from fastapi import UploadFile, HTTPException, status
 from ..config import settings
 
 
-async def save_upload_file(upload_file: UploadFile) -> str:
-    """Save uploaded file and return filename."""
+# Blobs live under this directory of settings.upload_dir, sharded by the first
+# two bytes of their SHA-256 so no single directory grows too large
+BLOB_DIR = "resumes"
+
+# Uploads in progress; kept inside upload_dir so moving a finished file is a rename
+TEMP_DIR = "tmp"
+
+# Leading bytes of each allowed file type; .docx is a ZIP container, .doc an OLE2 compound file
+FILE_SIGNATURES = {
+    '.pdf': [b'%PDF-'],
+    '.doc': [b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1'],
+    '.docx': [b'PK\x03\x04'],
+}
+
+
+def _too_large_error(size: int) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"File size ({size} bytes) exceeds maximum limit of {settings.max_file_size} bytes"
+    )
+
+
+class ReceivedFile(NamedTuple):
+    """An upload streamed to a temporary file and hashed, not yet in the blob store."""
+    temp_path: str
+    sha256: str
+    size: int
+    extension: str
+
+
+def blob_filename(sha256: str, extension: str) -> str:
+    """Content-addressed path of a blob, relative to the upload directory (resumes/ab/cd/<sha256>.pdf)."""
+    return os.path.join(BLOB_DIR, sha256[:2], sha256[2:4], f"{sha256}{extension}")
+
+
+async def receive_upload_file(upload_file: UploadFile) -> ReceivedFile:
+    """
+    Validate an upload and stream it to a temporary file, hashing it on the way.
+    
+    The file is written in fixed-size chunks, so memory use per upload is
+    bounded by the chunk size. The size limit is enforced as bytes arrive and
+    the first chunk's content must match the extension. The caller owns the
+    temporary file: pass it to commit_received_file or discard_received_file.
+    """
+    temp_path = None
     try:
-        # Validate file size
+        # Reject early if the client declared an oversized file
         if upload_file.size and upload_file.size > settings.max_file_size:
-            raise HTTPException(
-                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-                detail=f"File size ({upload_file.size} bytes) exceeds maximum limit of {settings.max_file_size} bytes"
-            )
+            raise _too_large_error(upload_file.size)
         
         # Validate file type (only allow PDF, DOC, DOCX)
-        allowed_extensions = {'.pdf', '.doc', '.docx'}
-        file_extension = os.path.splitext(upload_file.filename)[1].lower()
+        allowed_extensions = set(FILE_SIGNATURES)
+        file_extension = os.path.splitext(upload_file.filename or "")[1].lower()
         
         if file_extension not in allowed_extensions:
             raise HTTPException(
@@ -26,21 +67,42 @@ async def save_upload_file(upload_file: UploadFile) -> str:
                 detail=f"File type '{file_extension}' not allowed. Only PDF, DOC, and DOCX files are allowed"
             )
         
-        # Generate unique filename
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        unique_id = str(uuid.uuid4())[:8]
-        filename = f"{timestamp}_{unique_id}{file_extension}"
-        file_path = os.path.join(settings.upload_dir, filename)
+        # Ensure the temp directory exists; it shares a filesystem with the blobs so renames are atomic
+        temp_dir = os.path.join(settings.upload_dir, TEMP_DIR)
+        os.makedirs(temp_dir, exist_ok=True)
+        temp_path = os.path.join(temp_dir, f"{uuid.uuid4().hex}{file_extension}.part")
         
-        # Ensure upload directory exists
-        os.makedirs(settings.upload_dir, exist_ok=True)
+        # Stream to the temp file chunk by chunk
+        size = 0
+        digest = hashlib.sha256()
+        async with aiofiles.open(temp_path, 'wb') as f:
+            while True:
+                chunk = await upload_file.read(settings.upload_chunk_size)
+                if not chunk:
+                    break
+                
+                if size == 0 and not any(chunk.startswith(signature) for signature in FILE_SIGNATURES[file_extension]):
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail=f"File content does not match its '{file_extension}' extension"
+                    )
+                
+                size += len(chunk)
+                if size > settings.max_file_size:
+                    raise _too_large_error(size)
+                
+                digest.update(chunk)
+                await f.write(chunk)
         
-        # Save file
-        async with aiofiles.open(file_path, 'wb') as f:
-            content = await upload_file.read()
-            await f.write(content)
+        if size == 0:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Uploaded file is empty"
+            )
         
-        return filename
+        received = ReceivedFile(temp_path, digest.hexdigest(), size, file_extension)
+        temp_path = None
+        return received
     except HTTPException:
         # Re-raise HTTP exceptions
         raise
@@ -49,12 +111,54 @@ async def save_upload_file(upload_file: UploadFile) -> str:
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to save file: {str(e)}"
         )
+    finally:
+        if temp_path and os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+def commit_received_file(received: ReceivedFile) -> str:
+    """
+    Move a received file to its content-addressed path and return that path.
+    
+    If a blob with the same content is already stored the temporary file is
+    dropped instead, so identical resumes are kept on disk once.
+    """
+    filename = blob_filename(received.sha256, received.extension)
+    file_path = os.path.join(settings.upload_dir, filename)
+    if os.path.exists(file_path):
+        discard_received_file(received)
+        return filename
+    
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    # Atomic on the same filesystem: readers never see a partial file
+    os.replace(received.temp_path, file_path)
+    return filename
+
+
+def discard_received_file(received: ReceivedFile):
+    """Remove a received file's temporary copy."""
+    if os.path.exists(received.temp_path):
+        os.remove(received.temp_path)
+
+
+async def save_upload_file(upload_file: UploadFile) -> str:
+    """
+    Save uploaded file into the content-addressed store and return its filename.
+    
+    This does not record a reference to the blob; resumes attached to
+    applications go through ResumeBlobService.store instead.
+    """
+    received = await receive_upload_file(upload_file)
+    try:
+        return commit_received_file(received)
+    finally:
+        discard_received_file(received)
 
 
 async def delete_file(filename: str) -> bool:
     """Delete file by filename."""
     try:
-        file_path = os.path.join(settings.upload_dir, filename)
+        file_path = get_file_path(filename)
         if os.path.exists(file_path):
             os.remove(file_path)
             return True
@@ -64,11 +168,26 @@ async def delete_file(filename: str) -> bool:
 
 
 def get_file_path(filename: str) -> str:
-    """Get full file path for a filename."""
-    return os.path.join(settings.upload_dir, filename)
+    """
+    Get full file path for a stored filename in either layout.
+    
+    Legacy uploads are stored flat in the upload directory under their own
+    name; newer ones under resumes/ab/cd/ (see blob_filename). Names in any
+    other directory (temp files, quarantine) or escaping the upload directory
+    are rejected with ValueError.
+    """
+    parts = filename.replace("\\", "/").split("/") if filename else []
+    if not parts or any(part in ("", ".", "..") for part in parts):
+        raise ValueError(f"Invalid stored filename: {filename!r}")
+    sharded = len(parts) == 4 and parts[0] == BLOB_DIR and len(parts[1]) == 2 and len(parts[2]) == 2
+    if len(parts) != 1 and not sharded:
+        raise ValueError(f"Invalid stored filename: {filename!r}")
+    return os.path.join(settings.upload_dir, *parts)
 
 
 def file_exists(filename: str) -> bool:
     """Check if file exists."""
-    file_path = os.path.join(settings.upload_dir, filename)
-    return os.path.exists(file_path) 
\ No newline at end of file
+    try:
+        return os.path.isfile(get_file_path(filename))
+    except ValueError:
+        return False
@@ -0,0 +1,55 @@
+import hashlib
+from datetime import datetime
+from typing import Iterable, Optional
+from fastapi import Response, status
+
+
+def make_etag(resource_id: str, updated_at: Optional[datetime], variant: Optional[Iterable[str]] = None) -> str:
+    """
+    Build a strong ETag for a document from its id and updated_at.
+
+    ``variant`` distinguishes different representations of the same document
+    (e.g. a sparse fieldset), so each one gets its own validator.
+    """
+    version = updated_at.isoformat() if updated_at else ""
+    key = f"{resource_id}:{version}"
+    if variant:
+        key += ":" + ",".join(variant)
+    return '"' + hashlib.sha1(key.encode("utf-8")).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header against an ETag (weak comparison, as RFC 7232 requires)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+def cache_headers(etag: str) -> dict:
+    """Headers for a private resource that clients must revalidate before reuse."""
+    return {
+        "ETag": etag,
+        "Cache-Control": "private, no-cache"
+    }
+
+
+def private_cache_headers(etag: str, max_age: int) -> dict:
+    """Headers for an authenticated resource a client may reuse for max_age seconds; proxies may not store it."""
+    return {
+        "ETag": etag,
+        "Cache-Control": f"private, max-age={max_age}, must-revalidate"
+    }
+
+
+def not_modified_response(etag: str, headers: Optional[dict] = None) -> Response:
+    """Empty 304 response carrying the current validator."""
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers or cache_headers(etag))
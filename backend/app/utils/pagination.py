@@ -0,0 +1,50 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Tuple
+from bson import ObjectId
+from fastapi import HTTPException, status
+
+
+def encode_keyset_cursor(value: Any, document_id: ObjectId) -> str:
+    """Encode the (sort value, _id) position of the last document on a page."""
+    if isinstance(value, datetime):
+        payload = {"d": value.isoformat(), "id": str(document_id)}
+    else:
+        payload = {"v": value, "id": str(document_id)}
+    raw = json.dumps(payload, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def decode_keyset_cursor(cursor: str) -> Tuple[Any, ObjectId]:
+    """Decode a cursor produced by encode_keyset_cursor."""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8"))
+        value = datetime.fromisoformat(payload["d"]) if "d" in payload else payload["v"]
+        return value, ObjectId(payload["id"])
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+def build_keyset_filter(field: str, direction: int, cursor: str) -> dict:
+    """
+    Build the filter for the page after ``cursor`` in a (field, _id) ordering.
+
+    ``direction`` is the sort direction of both keys (1 or -1), so the
+    matching compound index can be walked forwards or backwards. Documents
+    without the field sort before all others, as MongoDB orders null/missing
+    values first; they are paged by _id like any other value.
+    """
+    last_value, last_id = decode_keyset_cursor(cursor)
+    op = "$gt" if direction == 1 else "$lt"
+    same_value = {field: last_value, "_id": {op: last_id}}
+    if last_value is None:
+        # Ascending, every non-null value follows the nulls; descending, nothing does
+        return {"$or": [{field: {"$ne": None}}, same_value]} if direction == 1 else same_value
+    if direction == 1:
+        return {"$or": [{field: {op: last_value}}, same_value]}
+    # Descending, the nulls come after the smallest value
+    return {"$or": [{field: {op: last_value}}, same_value, {field: None}]}
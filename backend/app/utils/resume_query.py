@@ -0,0 +1,127 @@
+import re
+from typing import List
+from fastapi import HTTPException, status
+from .resume_text import tokenize, bigrams
+
+# Keeps a single query from expanding into a huge $and/$or
+MAX_QUERY_TERMS = 20
+
+_LEXEME = re.compile(r'"[^"]*"|\(|\)|[^\s()"]+')
+
+
+def _query_error(detail: str) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail=f"Invalid resume query: {detail}"
+    )
+
+
+class ResumeQuery:
+    """
+    A boolean resume search query compiled to a MongoDB filter on resume_text.
+
+    Syntax: terms, "quoted phrases", AND (also implied between adjacent
+    terms), OR, NOT or a leading ``-``, and parentheses, e.g.
+    ``python (django OR flask) -php "machine learning"``. Operators must be
+    uppercase; lowercase and/or/not are searched as words.
+
+    Everything matches the multikey ``terms`` array of resume_index
+    documents, which holds each resume's words and adjacent word pairs: a
+    phrase matches when all of its word pairs occur (exact for two words,
+    very close for longer phrases).
+    """
+
+    def __init__(self, query: str):
+        self._lexemes = _LEXEME.findall(query)
+        self._position = 0
+        # Index entries that must or may match; used for ranking
+        self.positive_terms: List[str] = []
+        self._term_count = 0
+
+        if not self._lexemes:
+            raise _query_error("empty query")
+        self.filter = self._parse_or(negated=False)
+        if self._position < len(self._lexemes):
+            raise _query_error(f"unexpected '{self._lexemes[self._position]}'")
+        if not self.positive_terms:
+            raise _query_error("at least one term must be required or optional, not only excluded")
+
+    def _peek(self):
+        return self._lexemes[self._position] if self._position < len(self._lexemes) else None
+
+    def _next(self):
+        lexeme = self._peek()
+        self._position += 1
+        return lexeme
+
+    def _parse_or(self, negated: bool) -> dict:
+        clauses = [self._parse_and(negated)]
+        while self._peek() == "OR":
+            self._next()
+            clauses.append(self._parse_and(negated))
+        return clauses[0] if len(clauses) == 1 else {"$or": clauses}
+
+    def _parse_and(self, negated: bool) -> dict:
+        clauses = [self._parse_not(negated)]
+        while self._peek() not in (None, "OR", ")"):
+            if self._peek() == "AND":
+                self._next()
+            clauses.append(self._parse_not(negated))
+
+        # Plain terms collapse into one $all, which the multikey index answers directly
+        terms = [clause["terms"] for clause in clauses if set(clause) == {"terms"} and isinstance(clause["terms"], str)]
+        others = [clause for clause in clauses if not (set(clause) == {"terms"} and isinstance(clause["terms"], str))]
+        if len(terms) > 1:
+            others.insert(0, {"terms": {"$all": terms}})
+        elif terms:
+            others.insert(0, {"terms": terms[0]})
+        return others[0] if len(others) == 1 else {"$and": others}
+
+    def _parse_not(self, negated: bool) -> dict:
+        lexeme = self._peek()
+        if lexeme == "NOT":
+            self._next()
+            return {"$nor": [self._parse_not(not negated)]}
+        if lexeme and lexeme.startswith("-"):
+            # "-php" excludes a word, a lone "-" before a phrase or group excludes that
+            if len(lexeme) > 1:
+                self._lexemes[self._position] = lexeme[1:]
+            else:
+                self._next()
+            return {"$nor": [self._parse_not(not negated)]}
+        return self._parse_primary(negated)
+
+    def _parse_primary(self, negated: bool) -> dict:
+        lexeme = self._next()
+        if lexeme is None:
+            raise _query_error("unexpected end of query")
+        if lexeme == "(":
+            clause = self._parse_or(negated)
+            if self._next() != ")":
+                raise _query_error("missing ')'")
+            return clause
+        if lexeme in (")", "AND", "OR"):
+            raise _query_error(f"unexpected '{lexeme}'")
+
+        words = tokenize(lexeme.strip('"'), split_dotted=False)
+        if not words:
+            raise _query_error(f"'{lexeme}' contains no searchable words")
+        self._term_count += len(words)
+        if self._term_count > MAX_QUERY_TERMS:
+            raise _query_error(f"more than {MAX_QUERY_TERMS} terms")
+
+        # A single word matches the index directly. Several (a quoted phrase,
+        # or e.g. ci/cd) match their adjacent word pairs, which are indexed too
+        if len(words) == 1:
+            if not negated:
+                self.positive_terms.append(words[0])
+            return {"terms": words[0]}
+
+        pairs = bigrams(words)
+        if not negated:
+            self.positive_terms.extend(pairs)
+        return {"terms": {"$all": pairs}} if len(pairs) > 1 else {"terms": pairs[0]}
+
+    def rank_terms(self) -> List[str]:
+        """Distinct index entries that count towards a result's score."""
+        return sorted(set(self.positive_terms))
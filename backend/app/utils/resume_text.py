@@ -0,0 +1,144 @@
+import os
+import re
+import zipfile
+from collections import Counter
+from typing import Iterable, List
+
+from .search import normalize_text
+
+# Runs of printable characters kept from legacy .doc files
+_DOC_TEXT_RUN = re.compile(rb"(?:[\x20-\x7e]\x00){4,}|[\x20-\x7e\r\n\t]{8,}")
+_DOCX_PAGES = re.compile(rb"<Pages>(\d+)</Pages>")
+
+
+def _pdf_text(path: str):
+    from pypdf import PdfReader
+
+    reader = PdfReader(path)
+    pages = [page.extract_text() or "" for page in reader.pages]
+    return "\n".join(pages), len(pages)
+
+
+def _docx_text(path: str):
+    import docx
+
+    document = docx.Document(path)
+    parts = [paragraph.text for paragraph in document.paragraphs]
+    for table in document.tables:
+        for row in table.rows:
+            parts.extend(cell.text for cell in row.cells)
+
+    # Word records the page count it last rendered in docProps/app.xml
+    page_count = None
+    with zipfile.ZipFile(path) as archive:
+        if "docProps/app.xml" in archive.namelist():
+            match = _DOCX_PAGES.search(archive.read("docProps/app.xml"))
+            if match:
+                page_count = int(match.group(1))
+    return "\n".join(parts), page_count
+
+
+def _doc_text(path: str):
+    # Legacy binary Word files: keep the UTF-16 and 8-bit text runs, which is
+    # where Word stores the document body
+    with open(path, "rb") as f:
+        data = f.read()
+    runs = []
+    for match in _DOC_TEXT_RUN.finditer(data):
+        run = match.group(0)
+        runs.append(run.decode("utf-16-le", "ignore") if b"\x00" in run else run.decode("latin-1"))
+    return "\n".join(runs), None
+
+
+# Index terms keep the punctuation of skills like c++, c#, node.js and asp.net
+_TERM = re.compile(r"[0-9a-z][0-9a-z+#]*(?:\.[0-9a-z+#]+)*")
+
+# Caps on a resume's index entries: the most frequent words and word pairs
+MAX_INDEX_TERMS = 3000
+MAX_INDEX_BIGRAMS = 2000
+
+
+def tokenize(text: str, split_dotted: bool = True) -> List[str]:
+    """Normalized index terms of a text, in order, with repeats."""
+    tokens = []
+    for token in _TERM.findall(normalize_text(text)):
+        tokens.append(token)
+        # Also index the parts of dotted terms, so "node" finds "node.js"
+        if split_dotted and "." in token:
+            tokens.extend(part for part in token.split(".") if part)
+    return tokens
+
+
+def bigrams(tokens: List[str]) -> List[str]:
+    """Adjacent word pairs ("machine learning"), which phrase queries match on."""
+    return [f"{first} {second}" for first, second in zip(tokens, tokens[1:])]
+
+
+def index_terms(text: str) -> List[str]:
+    """
+    Distinct index entries of a text: words and adjacent word pairs, most
+    frequent first, capped at MAX_INDEX_TERMS and MAX_INDEX_BIGRAMS.
+    """
+    tokens = tokenize(text, split_dotted=False)
+    words = Counter(tokenize(text))
+    pairs = Counter(bigrams(tokens))
+    return (
+        [term for term, _ in words.most_common(MAX_INDEX_TERMS)]
+        + [pair for pair, _ in pairs.most_common(MAX_INDEX_BIGRAMS)]
+    )
+
+
+EXTRACTORS = {
+    '.pdf': _pdf_text,
+    '.docx': _docx_text,
+    '.doc': _doc_text,
+}
+
+
+def detect_skills(text: str, vocabulary: Iterable[str]) -> List[str]:
+    """Skills from ``vocabulary`` that occur in ``text`` as whole words or phrases."""
+    normalized = normalize_text(text)
+    found = []
+    for skill in vocabulary:
+        term = normalize_text(skill)
+        if term and re.search(r"(?<![0-9a-z])" + re.escape(term) + r"(?![0-9a-z])", normalized):
+            found.append(skill)
+    return sorted(set(found))
+
+
+def extract_resume_text(path: str, vocabulary: List[str], max_chars: int) -> dict:
+    """
+    Extract plain text, page count and known skills from a resume file.
+
+    CPU-bound and synchronous: meant to run in a worker process.
+
+    Returns:
+        {"text", "page_count", "skills", "truncated", "index"}; page_count is
+        None when the format does not record it, index holds the fields of
+        the resume's resume_index document
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in EXTRACTORS:
+        raise ValueError(f"Unsupported resume type '{extension}'")
+
+    text, page_count = EXTRACTORS[extension](path)
+    # Collapse the layout whitespace PDFs and Word tables leave behind
+    lines = (" ".join(line.split()) for line in text.splitlines())
+    text = "\n".join(line for line in lines if line)
+    skills = detect_skills(text, vocabulary)
+    return {
+        "text": text[:max_chars],
+        "truncated": len(text) > max_chars,
+        "page_count": page_count,
+        "skills": skills,
+        "index": build_index_fields(text, skills)
+    }
+
+
+def build_index_fields(text: str, skills: List[str]) -> dict:
+    """A resume's resume_index entry (see app/utils/resume_query.py)."""
+    return {
+        "terms": index_terms(text),
+        "skill_terms": sorted({normalize_text(skill) for skill in skills})
+    }
+
@@ -0,0 +1,77 @@
+from datetime import datetime
+from typing import Optional
+from ..models.application import STAGE_FORM_NAMES
+
+# Relative weight of each stage's rating in the overall score
+STAGE_WEIGHTS = {1: 1.0, 2: 1.0, 3: 2.0, 4: 1.0, 5: 1.5, 6: 1.5, 7: 1.0}
+
+# Form fields carrying a stage's verdict, with their passing value
+_FORM_VERDICTS = (("outcome", "Yes"), ("test_result", "Pass"))
+
+
+def _stage_rating(form: Optional[dict], feedback: Optional[dict]) -> Optional[float]:
+    """Mean of the stage form's scale and the team member's performance_rating (both 1-10)."""
+    ratings = []
+    if form and form.get("scale") is not None:
+        ratings.append(form["scale"])
+    if feedback and feedback.get("performance_rating") is not None:
+        ratings.append(feedback["performance_rating"])
+    if not ratings:
+        return None
+    return sum(ratings) / len(ratings)
+
+
+def _stage_passed(form: Optional[dict], feedback: Optional[dict]) -> Optional[bool]:
+    """False if any verdict on the stage is negative, True if there is one and all are positive."""
+    verdicts = []
+    for field, passing in _FORM_VERDICTS:
+        if form and form.get(field) is not None:
+            verdicts.append(form[field] == passing)
+    if feedback and feedback.get("approval_status") is not None:
+        verdicts.append(feedback["approval_status"] == "Approved")
+    if not verdicts:
+        return None
+    return all(verdicts)
+
+
+def build_scorecard(stages: Optional[dict]) -> dict:
+    """
+    Summarize an application's stage feedback: the weighted average of the
+    stage ratings (1-10, None before any rating), the stages with feedback,
+    and which of them passed or failed. The final recommendation's
+    cumulative_scale is not part of the score.
+    """
+    stages = stages or {}
+    weighted_total = 0.0
+    total_weight = 0.0
+    stage_scores = {}
+    completed, passed, failed = [], [], []
+
+    for stage_num, form_name in STAGE_FORM_NAMES.items():
+        form = stages.get(f"stage{stage_num}_{form_name}")
+        feedback = stages.get(f"stage{stage_num}_feedback")
+        if not form and not feedback:
+            continue
+        completed.append(stage_num)
+
+        rating = _stage_rating(form, feedback)
+        if rating is not None:
+            stage_scores[str(stage_num)] = round(rating, 2)
+            weighted_total += STAGE_WEIGHTS[stage_num] * rating
+            total_weight += STAGE_WEIGHTS[stage_num]
+
+        verdict = _stage_passed(form, feedback)
+        if verdict is True:
+            passed.append(stage_num)
+        elif verdict is False:
+            failed.append(stage_num)
+
+    return {
+        "score": round(weighted_total / total_weight, 2) if total_weight else None,
+        "stage_scores": stage_scores,
+        "stages_completed": len(completed),
+        "passed_stages": passed,
+        "failed_stages": failed,
+        "has_failed_stage": bool(failed),
+        "updated_at": datetime.utcnow()
+    }
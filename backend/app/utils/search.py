@@ -0,0 +1,139 @@
+import math
+import re
+import unicodedata
+from typing import List, Optional, Tuple
+
+# Share of the query's trigrams a document must contain to count as a fuzzy match
+FUZZY_MIN_SIMILARITY = 0.4
+
+
+def normalize_text(value: Optional[str]) -> str:
+    """Lowercase, strip accents and collapse whitespace."""
+    if not value:
+        return ""
+    decomposed = unicodedata.normalize("NFKD", value)
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return " ".join(stripped.lower().split())
+
+
+def normalize_mobile(value: Optional[str]) -> str:
+    """Keep only the digits of a phone number."""
+    return re.sub(r"\D", "", value or "")
+
+
+def _tokens(value: str) -> List[str]:
+    return [token for token in re.split(r"[^0-9a-z]+", value) if token]
+
+
+def trigrams(value: str) -> List[str]:
+    """Padded trigrams of each token of an already normalized string."""
+    grams = set()
+    for token in _tokens(value):
+        padded = f"  {token} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return sorted(grams)
+
+
+def required_trigrams(query_grams: List[str], min_overlap: int) -> List[str]:
+    """
+    Trigrams of which a document sharing at least ``min_overlap`` of
+    ``query_grams`` must contain one: any len - min_overlap + 1 of them.
+
+    Word-interior trigrams are preferred over the padded ones at word starts
+    and ends (e.g. "  s"), which occur in a large share of all documents.
+    """
+    by_rarity = sorted(query_grams, key=lambda gram: (gram.count(" "), gram))
+    return by_rarity[:len(query_grams) - min_overlap + 1]
+
+
+def build_search_fields(*values: Optional[str], mobile: Optional[str] = None) -> dict:
+    """
+    Normalized search fields to store on a document.
+
+    ``search_tokens`` holds each full value and each word of it, so an anchored
+    regex on the multikey index matches prefixes of any word (``smi`` finds
+    "John Smith", ``john.s`` finds "john.smith@example.com").
+    """
+    normalized = [normalize_text(value) for value in values if value]
+    tokens = set(normalized)
+    for value in normalized:
+        tokens.update(_tokens(value))
+    return {
+        "search_tokens": sorted(tokens),
+        "search_trigrams": trigrams(" ".join(normalized)),
+        "search_mobile": normalize_mobile(mobile)
+    }
+
+
+def build_user_search_fields(username: Optional[str], email: Optional[str], mobile: Optional[str]) -> dict:
+    """Search fields for a user, plus the normalized username/email the candidate typeahead sorts by."""
+    fields = build_search_fields(username, email, mobile=mobile)
+    fields["username_lower"] = normalize_text(username)
+    fields["email_lower"] = normalize_text(email)
+    return fields
+
+
+def prefix_query(term: str) -> dict:
+    """Index-friendly prefix match (anchored, case-sensitive on normalized fields)."""
+    return {"$regex": "^" + re.escape(term)}
+
+
+async def prefix_fuzzy_search(
+    collection,
+    query: str,
+    scope: dict,
+    projection: dict,
+    limit: int,
+    fuzzy: bool = True
+) -> List[Tuple[dict, str, float]]:
+    """
+    Search a collection carrying build_search_fields() fields.
+
+    Prefix matches on words, full values and mobile digits come first; when
+    they don't fill ``limit``, documents sharing enough trigrams with the query
+    are added, best overlap first.
+
+    Returns:
+        (document, "prefix" | "fuzzy", score) tuples
+    """
+    term = normalize_text(query)
+    digits = normalize_mobile(query)
+    if not term:
+        return []
+
+    clauses = [{"search_tokens": prefix_query(term)}]
+    # Only treat the query as a phone number if it is mostly digits
+    if len(digits) >= 3 and len(digits) >= len(term.replace(" ", "")) - 1:
+        clauses.append({"search_mobile": prefix_query(digits)})
+
+    # scope may carry its own $or (e.g. assignment visibility), so combine with $and
+    def scoped(condition: dict) -> dict:
+        return {"$and": [scope, condition]} if scope else condition
+
+    results = []
+    found_ids = []
+    async for document in collection.find(scoped({"$or": clauses}), projection).limit(limit):
+        results.append((document, "prefix", 1.0))
+        found_ids.append(document["_id"])
+
+    query_grams = trigrams(term)
+    if not fuzzy or len(results) >= limit or len(term) < 3 or not query_grams:
+        return results
+
+    min_overlap = max(2, math.ceil(len(query_grams) * FUZZY_MIN_SIMILARITY))
+    # Only documents holding one of the required trigrams can reach min_overlap, so
+    # every candidate is scored and ranked, and the best matches can't be cut off
+    candidates = {"_id": {"$nin": found_ids}, "search_trigrams": {"$in": required_trigrams(query_grams, min_overlap)}}
+    pipeline = [
+        {"$match": scoped(candidates)},
+        {"$addFields": {"_overlap": {"$size": {"$setIntersection": ["$search_trigrams", query_grams]}}}},
+        {"$match": {"_overlap": {"$gte": min_overlap}}},
+        {"$sort": {"_overlap": -1, "_id": 1}},
+        {"$limit": limit - len(results)},
+        {"$project": {**projection, "_overlap": 1}}
+    ]
+    async for document in collection.aggregate(pipeline):
+        score = round(document.pop("_overlap") / len(query_grams), 3)
+        results.append((document, "fuzzy", score))
+
+    return results
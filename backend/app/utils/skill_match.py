@@ -0,0 +1,64 @@
+from typing import Iterable, List, NamedTuple
+import numpy as np
+from .resume_text import detect_skills
+from .search import normalize_text
+
+# Skills only mentioned in a job's requirements count half as much as skills_required
+REQUIREMENT_SKILL_WEIGHT = 0.5
+
+
+class JobSkillVector(NamedTuple):
+    """A job's skills as weighted vector columns."""
+    terms: List[str]  # Normalized skill terms, in column order
+    labels: List[str]  # The skills as the job spells them
+    weights: np.ndarray  # float32, one weight per column
+
+
+def build_job_vector(skills_required: Iterable[str], requirements: Iterable[str], vocabulary: Iterable[str]) -> JobSkillVector:
+    """
+    Encode a job's skills_required (weight 1) and the known skills found in its
+    requirements text (weight REQUIREMENT_SKILL_WEIGHT).
+    """
+    weights = {}
+    labels = {}
+    for skill in skills_required or []:
+        term = normalize_text(skill)
+        if term:
+            weights[term] = 1.0
+            labels[term] = skill
+    for skill in detect_skills(" ".join(requirements or []), vocabulary):
+        term = normalize_text(skill)
+        if term and term not in weights:
+            weights[term] = REQUIREMENT_SKILL_WEIGHT
+            labels[term] = skill
+
+    terms = sorted(weights)
+    return JobSkillVector(
+        terms=terms,
+        labels=[labels[term] for term in terms],
+        weights=np.array([weights[term] for term in terms], dtype=np.float32)
+    )
+
+
+def applicant_matrix(present_terms: List[Iterable[str]], vector: JobSkillVector) -> np.ndarray:
+    """Bit matrix with one row per applicant: 1 where the applicant has the job's skill."""
+    column = {term: index for index, term in enumerate(vector.terms)}
+    rows, columns = [], []
+    for row, terms in enumerate(present_terms):
+        for term in terms:
+            index = column.get(term)
+            if index is not None:
+                rows.append(row)
+                columns.append(index)
+    # One scatter for the whole batch instead of a write per row
+    matrix = np.zeros((len(present_terms), len(vector.terms)), dtype=np.bool_)
+    matrix[rows, columns] = True
+    return matrix
+
+
+def match_scores(matrix: np.ndarray, vector: JobSkillVector) -> np.ndarray:
+    """Share of the job's skill weight each applicant covers, between 0 and 1."""
+    total = float(vector.weights.sum())
+    if not total:
+        return np.zeros(matrix.shape[0], dtype=np.float32)
+    return matrix.astype(np.float32) @ vector.weights / total
@@ -0,0 +1,96 @@
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Any, AsyncIterator, List, Optional
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(jsonable_encoder(value), ensure_ascii=False, separators=(",", ":"))
+
+
+async def json_array_chunks(
+    items: AsyncIterator[Any],
+    envelope: Optional[dict] = None,
+    key: Optional[str] = None
+) -> AsyncIterator[bytes]:
+    """
+    Encode an async iterator as a JSON array, one item at a time.
+
+    With ``envelope`` and ``key``, the array is emitted as ``envelope[key]`` of
+    a JSON object, e.g. ``{"application_id": "...", "assignments": [...]}``.
+    """
+    if envelope is not None:
+        head = _dumps(envelope)[:-1]
+        separator = "," if envelope else ""
+        yield f'{head}{separator}{json.dumps(key)}:['.encode("utf-8")
+    else:
+        yield b"["
+
+    first = True
+    async for item in items:
+        yield (_dumps(item) if first else "," + _dumps(item)).encode("utf-8")
+        first = False
+
+    yield b"]}" if envelope is not None else b"]"
+
+
+class JSONArrayResponse(StreamingResponse):
+    """
+    Stream a JSON array as its items are produced (same body a list response would have).
+
+    Access checks and anything else that may fail with an HTTP error must run
+    before the response is created: once streaming has started the status
+    code is already sent.
+    """
+
+    def __init__(self, items: AsyncIterator[Any], envelope: Optional[dict] = None, key: Optional[str] = None, **kwargs):
+        kwargs.setdefault("media_type", "application/json")
+        super().__init__(json_array_chunks(items, envelope, key), **kwargs)
+
+
+async def ndjson_lines(items: AsyncIterator[Any]) -> AsyncIterator[bytes]:
+    """Encode each item of an async iterator as one line of newline-delimited JSON."""
+    async for item in items:
+        yield (_dumps(item) + "\n").encode("utf-8")
+
+
+# Leading characters that make spreadsheet apps evaluate a cell as a formula
+_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def _csv_value(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, str) and value.startswith(_FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def csv_row(values: List[Any]) -> bytes:
+    """Encode one CSV line, escaped the same way as csv_lines."""
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow([_csv_value(value) for value in values])
+    return buffer.getvalue().encode("utf-8")
+
+
+async def csv_lines(rows: AsyncIterator[dict], columns: List[str]) -> AsyncIterator[bytes]:
+    """Encode dict rows from an async iterator as CSV, one header line then one line per row."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def flush() -> bytes:
+        data = buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate(0)
+        return data
+
+    writer.writerow(columns)
+    yield flush()
+    async for row in rows:
+        writer.writerow([_csv_value(row.get(column)) for column in columns])
+        yield flush()
@@ -0,0 +1,160 @@
+import asyncio
+import struct
+import tempfile
+import zlib
+from datetime import datetime
+from typing import AsyncIterator, BinaryIO, NamedTuple
+
+# Bytes read from disk per chunk, and chunks read ahead of what the client has received
+READ_CHUNK_SIZE = 256 * 1024
+READ_AHEAD_CHUNKS = 4
+
+# The central directory is kept in memory up to this size, then spilled to disk
+CENTRAL_DIRECTORY_SPOOL_SIZE = 1024 * 1024
+
+_LOCAL_HEADER = struct.Struct("<IHHHHHIIIHH")
+_DATA_DESCRIPTOR = struct.Struct("<IIII")
+_CENTRAL_HEADER = struct.Struct("<IHHHHHHIIIHHHHHII")
+_ZIP64_OFFSET_EXTRA = struct.Struct("<HHQ")
+_ZIP64_END = struct.Struct("<IQHHIIQQQQ")
+_ZIP64_LOCATOR = struct.Struct("<IIQI")
+_END = struct.Struct("<IHHHHIIH")
+
+_STORED, _DEFLATED = 0, 8
+_FLAGS = 0x0808  # Sizes and CRC follow the data (bit 3); UTF-8 names (bit 11)
+_VERSION, _VERSION_ZIP64 = 20, 45
+_MADE_BY_UNIX = 3 << 8
+_FILE_ATTRIBUTES = 0o100644 << 16
+_MAX_32 = 0xFFFFFFFF
+_MAX_16 = 0xFFFF
+
+
+class ZipMember(NamedTuple):
+    """One archive entry and the chunks of its content."""
+    name: str
+    modified_at: datetime
+    chunks: AsyncIterator[bytes]
+    compress: bool = False  # Deflate; leave off for already compressed files (PDF, DOCX)
+
+
+def _dos_datetime(value: datetime):
+    value = max(value, datetime(1980, 1, 1))
+    return (
+        (value.hour << 11) | (value.minute << 5) | (value.second // 2),
+        ((value.year - 1980) << 9) | (value.month << 5) | value.day
+    )
+
+
+async def read_ahead(file: BinaryIO, chunk_size: int = READ_CHUNK_SIZE, depth: int = READ_AHEAD_CHUNKS) -> AsyncIterator[bytes]:
+    """
+    Read an open file in chunks on a worker thread, at most ``depth`` chunks
+    ahead of the consumer, so disk reads overlap with sending without the
+    buffer growing when the client is slow.
+    """
+    queue: asyncio.Queue = asyncio.Queue(maxsize=depth)
+
+    async def produce():
+        try:
+            while True:
+                chunk = await asyncio.to_thread(file.read, chunk_size)
+                await queue.put(chunk)
+                if not chunk:
+                    return
+        except Exception as e:
+            await queue.put(e)
+
+    producer = asyncio.create_task(produce())
+    try:
+        while True:
+            chunk = await queue.get()
+            if isinstance(chunk, Exception):
+                raise chunk
+            if not chunk:
+                return
+            yield chunk
+    finally:
+        producer.cancel()
+        await asyncio.gather(producer, return_exceptions=True)
+
+
+async def zip_chunks(members: AsyncIterator[ZipMember]) -> AsyncIterator[bytes]:
+    """
+    Encode members as a ZIP archive while their content is produced.
+
+    Each entry's CRC and sizes follow its data in a data descriptor, so
+    nothing is buffered or read twice; only the central directory grows with
+    the number of entries, and it spills to a temporary file past
+    CENTRAL_DIRECTORY_SPOOL_SIZE. Archives past 4 GB or 65535 entries get
+    ZIP64 records. Entries themselves must stay under 4 GB.
+    """
+    offset = 0
+    count = 0
+    with tempfile.SpooledTemporaryFile(max_size=CENTRAL_DIRECTORY_SPOOL_SIZE) as central:
+        async for member in members:
+            name = member.name.encode("utf-8")
+            method = _DEFLATED if member.compress else _STORED
+            dos_time, dos_date = _dos_datetime(member.modified_at)
+            header_offset = offset
+
+            header = _LOCAL_HEADER.pack(
+                0x04034B50, _VERSION, _FLAGS, method, dos_time, dos_date, 0, 0, 0, len(name), 0
+            ) + name
+            yield header
+            offset += len(header)
+
+            crc = 0
+            size = 0
+            compressed_size = 0
+            compressor = zlib.compressobj(6, zlib.DEFLATED, -15) if member.compress else None
+            async for chunk in member.chunks:
+                crc = zlib.crc32(chunk, crc)
+                size += len(chunk)
+                if compressor:
+                    chunk = compressor.compress(chunk)
+                    if not chunk:
+                        continue
+                compressed_size += len(chunk)
+                yield chunk
+            if compressor:
+                tail = compressor.flush()
+                compressed_size += len(tail)
+                yield tail
+            if size > _MAX_32 or compressed_size > _MAX_32:
+                raise ValueError(f"ZIP entry {member.name!r} is too large")
+
+            descriptor = _DATA_DESCRIPTOR.pack(0x08074B50, crc, compressed_size, size)
+            yield descriptor
+            offset += compressed_size + len(descriptor)
+
+            extra = b""
+            if header_offset >= _MAX_32:
+                extra = _ZIP64_OFFSET_EXTRA.pack(0x0001, 8, header_offset)
+            central.write(_CENTRAL_HEADER.pack(
+                0x02014B50, _MADE_BY_UNIX | _VERSION_ZIP64, _VERSION_ZIP64 if extra else _VERSION,
+                _FLAGS, method, dos_time, dos_date, crc, compressed_size, size,
+                len(name), len(extra), 0, 0, 0, _FILE_ATTRIBUTES, min(header_offset, _MAX_32)
+            ) + name + extra)
+            count += 1
+
+        central_offset = offset
+        central_size = central.tell()
+        central.seek(0)
+        while True:
+            chunk = central.read(READ_CHUNK_SIZE)
+            if not chunk:
+                break
+            yield chunk
+
+    end = b""
+    if count >= _MAX_16 or central_offset >= _MAX_32 or central_size >= _MAX_32:
+        zip64_end_offset = central_offset + central_size
+        end += _ZIP64_END.pack(
+            0x06064B50, _ZIP64_END.size - 12, _MADE_BY_UNIX | _VERSION_ZIP64, _VERSION_ZIP64,
+            0, 0, count, count, central_size, central_offset
+        )
+        end += _ZIP64_LOCATOR.pack(0x07064B50, 0, zip64_end_offset, 1)
+    end += _END.pack(
+        0x06054B50, 0, 0, min(count, _MAX_16), min(count, _MAX_16),
+        min(central_size, _MAX_32), min(central_offset, _MAX_32), 0
+    )
+    yield end
@@ -0,0 +1,55 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from app.auth import dependencies
+from app.auth.jwt import create_access_token, create_download_token, verify_download_token, verify_token
+
+PATH = "/api/applications/abc/resume"
+
+
+class _Users:
+    def __init__(self, **user):
+        self.user = {"_id": "u1", "email": "hr@example.com", "username": "hruser", "mobile": "5550100100", "role": "hr",
+                     "is_active": True, "created_at": datetime.utcnow(), "updated_at": datetime.utcnow(), **user}
+
+    async def find_one(self, query):
+        return dict(self.user) if query["email"] == self.user["email"] else None
+
+
+class _DB:
+    def __init__(self, **user):
+        self.users = _Users(**user)
+
+
+def _request(path=PATH):
+    return Request({"type": "http", "method": "GET", "path": path, "headers": [], "query_string": b""})
+
+
+def test_download_token_only_authenticates_its_path():
+    token = create_download_token("hr@example.com", PATH)
+    assert verify_download_token(token, PATH).email == "hr@example.com"
+    assert verify_download_token(token, "/api/applications/other/resume") is None
+    assert verify_token(token) is None
+
+
+def test_access_token_is_not_a_download_token():
+    token = create_access_token({"sub": "hr@example.com", "role": "hr"})
+    assert verify_download_token(token, PATH) is None
+
+
+def test_download_user_from_query_token():
+    token = create_download_token("hr@example.com", PATH)
+    user = asyncio.run(dependencies.get_download_user(_request(), token, None, _DB()))
+    assert user.id == "u1"
+
+    with pytest.raises(HTTPException) as raised:
+        asyncio.run(dependencies.get_download_user(_request("/api/jobs/abc/resumes.zip"), token, None, _DB()))
+    assert raised.value.status_code == 401
+
+    with pytest.raises(HTTPException) as raised:
+        asyncio.run(dependencies.get_download_user(_request(), token, None, _DB(is_active=False)))
+    assert raised.value.status_code == 400
@@ -0,0 +1,28 @@
+import pytest
+from fastapi import HTTPException
+
+from app.utils.file_download import parse_range
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("bytes=0-99", (0, 99)),
+    ("bytes=100-", (100, 999)),
+    ("bytes=-100", (900, 999)),
+    ("bytes=-5000", (0, 999)),
+    ("bytes=990-5000", (990, 999)),
+])
+def test_single_ranges(header, expected):
+    assert parse_range(header, 1000) == expected
+
+
+@pytest.mark.parametrize("header", [None, "", "items=0-10", "bytes=0-1,5-9", "bytes=a-b"])
+def test_whole_file_when_the_range_is_not_served(header):
+    assert parse_range(header, 1000) is None
+
+
+@pytest.mark.parametrize("header", ["bytes=1000-", "bytes=50-10", "bytes=-0"])
+def test_unsatisfiable_ranges_are_416(header):
+    with pytest.raises(HTTPException) as raised:
+        parse_range(header, 1000)
+    assert raised.value.status_code == 416
+    assert raised.value.headers["Content-Range"] == "bytes */1000"
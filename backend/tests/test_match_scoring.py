@@ -0,0 +1,66 @@
+import asyncio
+
+from bson import ObjectId
+
+from app.services import match_scoring_service
+from app.services.match_scoring_service import JobRescoreQueue, MatchScoringService
+from app.utils.skill_match import applicant_matrix, build_job_vector, match_scores
+
+
+class _RecordingApplications:
+    def __init__(self):
+        self.operations = []
+
+    async def bulk_write(self, operations, ordered=True):
+        self.operations.extend(operations)
+
+        class Result:
+            modified_count = len(operations)
+        return Result()
+
+
+def test_scores_weight_required_skills_over_requirement_mentions():
+    vector = build_job_vector(["Python", "Docker"], ["Experience with Kubernetes"], ["Kubernetes"])
+    assert vector.terms == ["docker", "kubernetes", "python"]
+    matrix = applicant_matrix([["python", "docker"], ["kubernetes"], []], vector)
+    scores = match_scores(matrix, vector)
+    assert [round(float(score), 2) for score in scores] == [0.8, 0.2, 0.0]
+
+
+def test_unchanged_score_still_rewrites_changed_matched_skills():
+    service = MatchScoringService.__new__(MatchScoringService)
+    service.db = type("DB", (), {"applications": _RecordingApplications()})()
+    vector = build_job_vector(["PostgreSQL"], [], [])
+    application_id = str(ObjectId())
+
+    asyncio.run(service._store_batch(vector, [{"_id": application_id, "present": ["postgresql"]}]))
+
+    (operation,) = service.db.applications.operations
+    condition = operation._filter["$or"]
+    assert {"match_score": {"$ne": 1.0}} in condition
+    assert {"matched_skills": {"$ne": ["PostgreSQL"]}} in condition
+    assert operation._doc["$set"]["matched_skills"] == ["PostgreSQL"]
+
+
+def test_rescores_requested_during_a_pass_coalesce_into_one_more(monkeypatch):
+    calls = []
+
+    async def score_job(self, job_id):
+        calls.append(job_id)
+        await asyncio.sleep(0.01)
+        return 0
+
+    monkeypatch.setattr(MatchScoringService, "__init__", lambda self: None)
+    monkeypatch.setattr(MatchScoringService, "score_job", score_job)
+
+    async def run():
+        queue = JobRescoreQueue()
+        queue.schedule("job")
+        await asyncio.sleep(0.005)  # First pass running
+        queue.schedule("job")
+        queue.schedule("job")
+        while queue._tasks:
+            await asyncio.sleep(0.005)
+
+    asyncio.run(run())
+    assert calls == ["job", "job"]
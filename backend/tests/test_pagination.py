@@ -0,0 +1,73 @@
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException
+
+from app.utils.pagination import build_keyset_filter, decode_keyset_cursor, encode_keyset_cursor
+
+
+def _matches(document: dict, condition: dict) -> bool:
+    """Evaluate the subset of MongoDB query operators build_keyset_filter emits."""
+    for key, expected in condition.items():
+        if key == "$or":
+            if not any(_matches(document, option) for option in expected):
+                return False
+            continue
+        value = document.get(key)
+        if isinstance(expected, dict):
+            for op, operand in expected.items():
+                if op == "$ne" and value == operand:
+                    return False
+                if op == "$gt" and (value is None or not value > operand):
+                    return False
+                if op == "$lt" and (value is None or not value < operand):
+                    return False
+        elif value != expected:
+            return False
+    return True
+
+
+def _sort_key(document: dict, direction: int):
+    # MongoDB orders null/missing before any string
+    value = document.get("name")
+    return ((value is not None, value or ""), document["_id"])
+
+
+def _pages(documents: list, direction: int, page_size: int) -> list:
+    ordered = sorted(documents, key=lambda d: _sort_key(d, direction), reverse=direction == -1)
+    seen = []
+    cursor = None
+    while True:
+        remaining = [d for d in ordered if cursor is None or _matches(d, build_keyset_filter("name", direction, cursor))]
+        page = remaining[:page_size]
+        seen.extend(page)
+        if len(remaining) <= page_size:
+            return seen
+        cursor = encode_keyset_cursor(page[-1].get("name"), page[-1]["_id"])
+
+
+@pytest.mark.parametrize("direction", [1, -1])
+def test_keyset_pages_reach_every_document_including_missing_keys(direction):
+    documents = [{"_id": ObjectId()} for _ in range(3)]
+    documents += [{"_id": ObjectId(), "name": name} for name in ["bob", "alice", "bob", "carol", "dave"]]
+    documents.append({"_id": ObjectId(), "name": None})
+
+    seen = _pages(documents, direction, page_size=2)
+
+    assert len(seen) == len(documents)
+    assert {d["_id"] for d in seen} == {d["_id"] for d in documents}
+
+
+def test_cursor_round_trips_datetimes_and_plain_values():
+    document_id = ObjectId()
+    moment = datetime(2024, 5, 1, 12, 30)
+    assert decode_keyset_cursor(encode_keyset_cursor(moment, document_id)) == (moment, document_id)
+    assert decode_keyset_cursor(encode_keyset_cursor("smith", document_id)) == ("smith", document_id)
+    assert decode_keyset_cursor(encode_keyset_cursor(None, document_id)) == (None, document_id)
+
+
+def test_malformed_cursor_is_a_client_error():
+    with pytest.raises(HTTPException) as error:
+        decode_keyset_cursor("not-a-cursor")
+    assert error.value.status_code == 400
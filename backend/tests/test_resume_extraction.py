@@ -0,0 +1,71 @@
+import asyncio
+import os
+import time
+
+from app.services.resume_extraction import ResumeExtractionQueue
+
+
+def _hang():
+    time.sleep(60)
+
+
+def _alive(pid):
+    # A terminated worker stays a zombie until the pool reaps it
+    try:
+        with open(f"/proc/{pid}/stat") as stat:
+            return stat.read().split(")")[-1].split()[0] != "Z"
+    except FileNotFoundError:
+        return False
+
+
+def test_replacing_the_pool_kills_a_hung_worker():
+    queue = ResumeExtractionQueue(processes=1, max_attempts=3, retry_base_seconds=1, timeout_seconds=1)
+    queue._executor, queue._executor_pids = queue._new_executor()
+    hung = queue._executor
+    pid = hung.submit(os.getpid).result(timeout=10)
+    hung.submit(_hang)
+
+    queue._replace_executor(hung)
+    try:
+        assert queue._executor is not hung
+        assert queue.pool_restarts == 1
+        deadline = time.monotonic() + 5
+        while _alive(pid) and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert not _alive(pid)
+
+        # A second task that timed out on the same pool doesn't replace the new one
+        replacement = queue._executor
+        queue._replace_executor(hung)
+        assert queue._executor is replacement
+        assert queue.pool_restarts == 1
+    finally:
+        queue._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def test_recovery_sweeps_until_stopped_without_queueing_twice():
+    queue = ResumeExtractionQueue(processes=1, max_attempts=3, retry_base_seconds=1, timeout_seconds=0.05)
+    sweeps = []
+
+    async def recover():
+        sweeps.append(time.monotonic())
+        queue._put("stale")
+        return 1
+
+    async def process(application_id):
+        await asyncio.sleep(3600)
+
+    queue.recover = recover
+    queue._process = process
+
+    async def run():
+        queue.start()
+        await asyncio.sleep(0.3)
+        # The first copy is being processed; later sweeps queue it once more, not once per sweep
+        depth = queue._queue.qsize()
+        await queue.stop()
+        return depth
+
+    assert asyncio.run(run()) == 1
+    assert len(sweeps) >= 3
+    assert queue._sweeper is None and not queue.running
@@ -0,0 +1,238 @@
+import asyncio
+import os
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from pymongo.errors import DuplicateKeyError
+
+from app.config import settings
+from app.services import resume_gc
+from app.services.resume_gc import QUARANTINE_DIR, ResumeGarbageCollector, ScannedFile, _shards_from
+
+SHA = "ab" * 32
+BLOB = os.path.join("resumes", "ab", "ab", f"{SHA}.pdf")
+
+
+class _Cursor:
+    def __init__(self, documents):
+        self._documents = iter(documents)
+
+    def limit(self, count):
+        return self
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._documents)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class _Applications:
+    """applications reduced to the resume each one uses."""
+
+    def __init__(self, filenames=(), sha_counts=None):
+        self.filenames = list(filenames)
+        self.sha_counts = sha_counts or {}
+
+    async def distinct(self, field, query):
+        return [name for name in self.filenames if name in query["resume_filename"]["$in"]]
+
+    async def find_one(self, query, projection=None):
+        return {"_id": 1} if query["resume_filename"] in self.filenames else None
+
+    async def count_documents(self, query):
+        return self.sha_counts.get(query["resume_sha256"], 0)
+
+
+class _Blobs:
+    def __init__(self, *blobs):
+        self.documents = {blob["_id"]: dict(blob) for blob in blobs}
+
+    def find(self, query):
+        return _Cursor([dict(blob) for sha, blob in self.documents.items() if sha in query["_id"]["$in"]])
+
+    async def distinct(self, field, query):
+        wanted = set(query[field]["$in"])
+        return [name for blob in self.documents.values() if wanted & set(blob.get(field, []))
+                for name in blob[field]]
+
+    async def find_one_and_update(self, query, update):
+        blob = self.documents.get(query["_id"])
+        if not blob or blob.get("updated_at") != query["updated_at"]:
+            return None
+        before = dict(blob)
+        blob.update(update["$set"])
+        return before
+
+    async def insert_one(self, document):
+        if document["_id"] in self.documents:
+            raise DuplicateKeyError("duplicate")
+        self.documents[document["_id"]] = dict(document)
+
+    async def update_one(self, query, update, upsert=False):
+        blob = self.documents.get(query["_id"])
+        if blob is None:
+            if upsert:
+                self.documents[query["_id"]] = {"_id": query["_id"], **update.get("$setOnInsert", {})}
+            return
+        blob.update(update.get("$set", {}))
+        for field in update.get("$unset", {}):
+            blob.pop(field, None)
+
+    async def delete_one(self, query):
+        blob = self.documents.get(query["_id"])
+        if blob and blob.get("ref_count") == query["ref_count"]:
+            del self.documents[query["_id"]]
+
+
+class _Quarantine:
+    def __init__(self):
+        self.documents = {}
+
+    async def replace_one(self, query, document, upsert=False):
+        self.documents[query["_id"]] = {"_id": query["_id"], **document}
+
+    async def delete_one(self, query):
+        self.documents.pop(query["_id"], None)
+
+
+class _LeasedState:
+    async def find_one_and_update(self, query, update, upsert=False):
+        # The upsert of a second worker collides with the held lease
+        raise DuplicateKeyError("lease held")
+
+
+class _DB:
+    def __init__(self, applications=None, blobs=None):
+        self.applications = applications or _Applications()
+        self.resume_blobs = blobs or _Blobs()
+        self.resume_quarantine = _Quarantine()
+        self.resume_gc_state = _LeasedState()
+
+
+@pytest.fixture
+def uploads(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "upload_dir", str(tmp_path))
+
+    def write(filename, age=timedelta(0)):
+        path = tmp_path / filename
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b"%PDF")
+        mtime = time.time() - age.total_seconds()
+        os.utime(path, (mtime, mtime))
+        return path
+    return write
+
+
+def _collector(db, monkeypatch, files_per_pass=100):
+    monkeypatch.setattr(resume_gc, "get_database", lambda: db)
+    return ResumeGarbageCollector(
+        interval_seconds=0, files_per_pass=files_per_pass, grace=timedelta(hours=1), retention=timedelta(days=1)
+    )
+
+
+def _scanned(filename, age=timedelta(days=2)):
+    return ScannedFile(filename, 4, datetime.utcnow() - age)
+
+
+def test_shards_resume_from_a_blob_directory(uploads):
+    for directory in ("aa/bb", "aa/cc", "ab/00", "ab/01"):
+        uploads(os.path.join("resumes", directory, "x.pdf"))
+
+    assert list(_shards_from(os.path.join("resumes", "aa", "cc"))) == [
+        os.path.join("resumes", "aa", "cc"), os.path.join("resumes", "ab", "00"), os.path.join("resumes", "ab", "01")
+    ]
+    assert list(_shards_from(""))[:2] == ["", "tmp"]
+
+
+def test_scan_checkpoints_and_resumes_across_shards(uploads, monkeypatch):
+    names = ["flat.pdf"] + [os.path.join("resumes", d, f"{n}.pdf") for d in ("aa/bb", "ab/00") for n in "abc"]
+    for name in names:
+        uploads(name)
+    collector = _collector(_DB(), monkeypatch, files_per_pass=2)
+    seen = []
+
+    async def check_batch(files, report):
+        seen.extend(file.filename for file in files)
+
+    collector._check_batch = check_batch
+
+    async def scan_all():
+        checkpoints = []
+        shard, after = "", None
+        while True:
+            report = {"scanned_files": 0, "completed_scan": False}
+            shard, after = await collector._scan(shard, after, report)
+            checkpoints.append((shard, after))
+            if report["completed_scan"]:
+                return checkpoints
+
+    checkpoints = asyncio.run(scan_all())
+    assert seen == names
+    assert checkpoints[1] == (os.path.join("resumes", "aa", "bb"), "c.pdf")
+    assert checkpoints[-1] == ("", None)
+
+
+def test_pass_is_skipped_while_another_worker_holds_the_lease(monkeypatch):
+    collector = _collector(_DB(), monkeypatch)
+
+    async def scan(*args):
+        raise AssertionError("scanned without the lease")
+
+    collector._scan = scan
+    assert asyncio.run(collector.run_pass()) is None
+
+
+def test_claim_rolls_back_when_an_application_appears(monkeypatch):
+    stamp = datetime.utcnow() - timedelta(days=2)
+    blobs = _Blobs({"_id": SHA, "ref_count": 1, "updated_at": stamp})
+    applications = _Applications()
+    collector = _collector(_DB(applications, blobs), monkeypatch)
+
+    async def upload_lands_after_the_batch_check(query, update):
+        applications.filenames.append(BLOB)
+        applications.sha_counts[SHA] = 1
+        return await _Blobs.find_one_and_update(blobs, query, update)
+
+    blobs.find_one_and_update = upload_lands_after_the_batch_check
+    assert asyncio.run(collector._claim_blob(SHA, _scanned(BLOB), dict(blobs.documents[SHA]))) is False
+    assert blobs.documents[SHA]["ref_count"] == 1
+    assert "deleting_at" not in blobs.documents[SHA]
+
+
+def test_check_batch_quarantines_orphans_but_not_flat_files_the_migration_moved(uploads, monkeypatch):
+    for name in ("moved.pdf", "orphan.pdf", "used.pdf"):
+        uploads(name, age=timedelta(days=2))
+    blobs = _Blobs({"_id": SHA, "ref_count": 1, "legacy_names": ["moved.pdf"], "updated_at": datetime.utcnow()})
+    db = _DB(_Applications(["used.pdf"]), blobs)
+    collector = _collector(db, monkeypatch)
+    report = {"quarantined_files": 0, "quarantined_bytes": 0}
+
+    asyncio.run(collector._check_batch(
+        [_scanned("moved.pdf"), _scanned("orphan.pdf"), _scanned("used.pdf")], report
+    ))
+    assert list(db.resume_quarantine.documents) == ["orphan.pdf"]
+    assert os.path.exists(os.path.join(settings.upload_dir, QUARANTINE_DIR, "orphan.pdf"))
+    assert os.path.exists(os.path.join(settings.upload_dir, "moved.pdf"))
+
+
+def test_purge_restores_a_file_referenced_again(uploads, monkeypatch):
+    uploads(os.path.join(QUARANTINE_DIR, BLOB))
+    uploads(os.path.join(QUARANTINE_DIR, "gone.pdf"))
+    db = _DB(_Applications([BLOB], {SHA: 2}))
+    collector = _collector(db, monkeypatch)
+    entries = [{"_id": BLOB, "sha256": SHA, "size": 4}, {"_id": "gone.pdf", "sha256": None, "size": 4}]
+    for entry in entries:
+        db.resume_quarantine.documents[entry["_id"]] = entry
+    report = {"restored_files": 0, "reclaimed_files": 0, "reclaimed_bytes": 0}
+
+    asyncio.run(collector._purge_batch(entries, report))
+    assert report == {"restored_files": 1, "reclaimed_files": 1, "reclaimed_bytes": 4}
+    assert os.path.exists(os.path.join(settings.upload_dir, BLOB))
+    assert not os.path.exists(os.path.join(settings.upload_dir, QUARANTINE_DIR, "gone.pdf"))
+    assert db.resume_blobs.documents[SHA]["ref_count"] == 2
+    assert db.resume_quarantine.documents == {}
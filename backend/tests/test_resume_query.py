@@ -0,0 +1,39 @@
+import pytest
+from fastapi import HTTPException
+
+from app.utils.resume_query import MAX_QUERY_TERMS, ResumeQuery
+
+
+def test_adjacent_terms_collapse_into_one_all():
+    query = ResumeQuery("python django")
+    assert query.filter == {"terms": {"$all": ["python", "django"]}}
+    assert query.rank_terms() == ["django", "python"]
+
+
+def test_or_group_and_exclusion():
+    query = ResumeQuery("python (django OR flask) -php")
+    assert query.filter == {"$and": [
+        {"terms": "python"},
+        {"$or": [{"terms": "django"}, {"terms": "flask"}]},
+        {"$nor": [{"terms": "php"}]}
+    ]}
+    # Excluded terms don't count towards the score
+    assert query.rank_terms() == ["django", "flask", "python"]
+
+
+def test_phrase_matches_its_word_pairs():
+    assert ResumeQuery('"machine learning"').filter == {"terms": "machine learning"}
+    assert ResumeQuery('"natural language processing"').filter == {
+        "terms": {"$all": ["natural language", "language processing"]}
+    }
+
+
+def test_lowercase_operators_are_words():
+    assert ResumeQuery("sales and marketing").filter == {"terms": {"$all": ["sales", "and", "marketing"]}}
+
+
+@pytest.mark.parametrize("text", ["", "-php", "(python", "python OR", ")", " ".join(["go"] * (MAX_QUERY_TERMS + 1))])
+def test_invalid_queries_are_client_errors(text):
+    with pytest.raises(HTTPException) as error:
+        ResumeQuery(text)
+    assert error.value.status_code == 400
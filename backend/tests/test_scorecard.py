@@ -0,0 +1,39 @@
+from app.utils.scorecard import STAGE_WEIGHTS, build_scorecard
+
+
+def test_no_feedback_has_no_score():
+    scorecard = build_scorecard(None)
+    assert scorecard["score"] is None
+    assert scorecard["stages_completed"] == 0
+    assert scorecard["has_failed_stage"] is False
+
+
+def test_score_is_weighted_mean_of_stage_ratings():
+    stages = {
+        "stage1_hr_screening": {"scale": 8},
+        "stage1_feedback": {"performance_rating": 6, "approval_status": "Approved"},
+        "stage3_technical_interview": {"scale": 4, "outcome": "Yes"},
+    }
+    scorecard = build_scorecard(stages)
+    expected = (STAGE_WEIGHTS[1] * 7 + STAGE_WEIGHTS[3] * 4) / (STAGE_WEIGHTS[1] + STAGE_WEIGHTS[3])
+    assert scorecard["score"] == round(expected, 2)
+    assert scorecard["stage_scores"] == {"1": 7.0, "3": 4.0}
+    assert scorecard["stages_completed"] == 2
+    assert scorecard["passed_stages"] == [1, 3]
+
+
+def test_any_negative_verdict_fails_the_stage():
+    stages = {
+        "stage2_practical_lab": {"scale": 9, "test_result": "Fail"},
+        "stage4_hr_round": {"scale": 7},
+        "stage4_feedback": {"performance_rating": 7, "approval_status": "Rejected"},
+    }
+    scorecard = build_scorecard(stages)
+    assert scorecard["failed_stages"] == [2, 4]
+    assert scorecard["has_failed_stage"] is True
+
+
+def test_final_recommendation_scale_is_not_scored():
+    scorecard = build_scorecard({"stage7_final_recommendation": {"cumulative_scale": 9}})
+    assert scorecard["stages_completed"] == 1
+    assert scorecard["score"] is None
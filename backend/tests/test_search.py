@@ -0,0 +1,31 @@
+from itertools import combinations
+
+from app.utils.search import build_search_fields, normalize_text, required_trigrams, trigrams
+
+
+def test_normalize_text_strips_accents_case_and_spacing():
+    assert normalize_text("  José   ÁLVAREZ ") == "jose alvarez"
+    assert normalize_text(None) == ""
+
+
+def test_search_tokens_cover_full_values_and_words():
+    fields = build_search_fields("John Smith", "john.smith@example.com", mobile="+1 (555) 010-2000")
+    assert "john smith" in fields["search_tokens"]
+    assert "smith" in fields["search_tokens"]
+    assert "john.smith@example.com" in fields["search_tokens"]
+    assert fields["search_mobile"] == "15550102000"
+
+
+def test_required_trigrams_prefer_word_interior_grams():
+    grams = trigrams("smith")
+    required = required_trigrams(grams, 4)
+    assert len(required) == len(grams) - 3
+    assert sorted(required) == ["ith", "mit", "smi"]
+
+
+def test_every_document_reaching_min_overlap_holds_a_required_trigram():
+    grams = trigrams("jonathan")
+    for min_overlap in range(2, len(grams) + 1):
+        required = set(required_trigrams(grams, min_overlap))
+        for shared in combinations(grams, min_overlap):
+            assert required & set(shared)
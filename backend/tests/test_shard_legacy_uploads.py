@@ -0,0 +1,63 @@
+import asyncio
+
+from app.migrations.shard_legacy_uploads import take_references
+
+
+class _Cursor:
+    def __init__(self, documents):
+        self._documents = iter(documents)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._documents)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class _Blobs:
+    """resume_blobs holding ref_count and legacy_names, applying the migration's upserts."""
+
+    def __init__(self):
+        self.documents = {}
+
+    def find(self, query, projection=None):
+        return _Cursor([dict(doc) for sha, doc in self.documents.items() if sha in query["_id"]["$in"]])
+
+    async def bulk_write(self, operations, ordered=True):
+        for operation in operations:
+            query, update = operation._filter, operation._doc
+            document = self.documents.get(query["_id"])
+            if document and set(document.get("legacy_names", [])) & set(query["legacy_names"]["$nin"]):
+                raise AssertionError("a counted name was counted again")
+            document = document or self.documents.setdefault(query["_id"], {"_id": query["_id"], "ref_count": 0})
+            document["ref_count"] += update["$inc"]["ref_count"]
+            document.setdefault("legacy_names", []).extend(update["$addToSet"]["legacy_names"]["$each"])
+
+
+class _DB:
+    def __init__(self):
+        self.resume_blobs = _Blobs()
+
+
+def test_rerun_after_an_interrupted_batch_does_not_count_again():
+    db = _DB()
+    references = {"abc": ("resumes/ab/c/abc.pdf", 10, {"old_1.pdf": 2, "old_2.pdf": 1})}
+
+    assert asyncio.run(take_references(db, references)) == set()
+    # The run dies before repointing; the next run finds the same flat files and applications
+    assert asyncio.run(take_references(db, references)) == set()
+
+    assert db.resume_blobs.documents["abc"]["ref_count"] == 3
+
+
+def test_new_flat_names_of_a_known_blob_are_still_counted():
+    db = _DB()
+    asyncio.run(take_references(db, {"abc": ("f", 1, {"old_1.pdf": 2})}))
+    asyncio.run(take_references(db, {"abc": ("f", 1, {"old_1.pdf": 2, "copy_of_old_1.pdf": 1})}))
+
+    blob = db.resume_blobs.documents["abc"]
+    assert blob["ref_count"] == 3
+    assert sorted(blob["legacy_names"]) == ["copy_of_old_1.pdf", "old_1.pdf"]
@@ -0,0 +1,195 @@
+import asyncio
+import string
+
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException
+
+from app.services import stage_workflow_service
+from app.services.stage_workflow_service import (
+    ALL_STAGES,
+    STAGE_TRANSITIONS,
+    STATUS_TRANSITIONS,
+    StageWorkflowService,
+)
+
+APPLICATION_ID = str(ObjectId())
+
+
+class _Applications:
+    """applications holding one document; records the filter and update of each write."""
+
+    def __init__(self, document=None, matches=True):
+        self.document = document
+        self.matches = matches
+        self.writes = []
+
+    async def find_one_and_update(self, query, update, return_document=None):
+        self.writes.append((query, update))
+        if not self.matches:
+            return None
+        return {"_id": query["_id"], "current_stage": 1, "stages": {}, **(self.document or {}),
+                "updated_at": update["$set"]["updated_at"]}
+
+    async def find_one(self, query, projection=None):
+        return self.document
+
+
+class _Records:
+    def __init__(self):
+        self.inserted = []
+
+    async def insert_one(self, document):
+        self.inserted.append(document)
+
+    async def update_one(self, query, update):
+        pass
+
+
+class _DB:
+    def __init__(self, applications):
+        self.applications = applications
+        self.stage_transitions = _Records()
+        self.stage_assignments = _Records()
+
+
+@pytest.fixture
+def workflow(monkeypatch):
+    def build(document=None, matches=True):
+        db = _DB(_Applications(document, matches))
+        monkeypatch.setattr(stage_workflow_service, "get_database", lambda: db)
+        return StageWorkflowService()
+    return build
+
+
+def _rejection(service, action, stage_number, user_id="u1", user_role="team_member", expected=None):
+    with pytest.raises(HTTPException) as raised:
+        asyncio.run(service.apply(APPLICATION_ID, action, stage_number, user_id, user_role, expected=expected))
+    return raised.value
+
+
+def test_transition_table_is_consistent():
+    hooks = {"assignment", "audit", "notify", "scorecard"}
+    for action, transition in STAGE_TRANSITIONS.items():
+        assert set(transition.stages) <= set(ALL_STAGES), action
+        assert set(transition.hooks) <= hooks, action
+        assert not (transition.assignee_only and transition.unassigned_only), action
+        fields = {name for _, name, _, _ in string.Formatter().parse(transition.conflict) if name}
+        assert fields <= {"stage", "status"}, action
+    assert set(STATUS_TRANSITIONS.values()) <= set(STAGE_TRANSITIONS)
+
+
+def test_pending_guard_matches_stages_without_a_status(workflow):
+    service = workflow()
+    assert service._guard(STAGE_TRANSITIONS["assign"], 2, "admin", "admin")["stages.stage2_status"] == {
+        "$in": ["pending", None]
+    }
+    assert service._guard(STAGE_TRANSITIONS["forward"], 2, "hr", "hr")["stages.stage2_status"] == {
+        "$in": ["completed"]
+    }
+
+
+def test_assignee_guard_applies_to_team_members_only(workflow):
+    service = workflow()
+    start = STAGE_TRANSITIONS["start"]
+    assert service._guard(start, 3, "u1", "team_member")["stages.stage3_assigned_to"] == "u1"
+    for role in ("hr", "admin"):
+        assert "stages.stage3_assigned_to" not in service._guard(start, 3, "u1", role)
+
+
+def test_assignment_guards_on_the_current_assignee(workflow):
+    service = workflow()
+    assert service._guard(STAGE_TRANSITIONS["assign"], 1, "admin", "admin")["stages.stage1_assigned_to"] is None
+    reassign = service._guard(STAGE_TRANSITIONS["reassign"], 1, "admin", "admin", {"assigned_to": "u1"})
+    assert reassign["stages.stage1_assigned_to"] == "u1"
+
+
+def test_approval_never_moves_the_current_stage_back(workflow):
+    service = workflow()
+    approve = STAGE_TRANSITIONS["approve"]
+    update = service._update(approve, [3], None)
+    assert update["$max"] == {"current_stage": 4}
+    assert "$inc" not in update
+    assert "$max" not in service._update(approve, [7], None)
+    assert service._update(STAGE_TRANSITIONS["advance"], None, None)["$inc"] == {"current_stage": 1}
+
+
+def test_update_sets_status_and_fields_on_every_stage(workflow):
+    service = workflow()
+    changes = service._update(STAGE_TRANSITIONS["assign"], [2, 5], {"assigned_to": "u1"})["$set"]
+    assert changes["stages.stage2_status"] == changes["stages.stage5_status"] == "assigned"
+    assert changes["stages.stage2_assigned_to"] == changes["stages.stage5_assigned_to"] == "u1"
+    assert "updated_at" in changes
+
+
+def test_current_stage_transition_guards_each_candidate_stage(workflow):
+    # The write returns the application after the update, on the next stage
+    service = workflow({"current_stage": 4, "stages": {"stage3_status": "completed"}})
+    asyncio.run(service.apply(APPLICATION_ID, "advance", None, "hr", "hr"))
+    query, update = service.db.applications.writes[0]
+    assert query["$or"] == [
+        {"current_stage": stage, f"stages.stage{stage}_status": {"$in": ["completed"]}}
+        for stage in ALL_STAGES[:-1]
+    ]
+    assert update["$inc"] == {"current_stage": 1}
+    assert service.db.stage_transitions.inserted[0]["stage_number"] == 3
+
+
+def test_multi_stage_assignment_is_one_guarded_write(workflow):
+    service = workflow()
+    asyncio.run(service.apply_to_stages(APPLICATION_ID, "assign", [2, 4, 2], "admin", fields={"assigned_to": "u1"}))
+    assert len(service.db.applications.writes) == 1
+    query, _ = service.db.applications.writes[0]
+    for stage in (2, 4):
+        assert query[f"stages.stage{stage}_status"] == {"$in": ["pending", None]}
+        assert query[f"stages.stage{stage}_assigned_to"] is None
+    assert [record["stage_number"] for record in service.db.stage_transitions.inserted] == [2, 4]
+
+
+def test_invalid_stage_numbers_are_rejected_before_writing(workflow):
+    service = workflow()
+    assert _rejection(service, "assign", 8).detail == "Stage number must be between 1 and 7"
+    assert _rejection(service, "advance", 7).detail == "Invalid stage number"
+    assert service.db.applications.writes == []
+
+
+def test_rejection_of_a_missing_application_is_404(workflow):
+    assert _rejection(workflow(None, matches=False), "start", 1).status_code == 404
+
+
+def test_rejection_tells_unassigned_team_members_from_wrong_status(workflow):
+    stages = {"stage1_status": "pending", "stage1_assigned_to": "u2"}
+    service = workflow({"current_stage": 1, "stages": stages}, matches=False)
+
+    forbidden = _rejection(service, "start", 1, "u1", "team_member")
+    assert forbidden.status_code == 403
+
+    conflict = _rejection(service, "start", 1, "u1", "hr")
+    assert conflict.status_code == 400
+    assert conflict.detail == "Invalid status transition from pending to in_progress"
+
+
+def test_rejection_of_an_assignment_names_the_reason(workflow):
+    stages = {"stage1_status": "pending", "stage1_assigned_to": "u2", "stage2_status": "completed"}
+    service = workflow({"current_stage": 1, "stages": stages}, matches=False)
+
+    assert _rejection(service, "assign", 1, "admin", "admin").detail == (
+        "Stage 1 is already assigned to another team member"
+    )
+    assert _rejection(service, "reassign", 2, "admin", "admin", {"assigned_to": None}).detail == (
+        "Cannot reassign completed stage 2"
+    )
+    assert _rejection(service, "reassign", 1, "admin", "admin", {"assigned_to": "u1"}).status_code == 409
+
+
+def test_rejection_past_the_last_stage(workflow):
+    service = workflow({"current_stage": 7, "stages": {"stage7_status": "completed"}}, matches=False)
+    assert _rejection(service, "advance", None, "hr", "hr").detail == "Application has completed all interview stages"
+
+
+def test_current_stage_transitions_cannot_set_stage_fields(workflow):
+    service = workflow()
+    for action, fields in (("forward", None), ("advance", {"feedback": {}})):
+        with pytest.raises(ValueError):
+            asyncio.run(service.apply(APPLICATION_ID, action, None, "hr", "hr", fields=fields))
+    assert service.db.applications.writes == []
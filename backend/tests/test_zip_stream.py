@@ -0,0 +1,66 @@
+import asyncio
+import io
+import zipfile
+from datetime import datetime
+
+from app.utils.zip_stream import ZipMember, read_ahead, zip_chunks
+
+
+async def _chunks(*parts):
+    for part in parts:
+        yield part
+
+
+async def _members(members):
+    for member in members:
+        yield member
+
+
+def _archive(members):
+    async def collect():
+        return b"".join([chunk async for chunk in zip_chunks(_members(members))])
+    return zipfile.ZipFile(io.BytesIO(asyncio.run(collect())))
+
+
+def test_archive_reads_back_with_stored_and_deflated_entries():
+    text = b"candidate notes " * 1000
+    archive = _archive([
+        ZipMember("resumes/ada.pdf", datetime(2024, 5, 17, 9, 30, 42), _chunks(b"%PDF-1.7", b" body")),
+        ZipMember("manifest.csv", datetime(2024, 5, 17), _chunks(text[:5000], text[5000:]), compress=True),
+        ZipMember("résumé.txt", datetime(2024, 5, 17), _chunks()),
+    ])
+
+    assert archive.testzip() is None
+    assert archive.namelist() == ["resumes/ada.pdf", "manifest.csv", "résumé.txt"]
+    assert archive.read("resumes/ada.pdf") == b"%PDF-1.7 body"
+    assert archive.read("manifest.csv") == text
+    assert archive.read("résumé.txt") == b""
+
+    stored, deflated, _ = archive.infolist()
+    assert stored.compress_type == zipfile.ZIP_STORED
+    assert deflated.compress_type == zipfile.ZIP_DEFLATED
+    assert deflated.compress_size < deflated.file_size
+
+
+def test_dos_timestamps_keep_even_seconds_and_clamp_to_1980():
+    archive = _archive([
+        ZipMember("a", datetime(2024, 5, 17, 9, 30, 43), _chunks(b"a")),
+        ZipMember("b", datetime(1970, 1, 1), _chunks(b"b")),
+    ])
+    assert archive.getinfo("a").date_time == (2024, 5, 17, 9, 30, 42)
+    assert archive.getinfo("b").date_time == (1980, 1, 1, 0, 0, 0)
+
+
+def test_empty_archive_is_valid():
+    assert _archive([]).namelist() == []
+
+
+def test_read_ahead_yields_the_whole_file_in_chunks():
+    data = bytes(range(256)) * 100
+
+    async def collect():
+        return [chunk async for chunk in read_ahead(io.BytesIO(data), chunk_size=1000, depth=2)]
+
+    chunks = asyncio.run(collect())
+    assert b"".join(chunks) == data
+    assert max(len(chunk) for chunk in chunks) == 1000
@@ -4,25 +4,37 @@ import apiClient from '../services/apiClient';
 
 const ApplyOnBehalfModal = ({ isOpen, onClose, jobId, jobTitle }) => {
   const [candidates, setCandidates] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [query, setQuery] = useState('');
+  const [searching, setSearching] = useState(false);
   const [selectedCandidate, setSelectedCandidate] = useState('');
   const [resume, setResume] = useState(null);
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState('');
   const [success, setSuccess] = useState(false);
 
+  // Typeahead: fetch one page of matching candidates, debounced while typing
   useEffect(() => {
-    if (isOpen) {
-      fetchCandidates();
-    }
-  }, [isOpen]);
-
-  const fetchCandidates = async () => {
+    if (!isOpen) return undefined;
+    const timer = setTimeout(() => {
+      fetchCandidates(query);
+    }, 250);
+    return () => clearTimeout(timer);
+  }, [isOpen, query]);
+
+  const fetchCandidates = async (searchQuery, cursor = null) => {
+    setSearching(true);
     try {
-      const response = await apiClient.get('/api/users/candidates');
-      setCandidates(response.data);
+      const params = { q: searchQuery || undefined, limit: 20 };
+      if (cursor) params.cursor = cursor;
+      const response = await apiClient.get('/api/users/candidates/search', { params });
+      setCandidates((previous) => (cursor ? [...previous, ...response.data.items] : response.data.items));
+      setNextCursor(response.data.next_cursor);
     } catch (err) {
       console.error('Error fetching candidates:', err);
       setError('Failed to load candidates');
+    } finally {
+      setSearching(false);
     }
   };
 
@@ -56,6 +68,7 @@ const ApplyOnBehalfModal = ({ isOpen, onClose, jobId, jobTitle }) => {
         onClose();
         setSuccess(false);
         setSelectedCandidate('');
+        setQuery('');
         setResume(null);
       }, 2000);
     } catch (err) {
@@ -115,19 +128,38 @@ const ApplyOnBehalfModal = ({ isOpen, onClose, jobId, jobTitle }) => {
               <User className="inline h-4 w-4 mr-1" />
               Select Candidate
             </label>
+            <input
+              type="text"
+              value={query}
+              onChange={(e) => setQuery(e.target.value)}
+              placeholder="Search by username or email"
+              className="w-full px-3 py-2 mb-2 border border-gray-300 rounded-lg focus:ring-2 focus:ring-blue-500 focus:border-transparent"
+            />
             <select
               value={selectedCandidate}
               onChange={(e) => setSelectedCandidate(e.target.value)}
               className="w-full px-3 py-2 border border-gray-300 rounded-lg focus:ring-2 focus:ring-blue-500 focus:border-transparent"
               required
             >
-              <option value="">-- Select a candidate --</option>
+              <option value="">
+                {searching ? 'Searching...' : candidates.length ? '-- Select a candidate --' : 'No matching candidates'}
+              </option>
               {candidates.map((candidate) => (
                 <option key={candidate.id} value={candidate.id}>
                   {candidate.username} ({candidate.email})
                 </option>
               ))}
             </select>
+            {nextCursor && (
+              <button
+                type="button"
+                onClick={() => fetchCandidates(query, nextCursor)}
+                className="mt-2 text-sm text-blue-600 hover:text-blue-800"
+                disabled={searching}
+              >
+                Load more candidates
+              </button>
+            )}
           </div>
 
           {/* Resume Upload */}
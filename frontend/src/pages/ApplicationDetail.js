@@ -213,6 +213,15 @@ const ApplicationDetail = () => {
     }
   };
 
+  const handleDownloadResume = async () => {
+    try {
+      await applicationService.downloadResume(id);
+    } catch (error) {
+      console.error('Error downloading resume:', error);
+      alert('Error downloading resume. Please try again.');
+    }
+  };
+
   if (loading) {
     return (
       <div className="flex items-center justify-center py-12">
@@ -592,18 +601,13 @@ const ApplicationDetail = () => {
             <div className="flex items-center">
               <FileText className="h-8 w-8 text-gray-400 mr-3" />
               <div>
-                <p className="font-medium text-gray-900">{application.resume_filename}</p>
+                <p className="font-medium text-gray-900">{application.resume_filename.split('/').pop()}</p>
                 <p className="text-sm text-gray-500">Resume file</p>
               </div>
             </div>
-            <a
-              href={`http://localhost:8000/uploads/${application.resume_filename}`}
-              target="_blank"
-              rel="noopener noreferrer"
-              className="btn-primary"
-            >
+            <button onClick={handleDownloadResume} className="btn-primary">
               Download
-            </a>
+            </button>
           </div>
         </div>
       )}
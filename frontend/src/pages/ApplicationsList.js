@@ -1,13 +1,16 @@
 import React, { useState, useEffect } from 'react';
 import { Link } from 'react-router-dom';
 import { applicationService } from '../services/applicationService';
-import { Search, Filter, Eye, Trash2 } from 'lucide-react';
+import { useAuth } from '../context/AuthContext';
+import { Search, Filter, Eye, Trash2, Download } from 'lucide-react';
 
 const ApplicationsList = () => {
+  const { user } = useAuth();
   const [applications, setApplications] = useState([]);
   const [loading, setLoading] = useState(true);
   const [searchTerm, setSearchTerm] = useState('');
   const [statusFilter, setStatusFilter] = useState('all');
+  const [exporting, setExporting] = useState(false);
 
   useEffect(() => {
     fetchApplications();
@@ -24,6 +27,24 @@ const ApplicationsList = () => {
     }
   };
 
+  const handleExport = async () => {
+    try {
+      setExporting(true);
+      const params = statusFilter === 'all' ? {} : { status: statusFilter };
+      const blob = await applicationService.exportApplications('csv', params);
+      const url = window.URL.createObjectURL(blob);
+      const link = document.createElement('a');
+      link.href = url;
+      link.download = 'applications.csv';
+      link.click();
+      window.URL.revokeObjectURL(url);
+    } catch (error) {
+      console.error('Error exporting applications:', error);
+    } finally {
+      setExporting(false);
+    }
+  };
+
   const filteredApplications = applications.filter(app => {
     const matchesSearch = 
       app.name.toLowerCase().includes(searchTerm.toLowerCase()) ||
@@ -82,6 +103,16 @@ const ApplicationsList = () => {
           <h1 className="text-2xl font-bold text-gray-900">Applications</h1>
           <p className="text-gray-600 mt-1">Manage and review job applications</p>
         </div>
+        {['hr', 'admin'].includes(user?.role) && (
+          <button
+            onClick={handleExport}
+            disabled={exporting}
+            className="btn-secondary flex items-center disabled:opacity-50"
+          >
+            <Download className="h-4 w-4 mr-2" />
+            {exporting ? 'Exporting...' : 'Export CSV'}
+          </button>
+        )}
       </div>
 
       {/* Filters */}
@@ -17,7 +17,8 @@ import {
   FileText,
   CheckCircle,
   XCircle,
-  UserPlus
+  UserPlus,
+  Download
 } from 'lucide-react';
 
 const JobDetail = () => {
@@ -28,6 +29,7 @@ const JobDetail = () => {
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState('');
   const [showApplyOnBehalfModal, setShowApplyOnBehalfModal] = useState(false);
+  const [downloadingResumes, setDownloadingResumes] = useState(false);
 
   const isCandidate = user?.role === 'candidate';
   const isHR = user?.role === 'hr';
@@ -72,6 +74,17 @@ const JobDetail = () => {
     }
   };
 
+  const handleDownloadResumes = async () => {
+    try {
+      setDownloadingResumes(true);
+      await jobService.downloadJobResumes(jobId);
+    } catch (error) {
+      setError('Failed to download resumes');
+    } finally {
+      setDownloadingResumes(false);
+    }
+  };
+
   const getStatusBadge = (status) => {
     const statusConfig = {
       active: { color: 'bg-green-100 text-green-800', icon: CheckCircle },
@@ -168,6 +181,15 @@ const JobDetail = () => {
                 Apply on Behalf
               </button>
             )}
+
+            <button
+              onClick={handleDownloadResumes}
+              disabled={downloadingResumes}
+              className="bg-gray-50 text-gray-700 hover:bg-gray-100 px-4 py-2 rounded-xl font-semibold transition-all duration-200 inline-flex items-center disabled:opacity-50"
+            >
+              <Download className="mr-2 h-4 w-4" />
+              {downloadingResumes ? 'Preparing...' : 'Download Resumes'}
+            </button>
           </div>
         </div>
       ) : isAdmin ? (
@@ -191,6 +213,15 @@ const JobDetail = () => {
               <Edit className="mr-2 h-4 w-4" />
               Edit Job
             </Link>
+
+            <button
+              onClick={handleDownloadResumes}
+              disabled={downloadingResumes}
+              className="bg-gray-50 text-gray-700 hover:bg-gray-100 px-4 py-2 rounded-xl font-semibold transition-all duration-200 inline-flex items-center disabled:opacity-50"
+            >
+              <Download className="mr-2 h-4 w-4" />
+              {downloadingResumes ? 'Preparing...' : 'Download Resumes'}
+            </button>
             
             {job.status === 'active' && (
               <button
@@ -6,6 +6,8 @@ import { Search, Filter, Plus, Edit, Trash2, Eye, EyeOff } from 'lucide-react';
 const UserManagement = () => {
   const { user: currentUser } = useAuth();
   const [users, setUsers] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState('');
   const [successMessage, setSuccessMessage] = useState('');
@@ -34,15 +36,17 @@ const UserManagement = () => {
   const [searchTerm, setSearchTerm] = useState('');
   const [roleFilter, setRoleFilter] = useState('all');
 
+  // Users are loaded a page at a time, filtered by role on the server
   useEffect(() => {
     loadUsers();
-  }, []);
+  }, [roleFilter]);
 
   const loadUsers = async () => {
     try {
       setLoading(true);
-      const data = await userService.getAllUsers();
-      setUsers(data);
+      const page = await userService.getUsersPage({ role: roleFilter === 'all' ? null : roleFilter });
+      setUsers(page.items);
+      setNextCursor(page.next_cursor);
     } catch (err) {
       setError('Failed to load users');
     } finally {
@@ -50,6 +54,22 @@ const UserManagement = () => {
     }
   };
 
+  const loadMoreUsers = async () => {
+    try {
+      setLoadingMore(true);
+      const page = await userService.getUsersPage({
+        role: roleFilter === 'all' ? null : roleFilter,
+        cursor: nextCursor
+      });
+      setUsers(prev => [...prev, ...page.items]);
+      setNextCursor(page.next_cursor);
+    } catch (err) {
+      setError('Failed to load more users');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const handleFormChange = (e) => {
     const { name, value } = e.target;
     setFormData(prev => ({
@@ -435,6 +455,18 @@ const UserManagement = () => {
               </div>
             )}
           </div>
+          
+          {nextCursor && (
+            <div className="px-6 py-4 border-t border-gray-200 text-center">
+              <button
+                onClick={loadMoreUsers}
+                disabled={loadingMore}
+                className="text-sm font-medium text-blue-600 hover:text-blue-800 disabled:opacity-50"
+              >
+                {loadingMore ? 'Loading...' : 'Load more users'}
+              </button>
+            </div>
+          )}
         </div>
 
         {/* Create User Modal */}
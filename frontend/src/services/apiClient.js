@@ -36,5 +36,17 @@ apiClient.interceptors.response.use(
   }
 );
 
+// Download a file through a plain link so the browser streams it to disk.
+// The link carries a short-lived token that only authenticates this path.
+const downloadFile = async (path) => {
+  const response = await apiClient.post('/api/auth/download-token', { path });
+  const link = document.createElement('a');
+  link.href = `${API_BASE_URL}${path}?token=${encodeURIComponent(response.data.token)}`;
+  link.rel = 'noopener';
+  document.body.appendChild(link);
+  link.click();
+  link.remove();
+};
+
 export default apiClient;
-export { apiClient }; 
\ No newline at end of file
+export { apiClient, downloadFile }; 
\ No newline at end of file
@@ -1,4 +1,4 @@
-import { apiClient } from './apiClient';
+import { apiClient, downloadFile } from './apiClient';
 
 export const applicationService = {
   // Get all applications
@@ -7,12 +7,47 @@ export const applicationService = {
     return response.data;
   },
 
-  // Get application by ID
-  getApplicationById: async (id) => {
-    const response = await apiClient.get(`/api/applications/${id}`);
+  // Get one page of applications changed since the last sync ({ updated_since } or { cursor })
+  getApplicationsDelta: async (params) => {
+    const response = await apiClient.get('/api/applications', { params });
     return response.data;
   },
 
+  // Search applications by candidate name, email or mobile (prefix, then fuzzy matches)
+  searchApplications: async (q, limit = 10) => {
+    const response = await apiClient.get('/api/applications/search', { params: { q, limit } });
+    return response.data;
+  },
+
+  // Find applications by resume skills, best match first (HR/Admin only)
+  // q supports AND, OR, NOT/-, parentheses and "quoted phrases"
+  searchResumes: async (q, jobId = null, limit = 50) => {
+    const params = { q, limit, ...(jobId ? { job_id: jobId } : {}) };
+    const response = await apiClient.get('/api/applications/resume-search', { params });
+    return response.data;
+  },
+
+  // Download applications as CSV or NDJSON (HR/Admin only; params: updated_since, job_id, status)
+  exportApplications: async (format = 'csv', params = {}) => {
+    const response = await apiClient.get('/api/applications/export', {
+      params: { format, ...params },
+      responseType: 'blob',
+    });
+    return response.data;
+  },
+
+  // Get application by ID (optionally only the given fields, e.g. ['status', 'current_stage'])
+  getApplicationById: async (id, fields = null) => {
+    const params = fields ? { fields: fields.join(',') } : undefined;
+    const response = await apiClient.get(`/api/applications/${id}`, { params });
+    return response.data;
+  },
+
+  // Download an application's resume (authorized by the API)
+  downloadResume: async (id) => {
+    await downloadFile(`/api/applications/${id}/resume`);
+  },
+
   // Create new application
   createApplication: async (formData) => {
     const response = await apiClient.post('/api/applications', formData, {
@@ -82,6 +117,16 @@ export const applicationService = {
     }
   },
 
+  async getMyAssignmentsDelta(params) {
+    try {
+      const response = await apiClient.get('/api/applications/my-assignments', { params });
+      return response.data;
+    } catch (error) {
+      console.error('Error fetching assignment changes:', error);
+      throw error;
+    }
+  },
+
   async submitTeamMemberFeedback(applicationId, stageNumber, feedbackData) {
     try {
       const response = await apiClient.put(`/api/applications/${applicationId}/stage/${stageNumber}/team-feedback`, feedbackData);
@@ -1,4 +1,4 @@
-import { apiClient } from './apiClient';
+import { apiClient, downloadFile } from './apiClient';
 
 export const jobService = {
     // Get all active jobs (for candidates)
@@ -13,9 +13,35 @@ export const jobService = {
         return response.data;
     },
 
-    // Get job by ID
-    getJobById: async (jobId) => {
-        const response = await apiClient.get(`/api/jobs/${jobId}`);
+    // Search jobs by text, ranked by relevance (params: q, location, job_type, experience_level, department, page, limit)
+    searchJobs: async (params = {}) => {
+        const response = await apiClient.get('/api/jobs/search', { params });
+        return response.data;
+    },
+
+    // Get a job's applicants ranked by resume skill match (HR/Admin only)
+    getJobShortlist: async (jobId, limit = 20) => {
+        const response = await apiClient.get(`/api/jobs/${jobId}/shortlist`, { params: { limit } });
+        return response.data;
+    },
+
+    // Get a job's candidates ranked by their interview scorecard (HR/Admin only)
+    getJobTopCandidates: async (jobId, limit = 10, excludeFailed = true) => {
+        const response = await apiClient.get(`/api/jobs/${jobId}/top-candidates`, {
+            params: { limit, exclude_failed: excludeFailed }
+        });
+        return response.data;
+    },
+
+    // Download the resumes of all of a job's applicants as a ZIP archive (HR/Admin only)
+    downloadJobResumes: async (jobId) => {
+        await downloadFile(`/api/jobs/${jobId}/resumes.zip`);
+    },
+
+    // Get job by ID (optionally only the given fields, e.g. ['title', 'status'])
+    getJobById: async (jobId, fields = null) => {
+        const params = fields ? { fields: fields.join(',') } : undefined;
+        const response = await apiClient.get(`/api/jobs/${jobId}`, { params });
         return response.data;
     },
 
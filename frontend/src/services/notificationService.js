@@ -14,6 +14,16 @@ const notificationService = {
     return response.data;
   },
 
+  /**
+   * Get one page of notifications created or changed since the last sync
+   * @param {Object} params - { updated_since } for the first page, { cursor } for the next ones
+   * @returns {Promise<Object>} Delta page with items, deleted, next_cursor and server_time
+   */
+  getNotificationsDelta: async (params) => {
+    const response = await apiClient.get('/notifications/', { params });
+    return response.data;
+  },
+
   /**
    * Get count of unread notifications
    * @returns {Promise<number>} Count of unread notifications
@@ -7,12 +7,45 @@ class UserService {
     return response.data;
   }
 
+  // Get one page of users ordered by username ({ items, next_cursor })
+  async getUsersPage({ role = null, limit = 50, cursor = null } = {}) {
+    const params = { limit };
+    if (role) params.role = role;
+    if (cursor) params.cursor = cursor;
+    const response = await apiClient.get('/api/users', { params });
+    return response.data;
+  }
+
+  // Download all users (optionally of one role) as newline-delimited JSON (Admin only)
+  async exportUsers(role = null) {
+    const params = { format: 'ndjson' };
+    if (role) params.role = role;
+    const response = await apiClient.get('/api/users', { params, responseType: 'blob' });
+    return response.data;
+  }
+
   // Get users by role
   async getUsersByRole(role) {
     const response = await apiClient.get(`/api/users?role=${role}`);
     return response.data;
   }
 
+  // Search users by username, email or mobile, optionally within one role (HR/Admin only)
+  async searchUsers(q, { role = null, limit = 10 } = {}) {
+    const params = { q, limit };
+    if (role) params.role = role;
+    const response = await apiClient.get('/api/users/search', { params });
+    return response.data;
+  }
+
+  // Typeahead over candidates by username/email prefix ({ items, next_cursor })
+  async searchCandidates(q, { limit = 20, cursor = null } = {}) {
+    const params = { q, limit };
+    if (cursor) params.cursor = cursor;
+    const response = await apiClient.get('/api/users/candidates/search', { params });
+    return response.data;
+  }
+
   // Get user by ID
   async getUserById(userId) {
     const response = await apiClient.get(`/api/users/${userId}`);
@@ -0,0 +1,47 @@
+/**
+ * Delta sync helpers for list endpoints that support
+ * ?updated_since=<timestamp>&cursor=<cursor>
+ */
+
+/**
+ * Fetch every page of changes since the last sync
+ * @param {Function} fetchPage - Called with { updated_since } or { cursor }, returns a delta page
+ * @param {string} updatedSince - server_time returned by the previous sync
+ * @param {string} itemsKey - Name of the list field in the response (default: 'items')
+ * @returns {Promise<Object>} { items, deleted, serverTime, reset }
+ */
+export const fetchDelta = async (fetchPage, updatedSince, itemsKey = 'items') => {
+  let page = await fetchPage({ updated_since: updatedSince });
+  const items = [...page[itemsKey]];
+  const deleted = [...(page.deleted || [])];
+  const serverTime = page.server_time;
+  const reset = page.reset;
+
+  while (page.next_cursor) {
+    page = await fetchPage({ cursor: page.next_cursor });
+    items.push(...page[itemsKey]);
+  }
+
+  return { items, deleted, serverTime, reset };
+};
+
+/**
+ * Merge changed items and tombstones into a cached list
+ * @param {Array} current - Cached list
+ * @param {Object} delta - Result of fetchDelta
+ * @param {Function} getKey - Returns the merge key of an item (default: item.id)
+ * @returns {Array} Merged list
+ */
+export const mergeDelta = (current, delta, getKey = (item) => item.id) => {
+  const deletedKeys = new Set(delta.deleted.map((tombstone) => tombstone.id));
+  const merged = new Map();
+
+  current.forEach((item) => {
+    if (!deletedKeys.has(getKey(item))) {
+      merged.set(getKey(item), item);
+    }
+  });
+  delta.items.forEach((item) => merged.set(getKey(item), item));
+
+  return Array.from(merged.values());
+};